@@ -0,0 +1,166 @@
+"""Compare the PyTorch and int8 ONNX embedding backends.
+
+Each backend runs in its own subprocess so peak RSS is measured in isolation:
+
+    python benchmarks/embedding_benchmark.py --model-dir models/minilm-onnx
+"""
+import argparse
+import importlib
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+console = Console()
+
+SAMPLE_QUERIES = [
+    "How can I volunteer with the foundation?",
+    "Is my donation tax exempt under 80G?",
+    "What education programs do you run in villages?",
+    "How do I contact the foundation?",
+    "What does the women empowerment program do?",
+]
+
+
+def load_chunks(knowledge_file: str):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    content = Path(knowledge_file).read_text(encoding="utf-8")
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return splitter.split_text(content)
+
+
+def load_backend(args):
+    if args.backend == "onnx":
+        module = importlib.import_module("ngo-assisstant.services.onnx_embeddings")
+        return module.OnnxMiniLMEmbeddings(
+            args.model_dir, num_threads=args.threads, batch_size=args.batch_size
+        )
+
+    import torch
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    return HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        encode_kwargs={"batch_size": args.batch_size},
+    )
+
+
+def run_worker(args):
+    """Measure a single backend and write its stats and vectors as JSON."""
+    start = time.perf_counter()
+    embeddings = load_backend(args)
+    load_seconds = time.perf_counter() - start
+
+    chunks = load_chunks(args.knowledge_file)
+    queries = SAMPLE_QUERIES * max(1, args.queries // len(SAMPLE_QUERIES))
+
+    embeddings.embed_query(queries[0])  # warm-up
+    latencies = []
+    for query in queries:
+        t0 = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    corpus = chunks * max(1, 256 // max(1, len(chunks)))
+    t0 = time.perf_counter()
+    embeddings.embed_documents(corpus)
+    throughput = len(corpus) / (time.perf_counter() - t0)
+
+    vectors = embeddings.embed_documents(chunks + SAMPLE_QUERIES)
+    latencies.sort()
+    stats = {
+        "backend": args.backend,
+        "load_seconds": load_seconds,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "docs_per_second": throughput,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": [list(map(float, v)) for v in vectors],
+    }
+    Path(args.output).write_text(json.dumps(stats), encoding="utf-8")
+
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    return dot / (norm_a * norm_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--knowledge-file", default="data/knowledge.txt")
+    parser.add_argument("--model-dir", default="models/minilm-onnx")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--backend", choices=["torch", "onnx"])
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.backend:
+        run_worker(args)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ["torch", "onnx"]:
+            output = Path(tmp) / f"{backend}.json"
+            subprocess.run(
+                [
+                    sys.executable, __file__,
+                    "--backend", backend,
+                    "--output", str(output),
+                    "--knowledge-file", args.knowledge_file,
+                    "--model-dir", args.model_dir,
+                    "--threads", str(args.threads),
+                    "--batch-size", str(args.batch_size),
+                    "--queries", str(args.queries),
+                ],
+                check=True,
+            )
+            results[backend] = json.loads(output.read_text(encoding="utf-8"))
+
+    table = Table(title="Embedding Backend Benchmark")
+    table.add_column("Metric", style="cyan")
+    table.add_column("PyTorch", style="white")
+    table.add_column("ONNX int8", style="white")
+    rows = [
+        ("Load time (s)", "load_seconds", "{:.2f}"),
+        ("Query p50 (ms)", "query_p50_ms", "{:.2f}"),
+        ("Query p95 (ms)", "query_p95_ms", "{:.2f}"),
+        ("Throughput (docs/s)", "docs_per_second", "{:.1f}"),
+        ("Peak RSS (MB)", "peak_rss_mb", "{:.0f}"),
+    ]
+    for label, key, fmt in rows:
+        table.add_row(
+            label, fmt.format(results["torch"][key]), fmt.format(results["onnx"][key])
+        )
+    console.print(table)
+
+    similarities = [
+        cosine(a, b)
+        for a, b in zip(results["torch"]["vectors"], results["onnx"]["vectors"])
+    ]
+    console.print(
+        f"[cyan]Cosine agreement: mean {statistics.mean(similarities):.4f}, "
+        f"min {min(similarities):.4f} over {len(similarities)} texts[/cyan]"
+    )
+
+
+if __name__ == "__main__":
+    main()
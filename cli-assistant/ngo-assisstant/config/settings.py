@@ -18,6 +18,19 @@ class NGOConfig:
             'email_password': os.getenv('EMAIL_PASSWORD'),
             'smtp_server': os.getenv('SMTP_SERVER'),
             'smtp_port': int(os.getenv('SMTP_PORT', 587)),
+            'llm_timeout': float(os.getenv('LLM_TIMEOUT', 20)),
+            'search_timeout': float(os.getenv('SEARCH_TIMEOUT', 5)),
+            'embedding_backend': os.getenv('EMBEDDING_BACKEND', 'torch').lower(),
+            'onnx_model_dir': os.getenv('ONNX_MODEL_DIR', 'models/minilm-onnx'),
+            'embedding_threads': int(os.getenv('EMBEDDING_THREADS', 0)),
+            'embedding_batch_size': int(os.getenv('EMBEDDING_BATCH_SIZE', 32)),
+            'retrieval_fetch_k': int(os.getenv('RETRIEVAL_FETCH_K', 12)),
+            'mmr_lambda': float(os.getenv('MMR_LAMBDA', 0.7)),
+            'dedup_threshold': float(os.getenv('DEDUP_THRESHOLD', 0.6)),
+            'max_context_chars': int(os.getenv('MAX_CONTEXT_CHARS', 3000)),
+            'llm_input_price_per_million': float(os.getenv('LLM_INPUT_PRICE_PER_MILLION', 0.075)),
+            'llm_output_price_per_million': float(os.getenv('LLM_OUTPUT_PRICE_PER_MILLION', 0.30)),
+            'hedge_requests': os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true',
         }
         self._validate_config()
     
@@ -6,6 +6,9 @@ from rich.prompt import Prompt
 from ..services.knowledge import KnowledgeService
 from ..services.email import EmailService
 from ..utils.helpers import EmailHandler
+from ..utils.resilience import ResilientCall, CircuitOpenError
+from ..utils.metering import TokenMeter, usage_from_message
+from .router import IntentRouter
 
 try:
     from langchain_google_genai import ChatGoogleGenerativeAI
@@ -22,6 +25,16 @@ class NGOAgent:
         self.knowledge_service = KnowledgeService(config)
         self.email_service = EmailService(config)
         self.email_handler = EmailHandler(self.email_service)
+        self.router = IntentRouter()
+        self.token_meter = TokenMeter(
+            config.get("llm_input_price_per_million", 0.075),
+            config.get("llm_output_price_per_million", 0.30),
+        )
+        self.llm_call = ResilientCall(
+            "gemini",
+            timeout=config.get("llm_timeout", 20),
+            hedge=config.get("hedge_requests", False),
+        )
         self.llm = self._initialize_llm()
         self.conversation_history = []
 
@@ -71,8 +84,18 @@ Query: {user_input}
 Provide a helpful, professional response."""
 
         try:
-            response = self.llm.invoke(system_prompt)
+            response = self.llm_call.run(self.llm.invoke, system_prompt)
+            prompt_tokens, completion_tokens, estimated = usage_from_message(
+                response, system_prompt
+            )
+            self.token_meter.record(
+                "cli-agent", "chat", prompt_tokens, completion_tokens, estimated
+            )
             return response.content
+        except CircuitOpenError:
+            return "The AI service is temporarily unavailable. Please try again in a minute."
+        except TimeoutError:
+            return "The AI service is taking too long to respond. Please try again."
         except Exception as e:
             return f"Sorry, I encountered an error: {e}"
 
@@ -92,22 +115,33 @@ Provide a helpful, professional response."""
             try:
                 user_input = Prompt.ask("\n[bold cyan]You[/bold cyan]").strip()
 
-                if user_input.lower() in ["quit", "exit", "bye"]:
+                intent, _ = self.router.classify(user_input)
+
+                if intent == "quit":
                     console.print("[green]👋 Goodbye![/green]")
                     break
 
-                elif user_input.lower() == "help":
+                elif intent == "help":
                     self._show_help()
 
-                elif any(word in user_input.lower() for word in ["send mail", "email"]):
+                elif intent == "send_email":
                     self.email_handler.handle_email_request()
 
-                elif user_input.lower() == "history":
+                elif intent == "history":
                     self._show_history()
 
-                elif user_input.lower() == "status":
+                elif intent == "status":
                     self._show_status()
 
+                elif intent == "usage":
+                    self._show_usage()
+
+                elif intent == "contact_lists":
+                    self._show_contact_lists()
+
+                elif intent == "list_templates":
+                    self._show_templates()
+
                 else:
                     with console.status("[bold green]Thinking...", spinner="dots"):
                         response = self.generate_response(user_input)
@@ -136,8 +170,11 @@ Provide a helpful, professional response."""
         commands = [
             ("help", "Show this help message"),
             ("send mail", "Send emails to recipients"),
+            ("how many donors?", "Count contacts in the mailing lists"),
+            ("which templates?", "List available email templates"),
             ("history", "Show conversation history"),
             ("status", "Show system status"),
+            ("usage", "Show LLM token usage and cost"),
             ("quit/exit", "Exit the CLI application"),
         ]
 
@@ -161,6 +198,38 @@ Provide a helpful, professional response."""
             )
             console.print("-" * 50)
 
+    def _show_contact_lists(self):
+        """Show mailing lists and their sizes without calling the LLM."""
+        email_lists = self.email_service.load_email_lists()
+        if not email_lists:
+            console.print("[yellow]No mailing lists found in data/.[/yellow]")
+            return
+
+        lists_table = Table(title="Mailing Lists")
+        lists_table.add_column("List", style="cyan")
+        lists_table.add_column("Contacts", style="white")
+
+        for list_name, emails in email_lists.items():
+            lists_table.add_row(list_name.replace("_", " "), str(len(emails)))
+
+        console.print(lists_table)
+
+    def _show_templates(self):
+        """Show available email templates without calling the LLM."""
+        templates = self.email_service.load_templates()
+        if not templates:
+            console.print("[yellow]No email templates found.[/yellow]")
+            return
+
+        templates_table = Table(title="Email Templates")
+        templates_table.add_column("Template", style="cyan")
+        templates_table.add_column("Preview", style="white")
+
+        for name, body in templates.items():
+            templates_table.add_row(name, body[:60].replace("\n", " ") + "...")
+
+        console.print(templates_table)
+
     def _show_status(self):
         """Show system status."""
         status_table = Table(title="System Status")
@@ -173,6 +242,9 @@ Provide a helpful, professional response."""
                 "Knowledge Base",
                 "✅ Ready" if self.knowledge_service.vector_store else "❌ Disabled",
             ),
+            ("Gemini Circuit", self._format_circuit(self.llm_call)),
+            ("Pinecone Circuit", self._format_circuit(self.knowledge_service.search_call)),
+            ("LLM Usage Today", self._format_usage_today()),
             (
                 "Email Service",
                 "✅ Ready" if self.config.get("email") else "❌ Not configured",
@@ -183,3 +255,46 @@ Provide a helpful, professional response."""
             status_table.add_row(component, status)
 
         console.print(status_table)
+
+    def _format_circuit(self, call: ResilientCall) -> str:
+        """Format circuit breaker state and recent p95 latency."""
+        status = call.status()
+        p95 = f", p95 {status['p95_ms']} ms" if status["p95_ms"] is not None else ""
+        return f"{status['state']}{p95}"
+
+    def _format_usage_today(self) -> str:
+        """Summarize today's token usage for the status table."""
+        today = datetime.now().date().isoformat()
+        rows = [row for row in self.token_meter.summary() if row["day"] == today]
+        if not rows:
+            return "No LLM calls yet"
+        prompt_tokens = sum(row["prompt_tokens"] for row in rows)
+        completion_tokens = sum(row["completion_tokens"] for row in rows)
+        cost = sum(row["cost_usd"] for row in rows)
+        return f"{prompt_tokens} in / {completion_tokens} out (${cost:.4f})"
+
+    def _show_usage(self):
+        """Show LLM token usage per agent, endpoint and day."""
+        rows = self.token_meter.summary()
+        if not rows:
+            console.print("[yellow]No LLM calls recorded yet.[/yellow]")
+            return
+
+        usage_table = Table(title="LLM Token Usage")
+        for column in ["Day", "Agent", "Endpoint", "Calls", "Prompt", "Completion", "Cost (USD)"]:
+            usage_table.add_column(column, style="cyan" if column == "Day" else "white")
+
+        for row in rows:
+            estimated = " *" if row["estimated_calls"] else ""
+            usage_table.add_row(
+                row["day"],
+                row["agent"],
+                row["endpoint"],
+                str(row["calls"]),
+                f"{row['prompt_tokens']}{estimated}",
+                str(row["completion_tokens"]),
+                f"{row['cost_usd']:.4f}",
+            )
+
+        console.print(usage_table)
+        console.print("[dim]* includes estimated token counts[/dim]")
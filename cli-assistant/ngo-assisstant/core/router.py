@@ -0,0 +1,118 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Exact commands never need classification
+COMMANDS = {
+    "quit": "quit",
+    "exit": "quit",
+    "bye": "quit",
+    "help": "help",
+    "history": "history",
+    "status": "status",
+    "usage": "usage",
+    "send mail": "send_email",
+}
+
+# Asking for text to be written is LLM work, however close it is to "send an email"
+COMPOSE_WORDS = {"write", "draft", "compose", "rewrite", "word", "phrase"}
+
+# Small labelled set; "chat" examples keep LLM-worthy questions away from local handlers
+TRAINING_EXAMPLES = {
+    "send_email": [
+        "send mail",
+        "send an email to donors",
+        "send email to the volunteers list",
+        "email the board members",
+        "start an email campaign",
+        "mail everyone on the media list",
+        "i want to send a mail",
+        "email all supporters",
+        "send a mail to the donor list",
+    ],
+    "contact_lists": [
+        "how many donors do we have",
+        "how many donors are on file",
+        "number of volunteers",
+        "count of board members",
+        "how many contacts are in the media list",
+        "which mailing lists exist",
+        "show recipient lists",
+        "show mailing lists",
+    ],
+    "list_templates": [
+        "which templates exist",
+        "list email templates",
+        "show me the templates",
+        "what email templates do we have",
+        "available mail templates",
+    ],
+    "chat": [
+        "help me write an email asking for donations",
+        "how should we word our email newsletter",
+        "plan a fundraising campaign for education",
+        "ideas to keep volunteers engaged",
+        "how do we organise a donation drive",
+        "what should i say to thank a donor",
+        "suggest an event for women empowerment",
+        "draft a volunteer recruitment message",
+        "write an email thanking our donors",
+        "compose a mail inviting volunteers to the event",
+        "what should our donor email say",
+    ],
+}
+
+
+def _features(text: str) -> Counter:
+    """Bag of words plus character trigrams, robust to typos and plurals."""
+    text = text.lower()
+    words = re.findall(r"\w+", text)
+    features = Counter(f"w:{word}" for word in words)
+    padded = f" {' '.join(words)} "
+    features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+class IntentRouter:
+    """Nearest-centroid intent classifier over a small labelled set.
+
+    Classification is a sparse dot product against one centroid per intent,
+    which keeps routing well under a millisecond. Anything that is not a
+    confident match for a local intent is left to the LLM as "chat", and so is
+    a request to write or draft an email rather than send one.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]] = None, threshold: float = 0.45):
+        self.threshold = threshold
+        self.centroids = {}
+        for intent, texts in (examples or TRAINING_EXAMPLES).items():
+            centroid = Counter()
+            for text in texts:
+                for feature, weight in _normalize(_features(text)).items():
+                    centroid[feature] += weight / len(texts)
+            self.centroids[intent] = _normalize(centroid)
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Return the best intent and its cosine score."""
+        command = COMMANDS.get(text.strip().lower())
+        if command:
+            return command, 1.0
+
+        query = _normalize(_features(text))
+        best_intent, best_score = "chat", 0.0
+        for intent, centroid in self.centroids.items():
+            score = sum(weight * centroid.get(f, 0.0) for f, weight in query.items())
+            if score > best_score:
+                best_intent, best_score = intent, score
+
+        if best_intent != "chat" and best_score < self.threshold:
+            return "chat", best_score
+        if best_intent == "send_email" and COMPOSE_WORDS & set(re.findall(r"\w+", text.lower())):
+            return "chat", best_score
+        return best_intent, best_score
@@ -1,9 +1,12 @@
 import os
 import warnings
-from typing import List
+from typing import List, Tuple
 from rich.console import Console
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from ..utils.resilience import ResilientCall, CircuitOpenError
+from .onnx_embeddings import OnnxMiniLMEmbeddings
+from .retrieval import suppress_near_duplicates, mmr_select, fit_to_budget
 
 # Import with fallbacks
 try:
@@ -34,11 +37,30 @@ class KnowledgeService:
         self.config = config
         self.embeddings = None
         self.vector_store = None
+        self.index = None
+        self.search_call = ResilientCall(
+            "pinecone",
+            timeout=config.get("search_timeout", 5),
+            hedge=config.get("hedge_requests", False),
+        )
         self._initialize_embeddings()
         self._initialize_pinecone()
 
     def _initialize_embeddings(self):
         """Initialize HuggingFace embeddings."""
+        if self.config.get("embedding_backend") == "onnx":
+            try:
+                self.embeddings = OnnxMiniLMEmbeddings(
+                    self.config.get("onnx_model_dir"),
+                    num_threads=self.config.get("embedding_threads", 0),
+                    batch_size=self.config.get("embedding_batch_size", 32),
+                )
+                return
+            except Exception as e:
+                console.print(
+                    f"[yellow]⚠️  ONNX embeddings unavailable, using PyTorch: {e}[/yellow]"
+                )
+
         if HuggingFaceEmbeddings is None:
             console.print("[yellow]⚠️  HuggingFace embeddings not available[/yellow]")
             return
@@ -65,6 +87,7 @@ class KnowledgeService:
             self.vector_store = PineconeVectorStore(
                 index=index, embedding=self.embeddings
             )
+            self.index = index
             console.print("[green]✅ Connected to vector database[/green]")
 
         except Exception as e:
@@ -104,8 +127,55 @@ class KnowledgeService:
             return []
 
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
-            return [doc.page_content for doc in docs]
+            query_vector = self.embeddings.embed_query(query)
+            matches = self.search_call.run(
+                self._query,
+                query_vector,
+                max(k, self.config.get("retrieval_fetch_k", 12)),
+            )
+            return self._rerank(query_vector, matches, k)
+        except CircuitOpenError:
+            # Answer without context while the vector database is unhealthy
+            return []
+        except TimeoutError:
+            console.print("[yellow]⚠️  Knowledge search timed out[/yellow]")
+            return []
         except Exception as e:
             console.print(f"[red]Knowledge search error: {e}[/red]")
             return []
+
+    def _query(self, query_vector: List[float], top_k: int) -> List[Tuple[str, List[float]]]:
+        """Nearest chunks with the vectors Pinecone stored for them."""
+        results = self.index.query(
+            vector=query_vector,
+            top_k=top_k,
+            include_values=True,
+            include_metadata=True,
+        )
+        return [
+            (match["metadata"]["text"], match["values"])
+            for match in results["matches"]
+            if match.get("metadata") and match["metadata"].get("text")
+        ]
+
+    def _rerank(
+        self, query_vector: List[float], matches: List[Tuple[str, List[float]]], k: int
+    ) -> List[str]:
+        """Drop near-duplicate chunks and pick a diverse top-k with MMR.
+
+        Uses the stored chunk vectors, so nothing is embedded again per search.
+        """
+        stored = dict(matches)
+        candidates = suppress_near_duplicates(
+            [text for text, _ in matches], self.config.get("dedup_threshold", 0.6)
+        )
+        if len(candidates) > 1:
+            vectors = [stored[text] for text in candidates]
+            order = mmr_select(
+                query_vector, vectors, k, self.config.get("mmr_lambda", 0.7)
+            )
+            candidates = [candidates[i] for i in order]
+
+        return fit_to_budget(
+            candidates[:k], self.config.get("max_context_chars", 3000)
+        )
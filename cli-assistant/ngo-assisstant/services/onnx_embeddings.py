@@ -0,0 +1,140 @@
+import os
+import argparse
+from pathlib import Path
+from typing import List
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+except ImportError:
+    np = None
+    ort = None
+    Tokenizer = None
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    Embeddings = object
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+MAX_SEQ_LENGTH = 256
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """CPU embeddings from an int8-quantized ONNX export of all-MiniLM-L6-v2.
+
+    Produces the same mean-pooled, L2-normalized 384-d vectors as the
+    sentence-transformers model, so it can query an index built with either.
+    """
+
+    def __init__(self, model_dir: str, num_threads: int = 0, batch_size: int = 32):
+        if ort is None:
+            raise ImportError("onnxruntime, tokenizers and numpy are required")
+
+        model_path = Path(model_dir) / MODEL_FILE
+        tokenizer_path = Path(model_dir) / TOKENIZER_FILE
+        if not model_path.exists() or not tokenizer_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found in {model_dir}; run "
+                "'python -m ngo-assisstant.services.onnx_embeddings --output-dir "
+                f"{model_dir}' first"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+    def _embed_batch(self, texts: List[str]):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in length-sorted batches to keep padding small."""
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch_ids = order[start:start + self.batch_size]
+            embedded = self._embed_batch([texts[i] for i in batch_ids])
+            for i, vector in zip(batch_ids, embedded):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
+
+
+def export_quantized_model(output_dir: str, model_name: str = DEFAULT_MODEL_NAME) -> Path:
+    """Export the transformer to ONNX and quantize its weights to int8."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    fp32_path = output / "model_fp32.onnx"
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+
+    quantize_dynamic(str(fp32_path), str(output / MODEL_FILE), weight_type=QuantType.QInt8)
+    tokenizer.backend_tokenizer.save(str(output / TOKENIZER_FILE))
+    for leftover in output.glob("model_fp32.onnx*"):
+        os.remove(leftover)
+    return output / MODEL_FILE
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export an int8 ONNX MiniLM model")
+    parser.add_argument("--output-dir", default="models/minilm-onnx")
+    parser.add_argument("--model-name", default=DEFAULT_MODEL_NAME)
+    args = parser.parse_args()
+    path = export_quantized_model(args.output_dir, args.model_name)
+    print(f"Quantized model written to {path}")
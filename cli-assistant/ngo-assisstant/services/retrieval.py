@@ -0,0 +1,84 @@
+import re
+import zlib
+from typing import List, Sequence, Set
+
+
+def shingle_hashes(text: str, size: int = 5) -> Set[int]:
+    """Hash overlapping word shingles of a text into a set of integers."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def resemblance(a: Set[int], b: Set[int]) -> float:
+    """Overlap of two shingle sets relative to the smaller one.
+
+    Using the smaller set catches a short chunk that is fully contained in a
+    longer one, which plain Jaccard similarity would miss.
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def suppress_near_duplicates(texts: Sequence[str], threshold: float = 0.6) -> List[str]:
+    """Drop texts that resemble a higher-ranked text above the threshold."""
+    kept, kept_shingles = [], []
+    for text in texts:
+        shingles = shingle_hashes(text)
+        if any(resemblance(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(text)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """Pick candidate indices by maximal marginal relevance."""
+    relevance = [_cosine(query_vector, vector) for vector in candidate_vectors]
+    selected: List[int] = []
+    remaining = list(range(len(candidate_vectors)))
+
+    while remaining and len(selected) < k:
+        best, best_score = None, float("-inf")
+        for i in remaining:
+            redundancy = max(
+                (_cosine(candidate_vectors[i], candidate_vectors[j]) for j in selected),
+                default=0.0,
+            )
+            score = lambda_mult * relevance[i] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+        remaining.remove(best)
+
+    return selected
+
+
+def fit_to_budget(texts: Sequence[str], max_chars: int) -> List[str]:
+    """Keep texts in order until the character budget for the prompt is used up."""
+    kept, used = [], 0
+    for text in texts:
+        if kept and used + len(text) > max_chars:
+            break
+        kept.append(text)
+        used += len(text)
+    return kept
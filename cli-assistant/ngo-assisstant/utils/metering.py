@@ -0,0 +1,100 @@
+"""LLM token counts and estimated cost for the assistant.
+
+voice-micro-agent/utils/metering.py is a deliberate parallel copy: the two
+apps are deployed separately and share no package. estimate_tokens and
+TokenMeter must behave the same in both, with identical summary() rows, so
+change them together. Only reading usage differs: this copy reads LangChain
+messages (usage_from_message), the voice copy reads Gemini SDK responses.
+"""
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count with tiktoken, or ~4 characters per token without it."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def usage_from_message(message: Any, prompt: str) -> Tuple[int, int, bool]:
+    """Read token usage from a LangChain message, estimating when it is missing."""
+    usage = getattr(message, "usage_metadata", None)
+    if usage and usage.get("input_tokens") is not None:
+        return usage["input_tokens"], usage.get("output_tokens", 0), False
+
+    metadata = (getattr(message, "response_metadata", None) or {}).get("usage_metadata")
+    if metadata and metadata.get("prompt_token_count") is not None:
+        return (
+            metadata["prompt_token_count"],
+            metadata.get("candidates_token_count", 0),
+            False,
+        )
+
+    return estimate_tokens(prompt), estimate_tokens(getattr(message, "content", "")), True
+
+
+class TokenMeter:
+    """Per agent, endpoint and day totals of LLM tokens and estimated cost."""
+
+    def __init__(self, input_price_per_million: float, output_price_per_million: float):
+        self.input_price = input_price_per_million
+        self.output_price = output_price_per_million
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str, str], Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0}
+        )
+
+    def record(
+        self,
+        agent: str,
+        endpoint: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        estimated: bool = False,
+    ):
+        key = (agent, endpoint, date.today().isoformat())
+        with self._lock:
+            entry = self._totals[key]
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            if estimated:
+                entry["estimated_calls"] += 1
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (
+            prompt_tokens * self.input_price + completion_tokens * self.output_price
+        ) / 1_000_000
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Totals as rows sorted by day, agent and endpoint."""
+        with self._lock:
+            rows = []
+            for (agent, endpoint, day), entry in sorted(
+                self._totals.items(), key=lambda item: (item[0][2], item[0][0], item[0][1])
+            ):
+                rows.append(
+                    {
+                        "day": day,
+                        "agent": agent,
+                        "endpoint": endpoint,
+                        **entry,
+                        "avg_prompt_tokens": round(entry["prompt_tokens"] / entry["calls"]),
+                        "cost_usd": round(
+                            self.cost(entry["prompt_tokens"], entry["completion_tokens"]), 6
+                        ),
+                    }
+                )
+        return rows
@@ -0,0 +1,169 @@
+"""Deadlines, hedging and circuit breaking for the assistant's external calls.
+
+voice-micro-agent/utils/resilience.py is a deliberate parallel copy: the two
+apps are deployed separately and share no package. CircuitBreaker,
+LatencyWindow and the hedging rule in ResilientCall must behave the same in
+both, so change them together. The differences are intentional. This copy
+runs blocking calls on a thread pool and locks the breaker. The voice copy
+runs on one event loop, cuts timeouts to the caller's deadline and logs when
+a circuit opens.
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+# Shared worker pool for external calls so a hung request never blocks the CLI
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="external-call")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open."""
+
+
+class CallTimeoutError(TimeoutError):
+    """Raised when an external call does not finish before its deadline."""
+
+
+class CircuitBreaker:
+    """Fail fast while an external dependency keeps failing."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Allow calls while closed and a single probe call while half-open."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Rolling window of recent call latencies in seconds."""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientCall:
+    """Deadline, optional hedging and circuit breaking around one external dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.5,
+        min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.min_samples = min_samples
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency = LatencyWindow()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before sending a hedged request, based on the observed p95."""
+        if not self.hedge or len(self.latency.samples) < self.min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(95))
+
+    def status(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(95)
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call with a deadline, raising CallTimeoutError when it expires."""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        start = time.monotonic()
+        try:
+            result = self._attempt(func, args, kwargs, start + self.timeout)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.latency.record(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    def _attempt(self, func: Callable, args, kwargs, deadline: float) -> Any:
+        futures = {_executor.submit(func, *args, **kwargs)}
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = wait(futures, timeout=min(delay, deadline - time.monotonic()))
+            if not done and time.monotonic() < deadline:
+                futures.add(_executor.submit(func, *args, **kwargs))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise CallTimeoutError(f"{self.name} call exceeded {self.timeout}s")
+        raise error
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The assistant's modules import each other relative to ngo-assisstant/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ngo-assisstant"))
@@ -0,0 +1,46 @@
+import pytest
+
+from core.router import IntentRouter
+
+router = IntentRouter()
+
+
+@pytest.mark.parametrize(
+    "text, intent",
+    [
+        ("quit", "quit"),
+        ("Status", "status"),
+        ("send mail", "send_email"),
+        ("send an email to the donors", "send_email"),
+        ("email all volunteers", "send_email"),
+        ("send mail to board members", "send_email"),
+        ("i need to email the media list", "send_email"),
+        ("how many donors do we have", "contact_lists"),
+        ("how many volunteers are there", "contact_lists"),
+        ("show me the mailing lists", "contact_lists"),
+        ("list the templates", "list_templates"),
+        ("what templates are available", "list_templates"),
+        ("which mail templates can i use", "list_templates"),
+    ],
+)
+def test_commands_route_locally(text, intent):
+    assert router.classify(text)[0] == intent
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "can you write an email thanking donors",
+        "help me draft an email to donors",
+        "draft a mail asking volunteers to join",
+        "how should i email a new donor",
+        "suggest a subject line for our donation email",
+        "write a thank you note for volunteers",
+        "how many people should we invite to the gala",
+        "templates for social media posts ideas",
+        "what is the best time to send a newsletter",
+        "tell me about our education program",
+    ],
+)
+def test_near_misses_stay_in_chat(text):
+    assert router.classify(text)[0] == "chat"
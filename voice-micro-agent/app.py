@@ -1,8 +1,22 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from routes.faq_routes import voice_router
 from routes.info_routes import voice_router as info_router
 from routes.api_routes import api_router
+from routes.campaign_routes import campaign_router
+from routes.stream_routes import stream_router
+from config.settings import settings
+from services.campaign_service import campaign_scheduler
+from services.twilio_service import twilio_client
+from services.gemini_service import gemini_call, warm_up
+from services.knowledge_service import knowledge_base
+from services.sheets_sink import sheets_sink
+from services.email_service import email_outbox
+from services.user_store import user_store
+from services.trace_service import trace_log
+from services.metrics_service import render_metrics
+from utils.metrics import MetricsMiddleware
 import sys
 import os
 from dotenv import load_dotenv
@@ -29,10 +43,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(voice_router)
 app.include_router(api_router)
 app.include_router(info_router)
+app.include_router(campaign_router)
+app.include_router(stream_router)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Build the knowledge base index, start background workers and open the Gemini connection"""
+    knowledge_base.refresh()
+    # One-time migration of the legacy CSV; only the first worker to get here imports it
+    user_store.import_csv(settings.USER_DATA_CSV)
+    user_store.start()
+    sheets_sink.start()
+    email_outbox.start()
+    trace_log.start()
+    campaign_scheduler.start()
+    await warm_up(force=True)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Commit buffered registrations, flush Sheets rows and stop the background workers"""
+    await campaign_scheduler.stop()
+    await twilio_client.close()
+    user_store.stop()
+    sheets_sink.stop()
+    email_outbox.stop()
+    trace_log.stop()
 
 
 @app.get("/")
@@ -42,7 +86,21 @@ def read_root():
 
 @app.get("/healthcheck")
 def healthcheck():
-    return {"status": "healthy", "message": "Call Agent is operational"}
+    return {
+        "status": "healthy",
+        "message": "Call Agent is operational",
+        "dependencies": {
+            "gemini": gemini_call.status(),
+            "sheets": sheets_sink.status(),
+            "email": email_outbox.status(),
+        },
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text format: route and external call latency, call-flow funnel, queues and shedding"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
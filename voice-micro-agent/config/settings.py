@@ -11,18 +11,110 @@ class Settings:
     TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
     TO_NUMBER = os.getenv("TO_NUMBER")
     WEBHOOK_URL = os.getenv("WEBHOOK_URL", "http://localhost:8000")
+    # REST API host; point at http://localhost:8099 for loadtest/fake_twilio.py
+    TWILIO_API_BASE = os.getenv("TWILIO_API_BASE", "https://api.twilio.com")
+    TWILIO_TIMEOUT = float(os.getenv("TWILIO_TIMEOUT", "10"))
+    TWILIO_MAX_CONCURRENCY = int(os.getenv("TWILIO_MAX_CONCURRENCY", "10"))
+
+    # Outbound campaigns
+    CAMPAIGN_CPS = float(os.getenv("CAMPAIGN_CPS", "1"))
+    CAMPAIGN_MAX_LIVE_CALLS = int(os.getenv("CAMPAIGN_MAX_LIVE_CALLS", "10"))
+    CAMPAIGN_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", "3"))
+    CAMPAIGN_RETRY_DELAY = float(os.getenv("CAMPAIGN_RETRY_DELAY", "900"))
+    CAMPAIGN_CALL_TIMEOUT = float(os.getenv("CAMPAIGN_CALL_TIMEOUT", "1800"))
+
+    # Media Streams conversational mode; plug-ins are given as module:ClassName
+    STREAM_STT = os.getenv("STREAM_STT", "")
+    STREAM_TTS = os.getenv("STREAM_TTS", "")
+    STREAM_MIN_PARTIAL_WORDS = int(os.getenv("STREAM_MIN_PARTIAL_WORDS", "3"))
+    STREAM_REUSE_THRESHOLD = float(os.getenv("STREAM_REUSE_THRESHOLD", "0.8"))
+    # Speculate only once partials pause this long, and at most this many times per question
+    STREAM_SPECULATION_DELAY = float(os.getenv("STREAM_SPECULATION_DELAY", "0.25"))
+    STREAM_MAX_SPECULATIONS = int(os.getenv("STREAM_MAX_SPECULATIONS", "3"))
+
+    # Webhooks answer within WEBHOOK_BUDGET seconds (Twilio gives up at 15); a slower
+    # answer keeps going for up to ANSWER_DEADLINE while the caller is on hold
+    WEBHOOK_BUDGET = float(os.getenv("WEBHOOK_BUDGET", "5"))
+    ANSWER_DEADLINE = float(os.getenv("ANSWER_DEADLINE", "20"))
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+
+    # Responses replayed when Twilio redelivers a webhook; set WEBHOOK_REPLAY_DB to share across workers
+    WEBHOOK_REPLAY_TTL = int(os.getenv("WEBHOOK_REPLAY_TTL", "300"))
+    WEBHOOK_REPLAY_DB = os.getenv("WEBHOOK_REPLAY_DB", "")
+
+    # Per-turn call traces in a JSON Lines file rotated at TRACE_LOG_MAX_BYTES; empty path disables them
+    TRACE_LOG_FILE = os.getenv("TRACE_LOG_FILE", "data/call_traces.jsonl")
+    TRACE_LOG_MAX_BYTES = int(os.getenv("TRACE_LOG_MAX_BYTES", "10000000"))
+    TRACE_LOG_BACKUPS = int(os.getenv("TRACE_LOG_BACKUPS", "5"))
+    # Turns slower than this are reported by /slow-turns
+    SLOW_TURN_SECONDS = float(os.getenv("SLOW_TURN_SECONDS", "2"))
+
+    # Speculative work on Gather partial speech results
+    PREFETCH_MIN_WORDS = int(os.getenv("PREFETCH_MIN_WORDS", "3"))
+    PREFETCH_REUSE_THRESHOLD = float(os.getenv("PREFETCH_REUSE_THRESHOLD", "0.8"))
+    PREFETCH_TTL = float(os.getenv("PREFETCH_TTL", "60"))
 
     # Gemini AI Configuration
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "8"))
+    GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "false").lower() == "true"
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+    # Admission control: token budget per minute (0 for none), and the queue for requests over the limits
+    GEMINI_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000"))
+    GEMINI_EXPECTED_OUTPUT_TOKENS = int(os.getenv("GEMINI_EXPECTED_OUTPUT_TOKENS", "200"))
+    GEMINI_QUEUE_SIZE = int(os.getenv("GEMINI_QUEUE_SIZE", "50"))
+    GEMINI_QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "3"))
+    # Shed requests get the closest FAQ answer above this similarity
+    SHED_MATCH_THRESHOLD = float(os.getenv("SHED_MATCH_THRESHOLD", "0.35"))
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    # Re-warm the connection when a call starts after this many idle seconds
+    GEMINI_WARMUP_INTERVAL = float(os.getenv("GEMINI_WARMUP_INTERVAL", "120"))
+    GEMINI_WARMUP_TIMEOUT = float(os.getenv("GEMINI_WARMUP_TIMEOUT", "3"))
+    # USD per million tokens, used for cost estimates
+    GEMINI_INPUT_PRICE_PER_MILLION = float(os.getenv("GEMINI_INPUT_PRICE_PER_MILLION", "0.075"))
+    GEMINI_OUTPUT_PRICE_PER_MILLION = float(os.getenv("GEMINI_OUTPUT_PRICE_PER_MILLION", "0.30"))
+
+    # Translation
+    TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+    TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "2048"))
+    TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "")
+    # Concurrent translations within this many seconds share one request
+    TRANSLATION_BATCH_WINDOW = float(os.getenv("TRANSLATION_BATCH_WINDOW", "0.01"))
+    TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "16"))
+
+    # Circuit breaker for external calls
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
 
     # Email Configuration
     GMAIL_ADDRESS = os.getenv("GMAIL_ADDRESS")
     GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
+    # Thank-you emails are queued here and sent by a background worker
+    EMAIL_QUEUE_DB = os.getenv("EMAIL_QUEUE_DB", "data/email_queue.db")
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_DELAY = float(os.getenv("EMAIL_RETRY_DELAY", "30"))
 
     # Data Storage
     KNOWLEDGE_BASE_FILE = "data/knowledge.txt"
+    KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "4"))
+    KNOWLEDGE_MAX_CHARS = int(os.getenv("KNOWLEDGE_MAX_CHARS", "4000"))
+    FAQ_ANSWERS_FILE = "data/faq_answers.json"
+    FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", "0.5"))
+    # Registered callers; the legacy CSV is imported into an empty database once
+    USER_DATA_DB = os.getenv("USER_DATA_DB", "data/user_data.db")
+    USER_DATA_BATCH_SIZE = int(os.getenv("USER_DATA_BATCH_SIZE", "20"))
+    USER_DATA_COMMIT_INTERVAL = float(os.getenv("USER_DATA_COMMIT_INTERVAL", "1"))
     USER_DATA_CSV = "data/user_data.csv"
+    # Call session state; set CALL_SESSION_DB to share sessions across workers
+    CALL_SESSION_TTL = int(os.getenv("CALL_SESSION_TTL", "3600"))
+    CALL_SESSION_DB = os.getenv("CALL_SESSION_DB", "")
     GOOGLE_CREDENTIALS_FILE = "credentials/lofty-seer-457323-p7-57f9ddecfb8b.json"
+    # Google Sheets rows are buffered and appended in batches
+    GOOGLE_SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME", "User data")
+    SHEETS_BATCH_SIZE = int(os.getenv("SHEETS_BATCH_SIZE", "50"))
+    SHEETS_FLUSH_INTERVAL = float(os.getenv("SHEETS_FLUSH_INTERVAL", "5"))
+    SHEETS_MAX_BUFFER = int(os.getenv("SHEETS_MAX_BUFFER", "1000"))
+    SHEETS_SPILL_FILE = os.getenv("SHEETS_SPILL_FILE", "data/sheets_spill.jsonl")
 
 
 settings = Settings()
@@ -0,0 +1,246 @@
+"""Simulate Twilio calls through the voice agent's call flows.
+
+Each virtual call starts at /voice-info or /voice-faq, parses the TwiML that
+comes back and does what Twilio would: follows <Redirect>, answers <Gather>
+with a synthetic Hindi SpeechResult posted to its action, and ends on
+<Hangup> or at the end of the document. Runs the app in-process with stub
+translation, Gemini, Sheets and SMTP backends by default:
+
+    python -m loadtest.call_flows --calls 2000 --concurrency 500 --flows info,faq
+
+Pass --url to drive a running server instead (with whatever backends it
+has). --think-time adds a pause before each webhook, standing in for the
+time Twilio spends speaking prompts and listening. Latency percentiles are
+reported per step (webhook path) and end to end per flow, the latter
+counting only time spent waiting on the agent.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+NAMES = [("राहुल", "rahul"), ("प्रिया", "priya"), ("अमित", "amit"), ("सुनीता", "sunita"), ("विकास", "vikas")]
+BLOOD_GROUPS = ["ओ पॉजिटिव", "बी पॉजिटिव", "ए नेगेटिव", "एबी पॉजिटिव", "ओ नेगेटिव"]
+QUESTIONS = [
+    "आपकी संस्था क्या काम करती है",
+    "आपके कौन कौन से कार्यक्रम हैं",
+    "मैं दान कैसे कर सकता हूँ",
+    "क्या आप गाँव के स्कूलों में कंप्यूटर लैब बनाते हैं",
+    "महिलाओं के लिए सिलाई का प्रशिक्षण कब शुरू होगा",
+]
+START_PATHS = {"info": "/voice-info", "faq": "/voice-faq"}
+MAX_STEPS = 40
+
+call_numbers = itertools.count(1)
+tokens = itertools.count(1)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Caller:
+    """Synthetic speech for one virtual caller, chosen by the Gather's action"""
+
+    def __init__(self, number, questions):
+        self.hindi_name, self.latin_name = random.choice(NAMES)
+        self.email = f"{self.latin_name} {number} at gmail dot com"
+        self.questions = random.randint(1, questions)
+        self.asked = 0
+
+    def speech(self, action):
+        path = urlsplit(action).path
+        if path in ("/handle-name", "/handle-info-name"):
+            return self.hindi_name
+        if path == "/handle-email":
+            return self.email
+        if path == "/handle-blood":
+            return random.choice(BLOOD_GROUPS)
+        if path == "/handle-faq":
+            self.asked += 1
+            return random.choice(QUESTIONS)
+        if path == "/handle-more-faq":
+            return "हां" if self.asked < self.questions else "नहीं"
+        return ""
+
+
+class Results:
+    def __init__(self):
+        self.steps = defaultdict(list)
+        self.step_errors = defaultdict(int)
+        self.calls = defaultdict(list)
+        self.outcomes = defaultdict(int)
+
+
+async def run_call(client, flow, think_time, questions, results):
+    number = next(call_numbers)
+    call_sid = f"CAsim{number:029d}"
+    caller = Caller(number, questions)
+    base_form = {
+        "CallSid": call_sid,
+        "AccountSid": "ACloadtest",
+        "From": f"+9199{number:08d}",
+        "To": "+911800000000",
+        "CallStatus": "in-progress",
+        "Direction": "outbound-api",
+    }
+    url, extra = START_PATHS[flow], {}
+    waited = 0.0
+    outcome = "too_many_steps"
+
+    for _ in range(MAX_STEPS):
+        if think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+        step = urlsplit(url).path
+        start = time.perf_counter()
+        try:
+            # Twilio sends a fresh token per webhook, which lets the replay cache work
+            response = await client.post(
+                url,
+                data={**base_form, **extra},
+                headers={"I-Twilio-Idempotency-Token": f"{call_sid}-{next(tokens)}"},
+            )
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+        except (httpx.HTTPError, ET.ParseError) as e:
+            results.step_errors[step] += 1
+            outcome = f"error: {type(e).__name__}"
+            break
+        elapsed = time.perf_counter() - start
+        results.steps[step].append(elapsed)
+        waited += elapsed
+
+        next_url = None
+        for verb in root:
+            if verb.tag == "Gather":
+                speech = caller.speech(verb.get("action", url))
+                next_url, extra = urljoin(url, verb.get("action", url)), {"SpeechResult": speech, "Confidence": "0.9"}
+                if speech:
+                    break
+                # No speech: Twilio falls through to the verbs after the Gather
+                next_url = None
+            elif verb.tag == "Redirect":
+                next_url, extra = urljoin(url, verb.text.strip()), {}
+                break
+            elif verb.tag == "Hangup":
+                break
+            elif verb.tag == "Connect":
+                outcome = "media_stream"
+                break
+        if next_url is None:
+            outcome = outcome if outcome == "media_stream" else "completed"
+            break
+        url = next_url
+
+    results.outcomes[f"{flow} {outcome}"] += 1
+    if outcome == "completed":
+        results.calls[flow].append(waited)
+
+
+async def run(client, flows, calls, concurrency, rate, think_time, questions):
+    results = Results()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(flow):
+        async with slots:
+            await run_call(client, flow, think_time, questions, results)
+
+    tasks = []
+    start = time.perf_counter()
+    for index in range(calls):
+        if rate:
+            # Start calls at a steady rate, like a campaign dialing out
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(flows[index % len(flows)])))
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+def print_table(title, rows):
+    print(f"\n{title:<22} {'n':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, values, errors in rows:
+        if not values:
+            print(f"{name:<22} {0:>6} {errors:>5}")
+            continue
+        print(
+            f"{name:<22} {len(values):>6} {errors:>5} "
+            f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+            f"{percentile(values, 99) * 1000:>8.1f} {max(values) * 1000:>8.1f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--flows", default="info,faq", help="Comma separated: info, faq")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100, help="Calls in progress at once")
+    parser.add_argument("--rate", type=float, default=0, help="New calls per second (0 starts them all at once)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds before each webhook")
+    parser.add_argument("--questions", type=int, default=2, help="Most FAQ questions per call")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--translate-latency", type=float, default=0.2)
+    parser.add_argument("--sheets-latency", type=float, default=0.3)
+    parser.add_argument("--smtp-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    flows = [flow.strip() for flow in args.flows.split(",") if flow.strip()]
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        startup = shutdown = None
+    else:
+        # Keep registrations, queued emails, spilled rows and traces out of data/
+        workdir = tempfile.mkdtemp(prefix="voice-loadtest-")
+        os.environ.setdefault("USER_DATA_DB", os.path.join(workdir, "user_data.db"))
+        os.environ.setdefault("EMAIL_QUEUE_DB", os.path.join(workdir, "email_queue.db"))
+        os.environ.setdefault("SHEETS_SPILL_FILE", os.path.join(workdir, "sheets_spill.jsonl"))
+        os.environ.setdefault("TRACE_LOG_FILE", os.path.join(workdir, "call_traces.jsonl"))
+        from loadtest.stubs import install_stubs
+        from app import app, shutdown_event, startup_event
+
+        install_stubs(args.llm_latency, args.translate_latency, args.sheets_latency, args.smtp_latency)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30
+        )
+        startup, shutdown = startup_event, shutdown_event
+
+    if startup:
+        await startup()
+    try:
+        async with client:
+            results, elapsed = await run(
+                client, flows, args.calls, args.concurrency, args.rate, args.think_time, args.questions
+            )
+    finally:
+        if shutdown:
+            await shutdown()
+
+    requests = sum(len(values) for values in results.steps.values())
+    print(f"{args.calls} calls, {requests} webhooks in {elapsed:.1f}s ({requests / elapsed:.1f} webhooks/s)")
+    for outcome, count in sorted(results.outcomes.items()):
+        print(f"  {outcome}: {count}")
+    print_table(
+        "step",
+        [(step, results.steps[step], results.step_errors[step])
+         for step in sorted(set(results.steps) | set(results.step_errors))],
+    )
+    print_table("end to end", [(flow, results.calls[flow], 0) for flow in flows])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
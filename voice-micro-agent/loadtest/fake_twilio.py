@@ -0,0 +1,109 @@
+"""Local stand-in for the Twilio Calls API, for testing outbound campaigns.
+
+    python -m loadtest.fake_twilio --port 8099 --busy 0.15 --no-answer 0.15
+
+Then start the agent with TWILIO_API_BASE=http://localhost:8099 and
+WEBHOOK_URL pointing at the agent. Each created call "rings" for a random
+time and then posts its final CallStatus to the StatusCallback URL, like
+Twilio does. GET /stats reports the peak calls per second and the peak
+number of live calls the fake saw, to check the campaign limits.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import deque
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Twilio")
+sids = itertools.count(1)
+outcomes = {"busy": 0.15, "no-answer": 0.15, "failed": 0.0}
+call_duration = (1.0, 5.0)
+created_at = deque()
+live = set()
+tasks = set()
+stats = {"created": 0, "peak_cps": 0, "peak_live": 0, "statuses": {}}
+callback_client = None
+
+
+def pick_status():
+    roll = random.random()
+    for status, share in outcomes.items():
+        if roll < share:
+            return status
+        roll -= share
+    return "completed"
+
+
+async def finish_call(sid, account_sid, callback_url):
+    await asyncio.sleep(random.uniform(*call_duration))
+    status = pick_status()
+    live.discard(sid)
+    stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+    if callback_url:
+        try:
+            await callback_client.post(
+                callback_url,
+                data={"CallSid": sid, "AccountSid": account_sid, "CallStatus": status},
+            )
+        except httpx.HTTPError as e:
+            print(f"Status callback to {callback_url} failed: {e}")
+
+
+@app.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+async def create_call(account_sid: str, request: Request):
+    global callback_client
+    if callback_client is None:
+        callback_client = httpx.AsyncClient(timeout=10)
+
+    form_data = await request.form()
+    sid = f"CAfake{next(sids):026d}"
+    now = time.monotonic()
+    created_at.append(now)
+    while created_at and created_at[0] <= now - 1.0:
+        created_at.popleft()
+    live.add(sid)
+    stats["created"] += 1
+    stats["peak_cps"] = max(stats["peak_cps"], len(created_at))
+    stats["peak_live"] = max(stats["peak_live"], len(live))
+
+    task = asyncio.ensure_future(finish_call(sid, account_sid, form_data.get("StatusCallback")))
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return JSONResponse(
+        status_code=201,
+        content={
+            "sid": sid,
+            "account_sid": account_sid,
+            "to": form_data.get("To"),
+            "from": form_data.get("From"),
+            "status": "queued",
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Calls/{sid}.json",
+        },
+    )
+
+
+@app.get("/stats")
+def get_stats():
+    return {**stats, "live": len(live)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--busy", type=float, default=0.15, help="Share of calls ending busy")
+    parser.add_argument("--no-answer", type=float, default=0.15, help="Share of calls not answered")
+    parser.add_argument("--failed", type=float, default=0.0, help="Share of calls that fail")
+    parser.add_argument("--min-duration", type=float, default=1.0)
+    parser.add_argument("--max-duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    outcomes.update({"busy": args.busy, "no-answer": args.no_answer, "failed": args.failed})
+    call_duration = (args.min_duration, args.max_duration)
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
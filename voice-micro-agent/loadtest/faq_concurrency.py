@@ -0,0 +1,100 @@
+"""Measure /handle-faq throughput as concurrency grows.
+
+Runs the app in-process with stub Gemini and translation backends by default:
+
+    python -m loadtest.faq_concurrency --levels 1,10,50 --llm-latency 1.0
+
+Pass --url to load test a running server with its real backends instead.
+If handlers block the event loop, throughput stays flat as concurrency
+rises; with non-blocking LLM calls it scales up to GEMINI_MAX_CONCURRENCY.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+call_ids = itertools.count(1)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def ask(client, latencies):
+    call_number = next(call_ids)
+    form = {
+        "CallSid": f"CAloadtest{call_number:08d}",
+        # Distinct questions so the translation cache does not hide the backend latency
+        "SpeechResult": f"आपकी संस्था क्या काम करती है {call_number}",
+    }
+    start = time.perf_counter()
+    response = await client.post("/handle-faq", data=form)
+    response.raise_for_status()
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_level(client, concurrency, total):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            await ask(client, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--levels", default="1,5,10,20")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per level")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--translate-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from loadtest.stubs import install_stubs
+        from app import app
+
+        install_stubs(args.llm_latency, args.translate_latency)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60
+        )
+
+    print(f"{'conc':>5} {'reqs':>5} {'req/s':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}")
+    async with client:
+        for level in [int(level) for level in args.levels.split(",")]:
+            result = await run_level(client, level, max(args.requests, level))
+            print(
+                f"{result['concurrency']:>5} {result['requests']:>5} "
+                f"{result['throughput']:>8.2f} {result['p50']:>7.2f} "
+                f"{result['p95']:>7.2f} {result['p99']:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
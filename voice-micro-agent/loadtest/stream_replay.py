@@ -0,0 +1,146 @@
+"""Replay a recorded call against the /media-stream WebSocket.
+
+Runs the app in-process with stub Gemini and translation backends by default:
+
+    python -m loadtest.stream_replay loadtest/recordings/two_questions.json --llm-latency 1.0
+
+Pass --url ws://localhost:8000/media-stream to replay against a running
+server. A recording is JSON with an "events" list; each event has an "at"
+offset in seconds and one of "media" (base64 mu-law audio, passed to the
+server's speech recognizer), "partial" or "final" (a transcript). When a
+recording has no media events, 20 ms silence frames are sent instead, so the
+server sees the same steady audio stream Twilio would send.
+
+For every final transcript the replay reports how long it took until the
+first sentence of the answer arrived, and until the whole answer had.
+"""
+import argparse
+import base64
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FRAME_SECONDS = 0.02
+SILENCE_FRAME = base64.b64encode(b"\xff" * 160).decode()
+
+
+def load_schedule(path):
+    """Return the recording's messages as (offset, message) pairs in time order"""
+    recording = json.loads(Path(path).read_text(encoding="utf-8"))
+    call_sid = recording.get("call_sid", "CAreplay")
+    stream_sid = f"MZ{call_sid[2:]}"
+    schedule = [(0.0, {"event": "start", "start": {"streamSid": stream_sid, "callSid": call_sid}})]
+    for event in recording["events"]:
+        if "media" in event:
+            message = {"event": "media", "media": {"payload": event["media"]}}
+        else:
+            final = "final" in event
+            message = {
+                "event": "transcript",
+                "transcript": {"text": event["final"] if final else event["partial"], "final": final},
+            }
+        schedule.append((event["at"], message))
+
+    if not any(message["event"] == "media" for _, message in schedule):
+        end = max(offset for offset, _ in schedule)
+        frames = int(end / FRAME_SECONDS)
+        schedule.extend(
+            (i * FRAME_SECONDS, {"event": "media", "media": {"payload": SILENCE_FRAME}})
+            for i in range(1, frames + 1)
+        )
+    schedule.sort(key=lambda item: item[0])
+    return stream_sid, schedule
+
+
+class Turn:
+    def __init__(self, question, final_at):
+        self.question = question
+        self.final_at = final_at
+        self.first_at = None
+        self.last_at = None
+        self.sentences = []
+
+
+def replay(send, receive, stream_sid, schedule, linger):
+    turns = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def listen():
+        while not done.is_set():
+            try:
+                message = json.loads(receive())
+            except Exception:
+                return
+            now = time.perf_counter()
+            if message.get("event") not in ("answer", "media"):
+                continue
+            with lock:
+                if not turns:
+                    continue
+                turn = turns[-1]
+                if turn.first_at is None:
+                    turn.first_at = now
+                turn.last_at = now
+                if message["event"] == "answer":
+                    turn.sentences.append(message["answer"]["text"])
+
+    listener = threading.Thread(target=listen, daemon=True)
+    listener.start()
+
+    start = time.perf_counter()
+    for offset, message in schedule:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if message["event"] == "transcript" and message["transcript"]["final"]:
+            with lock:
+                turns.append(Turn(message["transcript"]["text"], time.perf_counter()))
+        send(json.dumps(message, ensure_ascii=False))
+
+    # Let the last answer finish before hanging up
+    time.sleep(linger)
+    send(json.dumps({"event": "stop", "streamSid": stream_sid}))
+    done.set()
+    return turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recording")
+    parser.add_argument("--url", help="WebSocket URL of a running server's /media-stream")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--translate-latency", type=float, default=0.2)
+    parser.add_argument("--linger", type=float, default=3.0, help="Seconds to wait for the last answer")
+    args = parser.parse_args()
+
+    stream_sid, schedule = load_schedule(args.recording)
+    if args.url:
+        from websockets.sync.client import connect
+
+        with connect(args.url) as websocket:
+            turns = replay(websocket.send, websocket.recv, stream_sid, schedule, args.linger)
+    else:
+        from fastapi.testclient import TestClient
+        from loadtest.stubs import install_stubs
+        from app import app
+
+        install_stubs(args.llm_latency, args.translate_latency)
+        with TestClient(app) as client, client.websocket_connect("/media-stream") as websocket:
+            turns = replay(websocket.send_text, websocket.receive_text, stream_sid, schedule, args.linger)
+
+    print(f"{'turn':>4} {'first s':>8} {'full s':>7}  question")
+    for number, turn in enumerate(turns, 1):
+        first = f"{turn.first_at - turn.final_at:8.2f}" if turn.first_at else f"{'-':>8}"
+        full = f"{turn.last_at - turn.final_at:7.2f}" if turn.last_at else f"{'-':>7}"
+        print(f"{number:>4} {first} {full}  {turn.question}")
+        for sentence in turn.sentences:
+            print(f"{'':>22}> {sentence}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Stub backends for load testing the voice agent without external services.
+
+The stubs replace the third-party clients at their SDK boundary, so the
+agent's own code paths (executors, caches, concurrency limits) still run.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+STUB_ANSWER = "Sankalpiq Foundation शिक्षा, स्वास्थ्य और महिला सशक्तिकरण के क्षेत्र में काम करती है।"
+
+
+class StubGenerativeModel:
+    """Stands in for genai.GenerativeModel with a fixed generation latency"""
+
+    latency = 1.0
+
+    def __init__(self, model_name=None, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=STUB_ANSWER, usage_metadata=None)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        if stream:
+            return StubStream(self.latency)
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=STUB_ANSWER, usage_metadata=None)
+
+
+class StubStream:
+    """Streamed response: the first chunk after half the latency, the rest spread over the other half"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.usage_metadata = None
+
+    async def __aiter__(self):
+        words = STUB_ANSWER.split(" ")
+        chunks = [" ".join(words[i:i + 3]) + " " for i in range(0, len(words), 3)]
+        await asyncio.sleep(self.latency / 2)
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(self.latency / 2 / (len(chunks) - 1))
+            yield SimpleNamespace(text=chunk)
+
+
+class StubTranslator:
+    """Stands in for deep_translator.GoogleTranslator with a fixed blocking latency"""
+
+    latency = 0.2
+
+    def __init__(self, source="auto", target="en", **kwargs):
+        pass
+
+    def translate(self, text, **kwargs):
+        time.sleep(self.latency)
+        return f"[en] {text}"
+
+
+class StubWorksheet:
+    """Stands in for a gspread worksheet; appends take a fixed latency per request"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.rows = 0
+
+    def append_rows(self, rows, **kwargs):
+        time.sleep(self.latency)
+        self.rows += len(rows)
+
+
+class StubSMTP:
+    """Stands in for smtplib.SMTP; each message takes a fixed latency"""
+
+    latency = 0.2
+    sent = 0
+
+    def __init__(self, host=None, port=None, **kwargs):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return 250, b"OK"
+
+    def send_message(self, msg):
+        time.sleep(self.latency)
+        StubSMTP.sent += 1
+
+    def quit(self):
+        pass
+
+
+def install_stubs(llm_latency=1.0, translate_latency=0.2, sheets_latency=0.3, smtp_latency=0.2):
+    """Patch the imported services to use stub backends"""
+    from config.settings import settings
+    from services import email_service, gemini_service, translation_service
+    from services.sheets_sink import sheets_sink
+
+    StubGenerativeModel.latency = llm_latency
+    gemini_service.genai.GenerativeModel = StubGenerativeModel
+    gemini_service.gemini_model = None
+    StubTranslator.latency = translate_latency
+    translation_service.GoogleTranslator = StubTranslator
+    sheets_sink.worksheet = StubWorksheet(sheets_latency)
+    StubSMTP.latency = smtp_latency
+    email_service.smtplib.SMTP = StubSMTP
+    # Emails are only queued when credentials are configured
+    settings.GMAIL_ADDRESS = settings.GMAIL_ADDRESS or "loadtest@example.com"
+    settings.GMAIL_APP_PASSWORD = settings.GMAIL_APP_PASSWORD or "loadtest"
@@ -0,0 +1,74 @@
+"""Compare CPU cost of building TwiML per request against the precompiled responses.
+
+    python -m loadtest.twiml_benchmark --iterations 20000 --requests 2000
+
+The first table times rendering alone: the VoiceResponse tree built and
+serialized per request (the old handlers) against the bytes and templates
+compiled at import. The second drives the static endpoints in-process and
+reports CPU time per request for the whole handler.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from routes import faq_routes  # noqa: E402
+
+SAMPLE_ANSWER = "हमारे तीन मुख्य कार्यक्रम हैं: शिक्षा, स्वास्थ्य और आजीविका।"
+
+CASES = [
+    ("thank-you", faq_routes._thank_you, {}, lambda: faq_routes.THANK_YOU),
+    ("greeting", faq_routes._greeting, {"attempt": 1}, lambda: faq_routes.GREETING.render(attempt=1)),
+    ("name hangup", faq_routes._name_hangup, {}, lambda: faq_routes.NAME_HANGUP),
+    ("introduction", faq_routes._introduction, {"name": "सीता"}, lambda: faq_routes.INTRODUCTION.render(name="सीता")),
+    ("answer", faq_routes._answer, {"answer": SAMPLE_ANSWER}, lambda: faq_routes.ANSWER.render(answer=SAMPLE_ANSWER)),
+]
+
+
+def cpu_per_call(func, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations
+
+
+async def endpoint_cpu(client, path, total):
+    start = time.process_time()
+    for _ in range(total):
+        response = await client.post(path)
+        response.raise_for_status()
+    return (time.process_time() - start) / total
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    print(f"{'response':<14} {'tree us':>9} {'compiled us':>12} {'speedup':>8}")
+    for name, build, values, compiled in CASES:
+        tree = cpu_per_call(lambda: str(build(**values)).encode("utf-8"), args.iterations)
+        fast = cpu_per_call(compiled, args.iterations)
+        print(f"{name:<14} {tree * 1e6:>9.1f} {fast * 1e6:>12.2f} {tree / fast:>7.0f}x")
+
+    from loadtest.stubs import install_stubs
+    from app import app
+
+    # /voice-faq schedules a Gemini warm-up, keep it off the network
+    install_stubs(llm_latency=0, translate_latency=0)
+    transport = httpx.ASGITransport(app=app)
+    print(f"\n{'endpoint':<17} {'cpu us/req':>11}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        for path in ["/thank-you", "/voice-faq", "/handle-more-faq"]:
+            cpu = await endpoint_cpu(client, path, args.requests)
+            print(f"{path:<17} {cpu * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,22 +1,85 @@
+import io
+from typing import Optional
 from fastapi import APIRouter
+from fastapi.responses import Response
 from services.twilio_service import make_faq_outbound_call , make_info_outbound_call
+from services.gemini_service import gemini_admission, token_meter
+from services.faq_index import faq_index
+from services.answer_service import latency_report
+from config.settings import settings
+from services.prefetch_service import speculative_prefetch
+from services.trace_service import trace_log
+from services.user_store import user_store
 
 api_router = APIRouter()
 
 @api_router.get("/make-faq-call")
-def trigger_faq_call():
+async def trigger_faq_call():
     """Triggers an outbound call"""
-    result = make_faq_outbound_call()
+    result = await make_faq_outbound_call()
     if result["success"]:
         return {"message": "Faq Call initiated successfully!", "sid": result["sid"]}
     else:
         return {"message": "Error making faq call", "error": result["error"]}
     
 @api_router.get("/make-info-call")
-def trigger_info_call():
+async def trigger_info_call():
     """Triggers an outbound call"""
-    result = make_info_outbound_call()
+    result = await make_info_outbound_call()
     if result["success"]:
         return {"message": "Info Call initiated successfully!", "sid": result["sid"]}
     else:
-        return {"message": "Error making info call", "error": result["error"]}
\ No newline at end of file
+        return {"message": "Error making info call", "error": result["error"]}
+
+@api_router.get("/llm-usage")
+def llm_usage():
+    """Token and cost totals per agent, endpoint and day"""
+    rows = token_meter.summary()
+    return {
+        "usage": rows,
+        "total_cost_usd": round(sum(row["cost_usd"] for row in rows), 6),
+    }
+
+@api_router.get("/llm-admission")
+def llm_admission():
+    """Gemini admission control: in flight, queued, admitted and shed requests"""
+    return gemini_admission.report()
+
+@api_router.get("/faq-stats")
+def faq_stats():
+    """Hit rate and latency saved by the precomputed FAQ answer index"""
+    return faq_index.report()
+
+@api_router.get("/prefetch-stats")
+def prefetch_stats():
+    """How often speculative work from partial speech results was reused"""
+    return speculative_prefetch.report()
+
+@api_router.get("/answer-latency")
+def answer_latency():
+    """Gemini answer latency for the first question on a call versus later ones"""
+    return latency_report()
+
+@api_router.get("/call-trace/{call_sid}")
+def call_trace(call_sid: str):
+    """Every turn of one call: speech, translated and formatted fields, and stage timings"""
+    return trace_log.timeline(call_sid)
+
+@api_router.get("/slow-turns")
+def slow_turns(threshold: Optional[float] = None, limit: int = 20):
+    """Turns slower than threshold seconds, by endpoint and stage, with the slowest ones"""
+    return {
+        **trace_log.slow_turns(settings.SLOW_TURN_SECONDS if threshold is None else threshold, limit),
+        "log": trace_log.status(),
+    }
+
+@api_router.get("/export-user-data")
+def export_user_data():
+    """All registered callers as CSV, in the layout of the old user_data.csv"""
+    buffer = io.StringIO()
+    user_store.export_csv(buffer)
+    return Response(
+        content=buffer.getvalue(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=user_data.csv"},
+    )
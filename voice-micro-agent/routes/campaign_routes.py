@@ -0,0 +1,70 @@
+from typing import List
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from pydantic import BaseModel
+from services.campaign_service import FLOWS, campaign_scheduler, normalize_number, parse_numbers
+
+campaign_router = APIRouter()
+
+
+class CampaignRequest(BaseModel):
+    numbers: List[str]
+    flow: str = "faq"
+    name: str = ""
+
+
+def start_campaign(flow, numbers, name):
+    if flow not in FLOWS:
+        raise HTTPException(status_code=400, detail=f"flow must be one of: {', '.join(FLOWS)}")
+    if not any(normalize_number(number) for number in numbers):
+        raise HTTPException(status_code=400, detail="No valid phone numbers given")
+    campaign = campaign_scheduler.create(flow, numbers, name)
+    return {**campaign.progress(), "invalid": campaign.invalid}
+
+
+@campaign_router.post("/campaigns")
+async def create_campaign(body: CampaignRequest):
+    """Start dialing a list of numbers"""
+    return start_campaign(body.flow, body.numbers, body.name)
+
+
+@campaign_router.post("/campaigns/upload")
+async def upload_campaign(file: UploadFile = File(...), flow: str = Form("faq"), name: str = Form("")):
+    """Start dialing the numbers in a text or CSV file, one per line"""
+    text = (await file.read()).decode("utf-8-sig")
+    return start_campaign(flow, parse_numbers(text), name or file.filename)
+
+
+@campaign_router.get("/campaigns")
+def list_campaigns():
+    return {
+        "scheduler": campaign_scheduler.status(),
+        "campaigns": [campaign.progress() for campaign in campaign_scheduler.campaigns.values()],
+    }
+
+
+@campaign_router.get("/campaigns/{campaign_id}")
+def get_campaign(campaign_id: str, numbers: bool = False):
+    """Progress of one campaign, with per-number state when numbers=true"""
+    campaign = campaign_scheduler.campaigns.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    result = campaign.progress()
+    if numbers:
+        result["entries"] = list(campaign.entries.values())
+        result["invalid"] = campaign.invalid
+    return result
+
+
+@campaign_router.post("/campaigns/{campaign_id}/cancel")
+def cancel_campaign(campaign_id: str):
+    if campaign_id not in campaign_scheduler.campaigns:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign_scheduler.cancel(campaign_id).progress()
+
+
+@campaign_router.post("/campaign-status")
+async def campaign_status(request: Request):
+    """Twilio status callback for campaign calls"""
+    form_data = await request.form()
+    campaign_scheduler.handle_status(form_data.get("CallSid", ""), form_data.get("CallStatus", ""))
+    return {"status": "ok"}
@@ -1,47 +1,160 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import Response
+import time
+from fastapi import APIRouter, Request, Response
 from twilio.twiml.voice_response import VoiceResponse, Gather
-import urllib.parse
-from services.translation_service import translate_to_english
-from services.gemini_service import get_knowledge_base_response
+from services.translation_service import translate_to_english_async
+from config.settings import settings
+from services.answer_service import answer_question, pending_answers
+from services.idempotency_service import idempotent
+from services.prefetch_service import partial_text, speculative_prefetch
+from services.session_service import call_sessions
+from services.trace_service import annotate, traced
+from services.gemini_service import schedule_warm_up
+from utils.metrics import call_flow_steps
+from utils.twiml import (
+    ERROR_TWIML,
+    TwimlTemplate,
+    compile_static,
+    say_hindi,
+    twiml_response,
+)
 
 
 voice_router = APIRouter()
 
 
+def _greeting(attempt):
+    response = VoiceResponse()
+    gather = Gather(
+        input="speech",
+        action=f"/handle-name?attempt={attempt}",
+        method="POST",
+        timeout=5,
+        language="hi-IN",
+    )
+    say_hindi(
+        gather,
+        "नमस्ते! मैं Sankalpiq Foundation से Aditi बात कर रही हूँ यह कॉल आपकी सहायता और मार्गदर्शन के लिए है कृपया अपना नाम बताइए।",
+    )
+    response.append(gather)
+    response.redirect(f"/handle-name?attempt={attempt}")
+    return response
+
+
+def _name_retry(next_attempt):
+    response = VoiceResponse()
+    say_hindi(
+        response,
+        "माफ कीजिए, हमें आपकी आवाज़ स्पष्ट रूप से सुनाई नहीं दी एक बार फिर कोशिश करते हैं कृपया अपना नाम बताएं।",
+    )
+    response.redirect(f"/voice-faq?attempt={next_attempt}")
+    return response
+
+
+def _name_hangup():
+    response = VoiceResponse()
+    say_hindi(
+        response,
+        "हमें आपका नाम नहीं मिला। कोई बात नहीं, हम बाद में फिर से प्रयास करेंगे कॉल समाप्त की जा रही है।",
+    )
+    response.hangup()
+    return response
+
+
+def _introduction(name):
+    response = VoiceResponse()
+    gather = Gather(
+        input="speech",
+        action="/handle-faq",
+        method="POST",
+        timeout=10,
+        language="hi-IN",
+        partial_result_callback="/faq-partial",
+        partial_result_callback_method="POST",
+    )
+    say_hindi(
+        gather,
+        f"नमस्ते {name} Sankalpiq Foundation एक सामाजिक संस्था है जो शिक्षा, स्वास्थ्य और महिला सशक्तिकरण के क्षेत्र में काम करती है| आप हमारे कार्यों के बारे में क्या जानना चाहेंगे?",
+    )
+    response.append(gather)
+    response.redirect("/thank-you")
+    return response
+
+
+def _answer(answer):
+    response = VoiceResponse()
+    say_hindi(response, answer)
+    gather = Gather(
+        input="speech",
+        action="/handle-more-faq",
+        method="POST",
+        timeout=5,
+        language="hi-IN",
+    )
+    say_hindi(
+        gather,
+        "क्या आप Sankalpiq Foundation के किसी अन्य कार्यक्रम के बारे में जानना चाहते हैं? कृपया हाँ या ना कहें।",
+    )
+    response.append(gather)
+    response.redirect("/thank-you")
+    return response
+
+
+def _hold(text):
+    response = VoiceResponse()
+    say_hindi(response, text)
+    response.redirect("/faq-hold")
+    return response
+
+
+def _redirect(url):
+    response = VoiceResponse()
+    response.redirect(url)
+    return response
+
+
+def _thank_you():
+    response = VoiceResponse()
+    say_hindi(response, "Sankalpiq Foundation की ओर से आपका समय देने के लिए धन्यवाद")
+    response.hangup()
+    return response
+
+
+# Serialized once at import; handlers only fill in the per-call values
+GREETING = TwimlTemplate(_greeting, "attempt")
+NAME_RETRY = TwimlTemplate(_name_retry, "next_attempt")
+NAME_HANGUP = compile_static(_name_hangup)
+INTRODUCTION = TwimlTemplate(_introduction, "name")
+ANSWER = TwimlTemplate(_answer, "answer")
+HOLD = compile_static(lambda: _hold("कृपया एक क्षण रुकिए, मैं आपके सवाल का जवाब ढूंढ रही हूँ।"))
+HOLD_AGAIN = compile_static(lambda: _hold("बस एक क्षण।"))
+TO_VOICE_NGO = compile_static(lambda: _redirect("/voice-ngo"))
+TO_THANK_YOU = compile_static(lambda: _redirect("/thank-you"))
+THANK_YOU = compile_static(_thank_you)
+
+
 @voice_router.post("/voice-faq")
+@traced
 async def voice(request: Request):
     """Initial voice endpoint"""
     try:
         params = dict(request.query_params)
         attempt = int(params.get("attempt", 1))
+        if attempt == 1:
+            call_flow_steps.inc("faq", "call")
 
-        response = VoiceResponse()
-        gather = Gather(
-            input="speech",
-            action=f"/handle-name?attempt={attempt}",
-            method="POST",
-            timeout=5,
-            language="hi-IN",
-        )
-        gather.say(
-            "<speak><prosody rate='fast'>नमस्ते! मैं Sankalpiq Foundation से Aditi बात कर रही हूँ यह कॉल आपकी सहायता और मार्गदर्शन के लिए है कृपया अपना नाम बताइए।</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True,
-        )
-        response.append(gather)
-        response.redirect(f"/handle-name?attempt={attempt}")
+        # The caller is listening to the greeting, time enough to open the LLM connection
+        schedule_warm_up()
 
-        return Response(content=str(response), media_type="application/xml")
+        return twiml_response(GREETING.render(attempt=attempt))
     except Exception as e:
         print(f"Error in voice endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 
 @voice_router.post("/handle-name")
+@idempotent
+@traced
 async def handle_name(request: Request):
     """Handle name input"""
     try:
@@ -49,160 +162,160 @@ async def handle_name(request: Request):
         speech_result = form_data.get("SpeechResult", "")
         attempt = int(request.query_params.get("attempt", 1))
 
-        response = VoiceResponse()
-
         if speech_result:
-            translated_name = translate_to_english(speech_result)
+            translated_name = await translate_to_english_async(speech_result)
             print(f"User's name: {translated_name} (Original: {speech_result})")
+            annotate(translated=translated_name)
+            call_flow_steps.inc("faq", "name")
 
-            encoded_name = urllib.parse.quote(speech_result)
-            response.redirect(f"/voice-ngo?name={encoded_name}")
-        elif attempt < 2:
-            response.say(
-                "<speak><prosody rate='fast'>माफ कीजिए, हमें आपकी आवाज़ स्पष्ट रूप से सुनाई नहीं दी एक बार फिर कोशिश करते हैं कृपया अपना नाम बताएं।</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True,
+            call_sessions.update(
+                form_data.get("CallSid", ""),
+                name=speech_result,
+                translated_name=translated_name,
             )
-            response.redirect(f"/voice-faq?attempt={attempt + 1}")
+            return twiml_response(TO_VOICE_NGO)
+        elif attempt < 2:
+            return twiml_response(NAME_RETRY.render(next_attempt=attempt + 1))
         else:
-            response.say(
-                "<speak><prosody rate='fast'>हमें आपका नाम नहीं मिला। कोई बात नहीं, हम बाद में फिर से प्रयास करेंगे कॉल समाप्त की जा रही है।</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True,
-            )
-            response.hangup()
-
-        return Response(content=str(response), media_type="application/xml")
+            return twiml_response(NAME_HANGUP)
     except Exception as e:
         print(f"Error in handle-name endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 
 @voice_router.post("/voice-ngo")
+@traced
 async def voice_coding_ninjas(request: Request):
     """Coding Ninjas bot introduction"""
     try:
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-
-        response = VoiceResponse()
-        gather = Gather(
-            input="speech",
-            action=f"/handle-faq?name={urllib.parse.quote(name)}",
-            method="POST",
-            timeout=10,
-            language="hi-IN",
-        )
-        gather.say(
-            f"<speak><prosody rate='fast'>नमस्ते {name} Sankalpiq Foundation एक सामाजिक संस्था है जो शिक्षा, स्वास्थ्य और महिला सशक्तिकरण के क्षेत्र में काम करती है| आप हमारे कार्यों के बारे में क्या जानना चाहेंगे?</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True,
-        )
-        response.append(gather)
-        response.redirect(f"/thank-you?name={urllib.parse.quote(name)}")
+        form_data = await request.form()
+        name = call_sessions.get(form_data.get("CallSid", "")).get("name", "")
 
-        return Response(content=str(response), media_type="application/xml")
+        return twiml_response(INTRODUCTION.render(name=name))
     except Exception as e:
         print(f"Error in voice-coding-ninjas endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
+
+
+async def _prefetched_answer(call_sid, question):
+    prepared = await speculative_prefetch.take(call_sid, question)
+    return await answer_question(question, call_sid, prepared)
 
 
 @voice_router.post("/handle-faq")
+@idempotent
+@traced
 async def handle_coding_question(request: Request):
     """Handle coding questions"""
+    received_at = time.monotonic()
     try:
         form_data = await request.form()
         question = form_data.get("SpeechResult", "")
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-
-        response = VoiceResponse()
+        call_sid = form_data.get("CallSid", "")
 
         if question:
-            translated_question = translate_to_english(question)
-            print(f"User's question: {translated_question} (Original: {question})")
-
-            answer = await get_knowledge_base_response(translated_question)
+            call_flow_steps.inc("faq", "question")
+            pending_answers.start(call_sid, question, lambda: _prefetched_answer(call_sid, question))
+            answer = await pending_answers.wait(
+                call_sid, settings.WEBHOOK_BUDGET - (time.monotonic() - received_at)
+            )
+            if answer is not None:
+                pending_answers.count("on_time")
+                annotate(outcome="on_time")
+            elif call_sid and pending_answers.can_hold(call_sid):
+                # Out of budget: keep the caller on the line while the answer finishes
+                pending_answers.count("held")
+                annotate(outcome="held")
+                return twiml_response(HOLD)
+            else:
+                answer = pending_answers.fallback(call_sid, question)
+                annotate(outcome="fallback")
             print(f"AI response: {answer}")
+            annotate(answer=answer)
 
-            response.say(
-                f"<speak><prosody rate='fast'>{answer}</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True,
-            )
+            return twiml_response(ANSWER.render(answer=answer))
+        else:
+            speculative_prefetch.discard(call_sid)
+            return twiml_response(TO_THANK_YOU)
+    except Exception as e:
+        print(f"Error in handle-coding-question endpoint: {e}")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
-            gather = Gather(
-                input="speech",
-                action=f"/handle-more-faq?name={urllib.parse.quote(name)}",
-                method="POST",
-                timeout=5,
-                language="hi-IN",
-            )
-            gather.say(
-                "<speak><prosody rate='fast'>क्या आप Sankalpiq Foundation के किसी अन्य कार्यक्रम के बारे में जानना चाहते हैं? कृपया हाँ या ना कहें।</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True,
-            )
-            response.append(gather)
-            response.redirect(f"/thank-you?name={urllib.parse.quote(name)}")
+
+@voice_router.post("/faq-partial")
+async def faq_partial(request: Request):
+    """Interim transcripts from the question Gather; starts preparing the answer early"""
+    try:
+        form_data = await request.form()
+        text = partial_text(
+            form_data.get("StableSpeechResult", ""), form_data.get("UnstableSpeechResult", "")
+        )
+        speculative_prefetch.submit(
+            form_data.get("CallSid", ""), text, int(form_data.get("SequenceNumber", 0) or 0)
+        )
+    except Exception as e:
+        print(f"Error in faq-partial endpoint: {e}")
+    # Twilio ignores the body of partial result callbacks
+    return Response(status_code=204)
+
+
+@voice_router.post("/faq-hold")
+@idempotent
+@traced
+async def faq_hold(request: Request):
+    """Hold loop: play the answer once it is ready, within the same per-webhook budget"""
+    received_at = time.monotonic()
+    try:
+        form_data = await request.form()
+        call_sid = form_data.get("CallSid", "")
+        question = pending_answers.question(call_sid)
+
+        answer = await pending_answers.wait(
+            call_sid, settings.WEBHOOK_BUDGET - (time.monotonic() - received_at)
+        )
+        if answer is not None:
+            pending_answers.count("answered_after_hold")
+            annotate(outcome="answered_after_hold")
+        elif pending_answers.can_hold(call_sid):
+            annotate(outcome="held")
+            return twiml_response(HOLD_AGAIN)
         else:
-            response.redirect(f"/thank-you?name={urllib.parse.quote(name)}")
+            answer = pending_answers.fallback(call_sid, question)
+            annotate(outcome="fallback")
+        print(f"AI response: {answer}")
+        annotate(question=question, answer=answer)
 
-        return Response(content=str(response), media_type="application/xml")
+        return twiml_response(ANSWER.render(answer=answer))
     except Exception as e:
-        print(f"Error in handle-coding-question endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        print(f"Error in faq-hold endpoint: {e}")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 
 @voice_router.post("/handle-more-faq")
+@traced
 async def handle_more_coding_questions(request: Request):
     """Handle follow-up questions"""
     try:
         form_data = await request.form()
         answer = form_data.get("SpeechResult", "").lower()
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-
-        response = VoiceResponse()
 
         if answer and ("हां" in answer or "yes" in answer or "ha" in answer):
-            response.redirect(f"/voice-ngo?name={urllib.parse.quote(name)}")
+            call_flow_steps.inc("faq", "follow_up")
+            return twiml_response(TO_VOICE_NGO)
         else:
-            response.redirect(f"/thank-you?name={urllib.parse.quote(name)}")
-
-        return Response(content=str(response), media_type="application/xml")
+            return twiml_response(TO_THANK_YOU)
     except Exception as e:
         print(f"Error in handle-more-coding-questions endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 
 @voice_router.post("/thank-you")
+@traced
 async def thank_you(request: Request):
     """Thank you and goodbye"""
-    try:
-
-        response = VoiceResponse()
-        response.say(
-            "<speak><prosody rate='fast'>Sankalpiq Foundation की ओर से आपका समय देने के लिए धन्यवाद</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True,
-        )
-        response.hangup()
-
-        return Response(content=str(response), media_type="application/xml")
-    except Exception as e:
-        print(f"Error in thank-you endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+    return twiml_response(THANK_YOU)
@@ -1,231 +1,255 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import Response
 from twilio.twiml.voice_response import VoiceResponse, Gather
-import urllib.parse
-from services.translation_service import translate_to_english
-from services.data_service import save_user_data_to_csv, save_user_data_to_sheet
+from services.translation_service import translate_to_english_async
+from services.data_service import save_user_data, save_user_data_to_sheet
+from services.idempotency_service import idempotent
+from services.session_service import call_sessions
+from services.trace_service import annotate, stage, traced
 from utils.formatters import format_email, format_blood_group
+from utils.metrics import call_flow_steps
+from utils.twiml import ERROR_TWIML, TwimlTemplate, compile_static, say_hindi, twiml_response
 
 
 voice_router = APIRouter()
 
+def _prompt(action, text):
+    response = VoiceResponse()
+    gather = Gather(
+        input="speech",
+        action=action,
+        method="POST",
+        timeout=5,
+        language="hi-IN"
+    )
+    say_hindi(gather, text)
+    response.append(gather)
+    # Fallback if no input is received after Gather
+    response.redirect(action)
+    return response
+
+def _say_and_redirect(text, url):
+    response = VoiceResponse()
+    say_hindi(response, text)
+    response.redirect(url)
+    return response
+
+def _say_and_hangup(text):
+    response = VoiceResponse()
+    say_hindi(response, text)
+    response.hangup()
+    return response
+
+def _redirect(url):
+    response = VoiceResponse()
+    response.redirect(url)
+    return response
+
+# Serialized once at import; handlers only fill in the per-call values
+GREETING = TwimlTemplate(
+    lambda attempt: _prompt(
+        f"/handle-info-name?attempt={attempt}",
+        "नमस्ते! मैं sankalpiq फाउंडेशन से बात कर rahi हूँ। कृपया अपना नाम बताइए।",
+    ),
+    "attempt",
+)
+NAME_RETRY = TwimlTemplate(
+    lambda next_attempt: _say_and_redirect(
+        "माफ कीजिए, हमें आपकी आवाज़ सुनाई नहीं दी। एक बार फिर कोशिश करते हैं।",
+        f"/voice-info?attempt={next_attempt}",
+    ),
+    "next_attempt",
+)
+NAME_HANGUP = compile_static(
+    lambda: _say_and_hangup(
+        "हमें आपका नाम नहीं मिला। कॉल समाप्त की जा रही है। फाउंडेशन से संपर्क करने के लिए धन्यवाद।"
+    )
+)
+TO_VOICE_EMAIL = compile_static(lambda: _redirect("/voice-email"))
+EMAIL_PROMPT = TwimlTemplate(
+    lambda name: _prompt(
+        "/handle-email",
+        f"धन्यवाद {name}। humari फाउंडेशन के साथ जुड़ने के लिए, कृपया अपना ईमेल पता बताइए।",
+    ),
+    "name",
+)
+EMAIL_MISSING = TwimlTemplate(
+    lambda name: _say_and_hangup(
+        f"{name}, माफ कीजिए, ईमेल नहीं मिला। कॉल समाप्त की जा रही है। फाउंडेशन से संपर्क करने के लिए धन्यवाद।"
+    ),
+    "name",
+)
+TO_VOICE_BLOOD = compile_static(lambda: _redirect("/voice-blood"))
+BLOOD_PROMPT = TwimlTemplate(
+    lambda name: _prompt(
+        "/handle-blood",
+        f"शुक्रिया {name}! कृपया अपना blood group बताइए। यह जानकारी फाउंडेशन के पास सुरक्षित रहेगी।",
+    ),
+    "name",
+)
+BLOOD_SAVED = TwimlTemplate(
+    lambda name: _say_and_hangup(
+        f"धन्यवाद {name}, आपकी जानकारी प्फाउंडेशन में सुरक्षित कर ली गई है। हमारी टीम जल्द ही आपसे संपर्क करेगी। आपके सहयोग के लिए हार्दिक आभार।"
+    ),
+    "name",
+)
+BLOOD_MISSING = TwimlTemplate(
+    lambda name: _say_and_hangup(
+        f"{name}, रक्त समूह प्राप्त नहीं हुआ, फिर भी आपकी जानकारी हमारे पास सुरक्षित है। प्रीरित फाउंडेशन से जुड़ने के लिए धन्यवाद।"
+    ),
+    "name",
+)
+
 @voice_router.post("/voice-info")
+@traced
 async def voice(request: Request):
     try:
         params = dict(request.query_params)
         attempt = int(params.get("attempt", 1))
+        if attempt == 1:
+            call_flow_steps.inc("info", "call")
 
-        response = VoiceResponse()
-        gather = Gather(
-            input="speech",
-            action=f"/handle-info-name?attempt={attempt}",
-            method="POST",
-            timeout=5,
-            language="hi-IN"
-        )
-        gather.say(
-            "<speak><prosody rate='fast'>नमस्ते! मैं sankalpiq फाउंडेशन से बात कर rahi हूँ। कृपया अपना नाम बताइए।</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True
-        )
-        response.append(gather)
-
-        # Fallback if no input is received after Gather
-        response.redirect(f"/handle-info-name?attempt={attempt}")
-        
-        return Response(content=str(response), media_type="application/xml")
+        return twiml_response(GREETING.render(attempt=attempt))
     except Exception as e:
         print(f"Error in voice endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 @voice_router.post("/handle-info-name")
+@idempotent
+@traced
 async def handle_name(request: Request):
     try:
         form_data = await request.form()
         speech_result = form_data.get("SpeechResult", "")
         attempt = int(request.query_params.get("attempt", 1))
 
-        response = VoiceResponse()
-
         if speech_result:
-            translated_name = translate_to_english(speech_result)
+            translated_name = await translate_to_english_async(speech_result)
             print(f"User's name: {translated_name} (Original: {speech_result})")
-            
-            # URL encode the name to avoid issues with special characters
-            encoded_name = urllib.parse.quote(speech_result)
-            response.redirect(f"/voice-email?name={encoded_name}")
-        elif attempt < 2:
-            response.say(
-                "<speak><prosody rate='fast'>माफ कीजिए, हमें आपकी आवाज़ सुनाई नहीं दी। एक बार फिर कोशिश करते हैं।</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True
+            annotate(translated=translated_name)
+            call_flow_steps.inc("info", "name")
+
+            # Keep both forms for later steps instead of passing them in the URL
+            call_sessions.update(
+                form_data.get("CallSid", ""),
+                name=speech_result,
+                translated_name=translated_name,
             )
-            response.redirect(f"/voice-info?attempt={attempt + 1}")
+            return twiml_response(TO_VOICE_EMAIL)
+        elif attempt < 2:
+            return twiml_response(NAME_RETRY.render(next_attempt=attempt + 1))
         else:
-            response.say(
-                "<speak><prosody rate='fast'>हमें आपका नाम नहीं मिला। कॉल समाप्त की जा रही है। फाउंडेशन से संपर्क करने के लिए धन्यवाद।</prosody></speak>",
-                voice="Polly.Aditi",
-                language="hi-IN",
-                ssml=True
-            )
-            response.hangup()
-
-        return Response(content=str(response), media_type="application/xml")
+            return twiml_response(NAME_HANGUP)
     except Exception as e:
         print(f"Error in handle-name endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 @voice_router.post("/voice-email")
+@traced
 async def voice_email(request: Request):
     try:
-        name = request.query_params.get("name", "")
-        name = urllib.parse.unquote(name)
-
-        response = VoiceResponse()
-        gather = Gather(
-            input="speech",
-            action=f"/handle-email?name={urllib.parse.quote(name)}",
-            method="POST",
-            timeout=5,
-            language="hi-IN"
-        )
-        gather.say(
-            f"<speak><prosody rate='fast'>धन्यवाद {name}। humari फाउंडेशन के साथ जुड़ने के लिए, कृपया अपना ईमेल पता बताइए।</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True
-        )
-        response.append(gather)
-        response.redirect(f"/handle-email?name={urllib.parse.quote(name)}")
-
-        return Response(content=str(response), media_type="application/xml")
+        form_data = await request.form()
+        name = call_sessions.get(form_data.get("CallSid", "")).get("name", "")
+
+        return twiml_response(EMAIL_PROMPT.render(name=name))
     except Exception as e:
         print(f"Error in voice-email endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 @voice_router.post("/handle-email")
+@idempotent
+@traced
 async def handle_email(request: Request):
     try:
         form_data = await request.form()
         email = form_data.get("SpeechResult", "")
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-
-        response = VoiceResponse()
+        call_sid = form_data.get("CallSid", "")
+        name = call_sessions.get(call_sid).get("name", "")
 
         if email:
-             translated_email = translate_to_english(email)
-             formatted_email = format_email(translated_email)
-             print(f"User's email: {translated_email} (Original: {email})")
-             print(f"Formatted email: {formatted_email}")
-             response.redirect(f"/voice-blood?name={urllib.parse.quote(name)}&email={urllib.parse.quote(email)}")
-        else:
-            response.say(
-                f"<speak><prosody rate='fast'>{name}, माफ कीजिए, ईमेल नहीं मिला। कॉल समाप्त की जा रही है। फाउंडेशन से संपर्क करने के लिए धन्यवाद।</prosody></speak>",
-                voice="Polly.Aditi", language="hi-IN", ssml=True
+            translated_email = await translate_to_english_async(email)
+            formatted_email = format_email(translated_email)
+            print(f"User's email: {translated_email} (Original: {email})")
+            print(f"Formatted email: {formatted_email}")
+            annotate(translated=translated_email, formatted_email=formatted_email)
+            call_flow_steps.inc("info", "email")
+            call_sessions.update(
+                call_sid,
+                email=email,
+                translated_email=translated_email,
+                formatted_email=formatted_email,
             )
-            response.hangup()
-
-        return Response(content=str(response), media_type="application/xml")
+            return twiml_response(TO_VOICE_BLOOD)
+        else:
+            return twiml_response(EMAIL_MISSING.render(name=name))
     except Exception as e:
         print(f"Error in handle-email endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 @voice_router.post("/voice-blood")
+@traced
 async def voice_blood(request: Request):
     try:
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-        email = urllib.parse.unquote(request.query_params.get("email", ""))
-
-        response = VoiceResponse()
-        gather = Gather(
-            input="speech",
-            action=f"/handle-blood?name={urllib.parse.quote(name)}&email={urllib.parse.quote(email)}",
-            method="POST",
-            timeout=5,
-            language="hi-IN"
-        )
-        gather.say(
-            f"<speak><prosody rate='fast'>शुक्रिया {name}! कृपया अपना blood group बताइए। यह जानकारी फाउंडेशन के पास सुरक्षित रहेगी।</prosody></speak>",
-            voice="Polly.Aditi",
-            language="hi-IN",
-            ssml=True
-        )
-        response.append(gather)
-        response.redirect(f"/handle-blood?name={urllib.parse.quote(name)}&email={urllib.parse.quote(email)}")
-
-        return Response(content=str(response), media_type="application/xml")
+        form_data = await request.form()
+        name = call_sessions.get(form_data.get("CallSid", "")).get("name", "")
+
+        return twiml_response(BLOOD_PROMPT.render(name=name))
     except Exception as e:
         print(f"Error in voice-blood endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
 
 @voice_router.post("/handle-blood")
+@idempotent
+@traced
 async def handle_blood(request: Request):
     try:
         form_data = await request.form()
         blood_group = form_data.get("SpeechResult", "")
-        name = urllib.parse.unquote(request.query_params.get("name", ""))
-        email = urllib.parse.unquote(request.query_params.get("email", ""))
+        call_sid = form_data.get("CallSid", "")
+        session = call_sessions.get(call_sid)
 
-        response = VoiceResponse()
+        # Name and email were translated and formatted by the earlier steps
+        name = session.get("name", "")
+        translated_name = session.get("translated_name", "")
+        translated_email = session.get("translated_email", "")
+        formatted_email = session.get("formatted_email", "")
 
         if blood_group:
-            translated_name = translate_to_english(name)
-            translated_email = translate_to_english(email)
-            translated_blood = translate_to_english(blood_group)
-
-            formatted_email = format_email(translated_email)
+            translated_blood = await translate_to_english_async(blood_group)
             formatted_blood = format_blood_group(blood_group)
 
             print("🧑‍🤝‍🧑 User information:")
             print(f"Name: {translated_name} (Original: {name})")
-            print(f"Email: {translated_email} (Original: {email})")
+            print(f"Email: {translated_email} (Original: {session.get('email', '')})")
             print(f"Blood Group: {translated_blood} (Original: {blood_group})")
             print(f"Formatted Email: {formatted_email}")
             print(f"Formatted Blood Group: {formatted_blood}")
+            annotate(translated=translated_blood, formatted_blood_group=formatted_blood)
+            call_flow_steps.inc("info", "blood_group")
 
-            # Save user data to CSV - use formatted data
-            save_user_data_to_csv(translated_name, formatted_email, formatted_blood)
-            save_user_data_to_sheet(translated_name, formatted_email, formatted_blood)
+            # Save user data - use formatted data
+            with stage("storage"):
+                save_user_data(translated_name, formatted_email, formatted_blood)
+                save_user_data_to_sheet(translated_name, formatted_email, formatted_blood)
 
-            response.say(
-                f"<speak><prosody rate='fast'>धन्यवाद {name}, आपकी जानकारी प्फाउंडेशन में सुरक्षित कर ली गई है। हमारी टीम जल्द ही आपसे संपर्क करेगी। आपके सहयोग के लिए हार्दिक आभार।</prosody></speak>",
-                voice="Polly.Aditi", language="hi-IN", ssml=True
-            )
-            response.hangup()
+            body = BLOOD_SAVED.render(name=name)
         else:
             # Even if blood group is not provided, save the available data
-            translated_name = translate_to_english(name)
-            translated_email = translate_to_english(email)
-            formatted_email = format_email(translated_email)
-            
-            # Save user data to CSV with empty blood group
-            save_user_data_to_csv(translated_name, formatted_email, "")
-            save_user_data_to_sheet(translated_name, formatted_email, "")
-
-            response.say(
-                f"<speak><prosody rate='fast'>{name}, रक्त समूह प्राप्त नहीं हुआ, फिर भी आपकी जानकारी हमारे पास सुरक्षित है। प्रीरित फाउंडेशन से जुड़ने के लिए धन्यवाद।</prosody></speak>",
-                voice="Polly.Aditi", language="hi-IN", ssml=True
-            )
-            response.hangup()
-
-        return Response(content=str(response), media_type="application/xml")
-    except Exception as e:
-        print(f"Error in handle-blood endpoint: {e}")
-        response = VoiceResponse()
-        response.say("Sorry, there was an error with the application.")
-        return Response(content=str(response), media_type="application/xml")
+            with stage("storage"):
+                save_user_data(translated_name, formatted_email, "")
+                save_user_data_to_sheet(translated_name, formatted_email, "")
 
+            body = BLOOD_MISSING.render(name=name)
 
+        call_sessions.clear(call_sid)
+        call_flow_steps.inc("info", "saved")
 
+        return twiml_response(body)
+    except Exception as e:
+        print(f"Error in handle-blood endpoint: {e}")
+        annotate(error=str(e))
+        return twiml_response(ERROR_TWIML)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from twilio.twiml.voice_response import VoiceResponse, Connect
+from config.settings import settings
+from services.gemini_service import schedule_warm_up
+from services.stream_service import MediaStreamSession, stream_report
+from utils.metrics import call_flow_steps
+from utils.twiml import ERROR_TWIML, compile_static, say_hindi, twiml_response
+
+stream_router = APIRouter()
+
+
+def _connect_stream():
+    response = VoiceResponse()
+    say_hindi(
+        response,
+        "नमस्ते! मैं Sankalpiq Foundation से Aditi बात कर रही हूँ। आप हमारे कार्यों के बारे में क्या जानना चाहेंगे?",
+    )
+    connect = Connect()
+    stream_url = settings.WEBHOOK_URL.replace("https://", "wss://").replace("http://", "ws://")
+    connect.stream(url=f"{stream_url}/media-stream")
+    response.append(connect)
+    return response
+
+
+def _to_voice_faq():
+    response = VoiceResponse()
+    response.redirect("/voice-faq")
+    return response
+
+
+CONNECT_STREAM = compile_static(_connect_stream)
+TO_VOICE_FAQ = compile_static(_to_voice_faq)
+
+
+@stream_router.post("/voice-stream")
+async def voice_stream(request: Request):
+    """Start a call in streaming mode: greet, then hand the audio to /media-stream"""
+    try:
+        if not (settings.STREAM_STT and settings.STREAM_TTS):
+            # Without both plug-ins the media stream could not hear or answer the caller
+            print("Warning: STREAM_STT or STREAM_TTS is not set, using the /voice-faq flow")
+            return twiml_response(TO_VOICE_FAQ)
+        schedule_warm_up()
+        call_flow_steps.inc("stream", "call")
+        return twiml_response(CONNECT_STREAM)
+    except Exception as e:
+        print(f"Error in voice-stream endpoint: {e}")
+        return twiml_response(ERROR_TWIML)
+
+
+@stream_router.websocket("/media-stream")
+async def media_stream(websocket: WebSocket):
+    """Twilio Media Streams connection"""
+    await websocket.accept()
+    session = MediaStreamSession(websocket)
+    try:
+        await session.run()
+    except WebSocketDisconnect:
+        print(f"Media stream closed for call {session.call_sid}")
+
+
+@stream_router.get("/stream-stats")
+def stream_stats():
+    """Turns, speculation hit rate and time to first answer sentence in streaming mode"""
+    return stream_report()
@@ -0,0 +1,253 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from config.settings import settings
+from services.faq_index import faq_index
+from services.gemini_service import (
+    DEGRADED_ANSWER,
+    FALLBACK_ANSWER,
+    get_knowledge_base_response,
+    knowledge_prompt,
+)
+from services.session_service import call_sessions
+from services.trace_service import annotate, merge, new_record, run_traced, stage
+from services.translation_service import normalize, translate_to_english_async
+from utils.admission import PRIORITY_IN_PROGRESS, PRIORITY_NEW, LoadShedError
+from utils.deadline import deadline_scope
+from utils.resilience import LatencyWindow
+
+BUSY_ANSWER = "माफ कीजिए, इस समय बहुत सारे लोग हमसे बात कर रहे हैं। कृपया थोड़ी देर बाद फिर से पूछें।"
+
+# Gemini-backed answers split by whether they were the first one on the call,
+# which is where a cold connection shows up
+llm_latency = {"first": LatencyWindow(), "later": LatencyWindow()}
+latency_lock = threading.Lock()
+
+
+def record_llm_latency(call_sid, seconds):
+    session = call_sessions.get(call_sid) if call_sid else {}
+    answered = session.get("llm_answers", 0)
+    if call_sid:
+        call_sessions.update(call_sid, llm_answers=answered + 1)
+    with latency_lock:
+        llm_latency["first" if answered == 0 else "later"].record(seconds)
+
+
+def latency_report():
+    """p50/p95 of Gemini-backed answers, first on a call versus later ones"""
+    report = {}
+    with latency_lock:
+        for turn, window in llm_latency.items():
+            p50, p95 = window.percentile(50), window.percentile(95)
+            report[turn] = {
+                "samples": len(window.samples),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+    report["webhook_budget"] = pending_answers.report()
+    return report
+
+
+class RecentAnswers:
+    """Bounded LRU of Gemini answers by question, served when a new answer runs out of time"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, question):
+        key = normalize(question)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, question, answer):
+        with self.lock:
+            self.entries[normalize(question)] = answer
+            self.entries.move_to_end(normalize(question))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+recent_answers = RecentAnswers(settings.ANSWER_CACHE_SIZE)
+
+
+class PendingAnswers:
+    """Answers that outlive the webhook that asked for them.
+
+    Each answer runs as a task with its own deadline, which translation and
+    Gemini calls inherit. A webhook waits only for what is left of its budget;
+    if the answer is not ready by then, the caller is put on hold and later
+    webhooks in the hold loop pick the answer up. Tasks live in this process,
+    so a hold request served by another worker falls back to a canned answer.
+    The task's trace record (stage timings, answer source) is merged into the
+    turn of whichever webhook collects or abandons the answer.
+    """
+
+    def __init__(self, deadline=20.0):
+        self.deadline = deadline
+        # call_sid -> {"task", "question", "expires_at", "trace"}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = {"on_time": 0, "held": 0, "answered_after_hold": 0, "cached": 0, "canned": 0}
+
+    def start(self, call_sid, question, work):
+        """Run work() as the call's answer task under the answer deadline"""
+        now = time.monotonic()
+        with self.lock:
+            self._purge_expired(now)
+            previous = self.pending.get(call_sid)
+            if previous is not None and previous["question"] == question and not previous["task"].done():
+                # A redelivered webhook for the same question joins the answer in progress
+                return previous["task"]
+        trace = new_record()
+        with deadline_scope(self.deadline):
+            task = asyncio.ensure_future(run_traced(trace, work))
+        with self.lock:
+            previous = self.pending.pop(call_sid, None)
+            self.pending[call_sid] = {
+                "task": task, "question": question, "expires_at": now + self.deadline, "trace": trace
+            }
+        if previous is not None:
+            previous["task"].cancel()
+        return task
+
+    def question(self, call_sid):
+        with self.lock:
+            entry = self.pending.get(call_sid)
+        return entry["question"] if entry else None
+
+    async def wait(self, call_sid, budget):
+        """The call's answer if it is ready within budget seconds, else None"""
+        with self.lock:
+            entry = self.pending.get(call_sid)
+        if entry is None:
+            return None
+        done, _ = await asyncio.wait({entry["task"]}, timeout=max(0.0, budget))
+        if not done:
+            return None
+        with self.lock:
+            if self.pending.get(call_sid) is entry:
+                del self.pending[call_sid]
+        merge(entry["trace"], "answer_task")
+        try:
+            return entry["task"].result()
+        except Exception as e:
+            print(f"Error answering question: {e}")
+            return FALLBACK_ANSWER
+
+    def can_hold(self, call_sid):
+        """Whether the call's answer still has time left to finish"""
+        with self.lock:
+            entry = self.pending.get(call_sid)
+        return entry is not None and time.monotonic() < entry["expires_at"]
+
+    def cancel(self, call_sid):
+        with self.lock:
+            entry = self.pending.pop(call_sid, None)
+        if entry is not None:
+            entry["task"].cancel()
+            # Whatever the abandoned answer got through before running out of time
+            merge(entry["trace"], "answer_task")
+
+    def fallback(self, call_sid, question):
+        """Stop waiting for the call's answer and return a recent or canned one instead"""
+        self.cancel(call_sid)
+        cached = recent_answers.get(question) if question else None
+        self.count("cached" if cached else "canned")
+        return cached or DEGRADED_ANSWER
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def report(self):
+        with self.lock:
+            return {**self.stats, "pending": len(self.pending)}
+
+    def _purge_expired(self, now):
+        # Callers who hung up while on hold never collect their answer
+        expired = [sid for sid, entry in self.pending.items() if now > entry["expires_at"] + 60]
+        for sid in expired:
+            self.pending.pop(sid)["task"].cancel()
+
+
+pending_answers = PendingAnswers(settings.ANSWER_DEADLINE)
+
+
+async def prepare_question(question):
+    """Everything before the LLM: FAQ lookup, translation and retrieval"""
+    # Matching the raw Hindi speech first skips translation as well as the LLM
+    entry, score = faq_index.match(question)
+    translated_question = question
+    if entry is None:
+        translated_question = await translate_to_english_async(question)
+        print(f"User's question: {translated_question} (Original: {question})")
+        entry, score = faq_index.match(translated_question)
+
+    prepared = {"question": question, "translated": translated_question, "faq": entry, "prompt": None}
+    annotate(translated=translated_question)
+    if entry is not None:
+        print(f"FAQ index hit: {entry['id']} (score {score:.2f})")
+    else:
+        prepared["prompt"] = knowledge_prompt(translated_question)
+    return prepared
+
+
+def call_priority(call_sid):
+    """Callers who already got an answer from Gemini go ahead of first questions"""
+    if call_sid and call_sessions.get(call_sid).get("llm_answers", 0) > 0:
+        return PRIORITY_IN_PROGRESS
+    return PRIORITY_NEW
+
+
+def shed_answer(prepared):
+    """Precomputed answer for a question admission control turned away"""
+    for text in (prepared["question"], prepared["translated"]):
+        entry, score = faq_index.match(text, threshold=settings.SHED_MATCH_THRESHOLD)
+        if entry is not None:
+            print(f"Shed question answered from FAQ entry {entry['id']} (score {score:.2f})")
+            return entry["answer"]
+    return recent_answers.get(prepared["question"]) or BUSY_ANSWER
+
+
+async def answer_question(question, call_sid="", prepared=None):
+    """Answer a caller's question from the FAQ index, falling back to Gemini
+
+    prepared is the result of an earlier prepare_question, e.g. a speculative
+    one started from a partial transcript.
+    """
+    start = time.monotonic()
+    if prepared is None:
+        prepared = await prepare_question(question)
+    else:
+        annotate(translated=prepared["translated"], prefetched=True)
+
+    if prepared["faq"] is not None:
+        answer = prepared["faq"]["answer"]
+        annotate(source="faq", faq_id=prepared["faq"]["id"])
+    else:
+        llm_start = time.monotonic()
+        try:
+            with stage("llm"):
+                answer = await get_knowledge_base_response(
+                    prepared["translated"], prepared["prompt"], call_priority(call_sid)
+                )
+        except LoadShedError as e:
+            print(f"Gemini request shed ({e.reason}), answering from precomputed answers")
+            annotate(source="shed", shed_reason=e.reason)
+            answer = shed_answer(prepared)
+        else:
+            annotate(source="llm")
+            record_llm_latency(call_sid, time.monotonic() - llm_start)
+            if answer in (DEGRADED_ANSWER, FALLBACK_ANSWER):
+                answer = recent_answers.get(question) or answer
+            else:
+                recent_answers.set(question, answer)
+
+    faq_index.record(prepared["faq"] is not None, time.monotonic() - start)
+    return answer
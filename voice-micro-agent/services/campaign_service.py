@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+import uuid
+from collections import Counter, deque
+from config.settings import settings
+from services.twilio_service import place_call
+
+FLOWS = {"faq": "/voice-faq", "info": "/voice-info"}
+RETRY_STATUSES = {"busy", "no-answer"}
+FINAL_STATES = {"completed", "busy", "no-answer", "failed", "canceled", "unknown"}
+
+
+def normalize_number(number):
+    """Return the number in E.164 form, or None if it does not look like one"""
+    digits = re.sub(r"[\s\-().]", "", str(number))
+    if re.fullmatch(r"0?\d{10}", digits):
+        # Bare ten-digit numbers, with or without the trunk 0, are Indian mobiles
+        digits = f"+91{digits[-10:]}"
+    elif re.fullmatch(r"00\d{8,15}", digits):
+        digits = f"+{digits[2:]}"
+    return digits if re.fullmatch(r"\+\d{8,15}", digits) else None
+
+
+def parse_numbers(text):
+    """Numbers from an uploaded file: one per line, or the first column of a CSV"""
+    numbers = []
+    for line in text.splitlines():
+        cell = line.split(",")[0].strip().strip('"')
+        # Skips blank lines and a header row
+        if any(char.isdigit() for char in cell):
+            numbers.append(cell)
+    return numbers
+
+
+class Campaign:
+    """One batch of numbers dialed with the same call flow"""
+
+    def __init__(self, flow, numbers, name=""):
+        self.id = uuid.uuid4().hex[:12]
+        self.flow = flow
+        self.name = name
+        self.created_at = time.time()
+        self.cancelled = False
+        self.invalid = []
+        self.entries = {}
+        for raw in numbers:
+            number = normalize_number(raw)
+            if number is None:
+                self.invalid.append(str(raw))
+            elif number not in self.entries:
+                self.entries[number] = {
+                    "number": number,
+                    "state": "pending",
+                    "attempts": 0,
+                    "call_sid": None,
+                    "last_status": None,
+                    "updated_at": self.created_at,
+                }
+        self.queue = deque(self.entries.values())
+
+    def progress(self):
+        states = Counter(entry["state"] for entry in self.entries.values())
+        done = sum(count for state, count in states.items() if state in FINAL_STATES)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "flow": self.flow,
+            "created_at": self.created_at,
+            "cancelled": self.cancelled,
+            "numbers": len(self.entries),
+            "invalid_numbers": len(self.invalid),
+            "done": done,
+            "percent_done": round(100 * done / len(self.entries), 1) if self.entries else 100.0,
+            "states": dict(states),
+        }
+
+
+class CampaignScheduler:
+    """Dials campaign numbers within a calls-per-second limit and a live-call cap.
+
+    A call counts as live from the moment it is placed until Twilio posts its
+    final status to /campaign-status. Busy and no-answer numbers are retried
+    after a delay, up to max_attempts calls per number.
+    """
+
+    def __init__(self, cps=1.0, max_live_calls=10, max_attempts=3, retry_delay=900.0,
+                 call_timeout=1800.0):
+        self.cps = cps
+        self.max_live_calls = max_live_calls
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.call_timeout = call_timeout
+        self.campaigns = {}
+        self.live = {}
+        self.early_statuses = {}
+        self.retries = []
+        self.sequence = itertools.count()
+        self.next_slot = 0.0
+        self.wakeup = None
+        self.task = None
+        self.stats = {"placed": 0, "place_errors": 0}
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def create(self, flow, numbers, name=""):
+        campaign = Campaign(flow, numbers, name)
+        self.campaigns[campaign.id] = campaign
+        self.start()
+        self.wakeup.set()
+        return campaign
+
+    def cancel(self, campaign_id):
+        """Stop dialing new numbers; calls already live finish normally"""
+        campaign = self.campaigns[campaign_id]
+        campaign.cancelled = True
+        for entry in campaign.entries.values():
+            if entry["state"] in ("pending", "retry"):
+                self._set_state(entry, "canceled")
+        campaign.queue.clear()
+        return campaign
+
+    def status(self):
+        return {
+            "cps": self.cps,
+            "max_live_calls": self.max_live_calls,
+            "live_calls": len(self.live),
+            "scheduled_retries": len(self.retries),
+            **self.stats,
+        }
+
+    def handle_status(self, call_sid, call_status):
+        """Record the final status Twilio posts for a campaign call"""
+        found = self.live.pop(call_sid, None)
+        if found is None:
+            # The callback can beat the create response; applied once the sid is known
+            self.early_statuses[call_sid] = call_status
+            return False
+        campaign, entry, _ = found
+        entry["last_status"] = call_status
+        self._finish_attempt(campaign, entry, call_status)
+        if self.wakeup is not None:
+            self.wakeup.set()
+        return True
+
+    def _set_state(self, entry, state):
+        entry["state"] = state
+        entry["updated_at"] = time.time()
+
+    def _finish_attempt(self, campaign, entry, outcome):
+        retryable = outcome in RETRY_STATUSES or outcome == "place-error"
+        if retryable and entry["attempts"] < self.max_attempts and not campaign.cancelled:
+            self._set_state(entry, "retry")
+            due = time.monotonic() + self.retry_delay
+            heapq.heappush(self.retries, (due, next(self.sequence), campaign.id, entry["number"]))
+        elif outcome == "place-error":
+            self._set_state(entry, "failed")
+        else:
+            self._set_state(entry, outcome if outcome in FINAL_STATES else "failed")
+
+    def _next_entry(self):
+        now = time.monotonic()
+        while self.retries and self.retries[0][0] <= now:
+            _, _, campaign_id, number = heapq.heappop(self.retries)
+            campaign = self.campaigns[campaign_id]
+            entry = campaign.entries[number]
+            if entry["state"] == "retry":
+                campaign.queue.append(entry)
+        # Oldest campaign first, so a new campaign does not starve one in progress
+        for campaign in self.campaigns.values():
+            if campaign.queue and not campaign.cancelled:
+                return campaign, campaign.queue.popleft()
+        return None
+
+    def _expire_live_calls(self):
+        """Release slots of calls whose status callback never arrived"""
+        cutoff = time.monotonic() - self.call_timeout
+        for call_sid, (campaign, entry, placed_at) in list(self.live.items()):
+            if placed_at < cutoff:
+                del self.live[call_sid]
+                self._set_state(entry, "unknown")
+
+    async def _run(self):
+        while True:
+            self._expire_live_calls()
+            item = None
+            if len(self.live) < self.max_live_calls:
+                item = self._next_entry()
+            if item is None:
+                self.wakeup.clear()
+                # Not wait_for: it can swallow stop()'s cancel when a wakeup lands at the same time
+                waiter = asyncio.ensure_future(self.wakeup.wait())
+                try:
+                    await asyncio.wait({waiter}, timeout=1.0)
+                finally:
+                    waiter.cancel()
+                continue
+
+            # Pace dispatches to the account's calls-per-second limit
+            now = time.monotonic()
+            self.next_slot = max(self.next_slot, now)
+            if self.next_slot > now:
+                await asyncio.sleep(self.next_slot - now)
+            self.next_slot += 1.0 / self.cps
+
+            campaign, entry = item
+            entry["attempts"] += 1
+            self._set_state(entry, "dialing")
+            # Hold the slot under a placeholder until Twilio returns the CallSid
+            placeholder = f"pending-{next(self.sequence)}"
+            self.live[placeholder] = (campaign, entry, time.monotonic())
+            asyncio.ensure_future(self._place(campaign, entry, placeholder))
+
+    async def _place(self, campaign, entry, placeholder):
+        result = await place_call(
+            entry["number"], FLOWS[campaign.flow], f"{settings.WEBHOOK_URL}/campaign-status"
+        )
+        if self.live.pop(placeholder, None) is None:
+            # Expired while the request was in flight
+            return
+        if result["success"]:
+            self.stats["placed"] += 1
+            entry["call_sid"] = result["sid"]
+            self.live[result["sid"]] = (campaign, entry, time.monotonic())
+            self._set_state(entry, "in-progress")
+            if result["sid"] in self.early_statuses:
+                self.handle_status(result["sid"], self.early_statuses.pop(result["sid"]))
+        else:
+            self.stats["place_errors"] += 1
+            entry["last_status"] = result["error"]
+            self._finish_attempt(campaign, entry, "place-error")
+            self.wakeup.set()
+
+
+campaign_scheduler = CampaignScheduler(
+    cps=settings.CAMPAIGN_CPS,
+    max_live_calls=settings.CAMPAIGN_MAX_LIVE_CALLS,
+    max_attempts=settings.CAMPAIGN_MAX_ATTEMPTS,
+    retry_delay=settings.CAMPAIGN_RETRY_DELAY,
+    call_timeout=settings.CAMPAIGN_CALL_TIMEOUT,
+)
@@ -1,30 +1,24 @@
+import html
 import smtplib
+import sqlite3
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from string import Template
 from config.settings import settings
+from utils.metrics import external_call
 
-
-def send_thank_you_email(user_name, user_email, blood_group):
-    """Send thank you email to user"""
-    try:
-        if not settings.GMAIL_ADDRESS or not settings.GMAIL_APP_PASSWORD:
-            print("Email credentials not found")
-            return False
-
-        msg = MIMEMultipart()
-        msg["From"] = settings.GMAIL_ADDRESS
-        msg["To"] = user_email
-        msg["Subject"] = "Thank You for Connecting with Sankalpiq Foundation"
-
-        body = f"""
+# Compiled once; values are HTML-escaped when the mail is rendered
+THANK_YOU_TEMPLATE = Template("""
         <html>
         <head>
             <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #4CAF50; color: white; padding: 10px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; }}
-                .footer {{ text-align: center; margin-top: 20px; font-size: 12px; color: #777; }}
+                body { font-family: Arial, sans-serif; line-height: 1.6; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #4CAF50; color: white; padding: 10px; text-align: center; }
+                .content { padding: 20px; background-color: #f9f9f9; }
+                .footer { text-align: center; margin-top: 20px; font-size: 12px; color: #777; }
             </style>
         </head>
         <body>
@@ -33,10 +27,10 @@ def send_thank_you_email(user_name, user_email, blood_group):
                     <h2>Sankalpiq Foundation</h2>
                 </div>
                 <div class="content">
-                    
-                    <p>Dear {user_name},</p>
-                    <p>Email: {user_email}</p>
-                    <p>Blood Group: {blood_group}</p>
+
+                    <p>Dear $user_name,</p>
+                    <p>Email: $user_email</p>
+                    <p>Blood Group: $blood_group</p>
                     <p>Thank you for connecting with Sankalpiq Foundation!</p>
                     <p>We have securely stored your information.Our team will contact you soon.</p>
                     <p>If you have any questions, feel free to reach out to us at <a href="https://sankalpiq.co.in">sankalpiq.co.in</a>
@@ -49,18 +43,213 @@ def send_thank_you_email(user_name, user_email, blood_group):
             </div>
         </body>
         </html>
-        """
+        """)
+
+
+def render_thank_you_email(user_name, user_email, blood_group):
+    return THANK_YOU_TEMPLATE.substitute(
+        user_name=html.escape(user_name),
+        user_email=html.escape(user_email),
+        blood_group=html.escape(blood_group),
+    )
+
+
+class SmtpConnection:
+    """One logged-in SMTP session reused across messages"""
+
+    def __init__(self, host, port, idle_timeout=300.0):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        self.server = smtplib.SMTP(self.host, self.port, timeout=30)
+        self.server.starttls()
+        self.server.login(settings.GMAIL_ADDRESS, settings.GMAIL_APP_PASSWORD)
+
+    def send(self, msg):
+        if self.server is not None and time.monotonic() - self.last_used > 60:
+            # Gmail drops idle sessions; check before sending rather than failing mid-message
+            try:
+                self.server.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self.server is None:
+            self._connect()
+        try:
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect()
+            self.server.send_message(msg)
+        self.last_used = time.monotonic()
+
+    def close_if_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server = None
 
-        msg.attach(MIMEText(body, "html"))
 
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(settings.GMAIL_ADDRESS, settings.GMAIL_APP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+class EmailOutbox:
+    """Durable SQLite queue of thank-you emails delivered by a background worker"""
 
+    def __init__(self, db_path, max_attempts=5, base_delay=30.0, max_delay=3600.0,
+                 poll_interval=5.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.running = False
+        self.smtp = SmtpConnection("smtp.gmail.com", 587)
+        self.stats = {"sent": 0, "failures": 0, "last_error": None}
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS email_outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_name TEXT NOT NULL, "
+            "user_email TEXT NOT NULL, blood_group TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+            "locked_until REAL NOT NULL DEFAULT 0, status TEXT NOT NULL DEFAULT 'queued', "
+            "last_error TEXT)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS email_outbox_due ON email_outbox (status, next_attempt_at)"
+        )
+        self.db.commit()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10.0):
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        self.wakeup.set()
+        self.thread.join(timeout)
+        self.smtp.close()
+
+    def enqueue(self, user_name, user_email, blood_group):
+        """Store the email for delivery and return immediately"""
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO email_outbox (user_name, user_email, blood_group, next_attempt_at) "
+                "VALUES (?, ?, ?, ?)",
+                (user_name, user_email, blood_group, time.time()),
+            )
+            self.db.commit()
+        if not self.running:
+            self.start()
+        self.wakeup.set()
+
+    def status(self):
+        with self.lock:
+            counts = dict(
+                self.db.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status").fetchall()
+            )
+        return {
+            "queued": counts.get("queued", 0),
+            "failed": counts.get("failed", 0),
+            **self.stats,
+        }
+
+    def _claim(self, limit=20):
+        """Lease due emails so another worker sharing the database skips them"""
+        now = time.time()
+        claimed = []
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, user_name, user_email, blood_group, attempts FROM email_outbox "
+                "WHERE status = 'queued' AND next_attempt_at <= ? AND locked_until <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            for row in rows:
+                cursor = self.db.execute(
+                    "UPDATE email_outbox SET locked_until = ? WHERE id = ? AND locked_until <= ?",
+                    (now + 300, row[0], now),
+                )
+                if cursor.rowcount:
+                    claimed.append(row)
+            self.db.commit()
+        return claimed
+
+    def _run(self):
+        while self.running:
+            self.wakeup.clear()
+            for email_id, user_name, user_email, blood_group, attempts in self._claim():
+                self._deliver(email_id, user_name, user_email, blood_group, attempts)
+            self.smtp.close_if_idle()
+            self.wakeup.wait(self.poll_interval)
+
+    def _deliver(self, email_id, user_name, user_email, blood_group, attempts):
+        try:
+            msg = MIMEMultipart()
+            msg["From"] = settings.GMAIL_ADDRESS
+            msg["To"] = user_email
+            msg["Subject"] = "Thank You for Connecting with Sankalpiq Foundation"
+            msg.attach(MIMEText(render_thank_you_email(user_name, user_email, blood_group), "html"))
+            with external_call("smtp"):
+                self.smtp.send(msg)
+        except Exception as e:
+            if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                # The session may be broken, reconnect on the next attempt
+                self.smtp.close()
+            attempts += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            status = "failed" if attempts >= self.max_attempts else "queued"
+            with self.lock:
+                self.db.execute(
+                    "UPDATE email_outbox SET attempts = ?, next_attempt_at = ?, locked_until = 0, "
+                    "status = ?, last_error = ? WHERE id = ?",
+                    (attempts, time.time() + delay, status, str(e), email_id),
+                )
+                self.db.commit()
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+            print(f"Error sending email to {user_email} (attempt {attempts}): {e}")
+            return
+        with self.lock:
+            self.db.execute("DELETE FROM email_outbox WHERE id = ?", (email_id,))
+            self.db.commit()
+            self.stats["sent"] += 1
         print(f"Thank you email sent successfully to {user_email}")
+
+
+email_outbox = EmailOutbox(
+    settings.EMAIL_QUEUE_DB,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    base_delay=settings.EMAIL_RETRY_DELAY,
+)
+
+
+def send_thank_you_email(user_name, user_email, blood_group):
+    """Queue a thank you email to user"""
+    try:
+        if not settings.GMAIL_ADDRESS or not settings.GMAIL_APP_PASSWORD:
+            print("Email credentials not found")
+            return False
+
+        email_outbox.enqueue(user_name, user_email, blood_group)
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        print(f"Error queueing email: {e}")
         return False
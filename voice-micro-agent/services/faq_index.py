@@ -0,0 +1,190 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from config.settings import settings
+
+
+# Question phrasing shared across topics; a match needs at least one other word in common
+STOPWORDS = {
+    "क्या", "आप", "आपके", "आपकी", "आपका", "मैं", "मुझे", "मेरा", "हम", "है", "हैं", "हो", "के",
+    "की", "का", "को", "में", "से", "पर", "और", "या", "कैसे", "कौन", "कब", "कहाँ", "क्यों", "करते",
+    "करती", "करता", "कर", "करें", "करूं", "सकता", "सकती", "सकते", "देते", "देती", "दें", "दूं",
+    "लिए", "बारे", "बताइए", "बताएं", "कुछ", "भी", "तो", "जी", "मिलती", "मिलेगी", "लगाते", "चलाते",
+    "what", "does", "do", "how", "can", "i", "you", "your", "the", "a", "an", "is", "are", "about",
+    "tell", "me", "my", "of", "for", "to", "in", "get", "give", "make", "which", "have", "any", "run",
+}
+
+
+def tokenize(text):
+    return re.sub(r"[^\wऀ-ॿ]+", " ", text.casefold()).split()
+
+
+def content_words(text):
+    return {word for word in tokenize(text) if word not in STOPWORDS}
+
+
+def counts(text):
+    """Words plus character trigrams, tolerant of speech recognition spelling noise"""
+    words = tokenize(text)
+    vector = Counter(f"w:{word}" for word in words)
+    padded = f" {' '.join(words)} "
+    vector.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return vector
+
+
+def unit(vector):
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {key: value / norm for key, value in vector.items()} if norm else {}
+
+
+def features(text):
+    return unit(counts(text))
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(key, 0.0) for key, weight in a.items())
+
+
+def similarity(a, b):
+    """Cosine similarity of two transcripts"""
+    return cosine(features(a), features(b))
+
+
+def shares_word(a, b):
+    """Whether two sets of words have one in common, allowing for spelling noise"""
+    return bool(a & b) or any(similarity(x, y) >= 0.5 for x in a for y in b)
+
+
+class FaqIndex:
+    """Canonical caller questions with pre-generated Hindi answers
+
+    Features are weighted by their inverse frequency across the canonical
+    questions, so phrasing every question shares ("क्या आप ... देते हैं",
+    "tell me about") counts for little and the topic words decide the match.
+    A canonical question is only considered when it shares a content word with
+    the caller's, allowing for recognition spelling noise, so phrasing alone
+    never matches.
+    """
+
+    def __init__(self, path, threshold=0.5):
+        self.path = path
+        self.threshold = threshold
+        self.entries = []
+        self.vectors = []
+        self.idf = {}
+        self.unseen_idf = 1.0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+        except Exception as e:
+            print(f"Error loading FAQ index: {e}")
+            self.entries = []
+        questions = [
+            (entry, question) for entry in self.entries if entry.get("answer") for question in entry["questions"]
+        ]
+        doc_freqs = Counter(key for _, question in questions for key in counts(question))
+        total = len(questions)
+        self.idf = {key: math.log((1 + total) / (1 + df)) + 1 for key, df in doc_freqs.items()}
+        self.unseen_idf = math.log(1 + total) + 1
+        self.vectors = [
+            (entry, self._weigh(counts(question)), content_words(question)) for entry, question in questions
+        ]
+
+    def _weigh(self, vector):
+        return unit({key: value * self.idf.get(key, self.unseen_idf) for key, value in vector.items()})
+
+    def match(self, text, threshold=None):
+        """Return (entry, score) for the closest canonical question above the threshold"""
+        if not text or not self.vectors:
+            return None, 0.0
+        query = self._weigh(counts(text))
+        query_words = content_words(text)
+        best, best_score = None, 0.0
+        for entry, vector, words in self.vectors:
+            if not shares_word(query_words, words):
+                continue
+            score = cosine(query, vector)
+            if score > best_score:
+                best, best_score = entry, score
+        if best_score < (self.threshold if threshold is None else threshold):
+            return None, best_score
+        return best, best_score
+
+    def record(self, hit, seconds):
+        """Record how long a question took to answer, from the index or not"""
+        with self.lock:
+            if hit:
+                self.stats["hits"] += 1
+                self.stats["hit_seconds"] += seconds
+            else:
+                self.stats["misses"] += 1
+                self.stats["miss_seconds"] += seconds
+
+    def report(self):
+        with self.lock:
+            hits, misses = self.stats["hits"], self.stats["misses"]
+            avg_hit = self.stats["hit_seconds"] / hits if hits else 0.0
+            avg_miss = self.stats["miss_seconds"] / misses if misses else 0.0
+        total = hits + misses
+        return {
+            "questions": total,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "avg_hit_ms": round(avg_hit * 1000, 1),
+            "avg_miss_ms": round(avg_miss * 1000, 1),
+            # Each hit saves roughly the time a miss spends on translation and the LLM
+            "estimated_seconds_saved": round(hits * max(avg_miss - avg_hit, 0.0), 2) if misses else None,
+        }
+
+    def save(self):
+        """Write the entries back, replacing the file only once the new one is complete"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    async def generate_missing_answers(self):
+        """Fill empty answers with Gemini using the knowledge base, saving after each one
+
+        Error answers are never saved, and a shed or open-circuit Gemini stops
+        the run with the answers generated so far kept.
+        """
+        from services.gemini_service import DEGRADED_ANSWER, FALLBACK_ANSWER, get_knowledge_base_response
+        from utils.admission import LoadShedError
+        from utils.resilience import CircuitOpenError
+
+        for entry in self.entries:
+            if entry.get("answer"):
+                continue
+            try:
+                answer = await get_knowledge_base_response(entry["questions"][0])
+            except (LoadShedError, CircuitOpenError) as e:
+                print(f"Stopped generating answers at {entry['id']}: {e}")
+                break
+            if answer in (DEGRADED_ANSWER, FALLBACK_ANSWER):
+                print(f"No answer generated for {entry['id']}, leaving it empty")
+                continue
+            entry["answer"] = answer
+            self.save()
+            print(f"Generated answer for {entry['id']}")
+        self.load()
+
+
+faq_index = FaqIndex(settings.FAQ_ANSWERS_FILE, threshold=settings.FAQ_MATCH_THRESHOLD)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(faq_index.generate_missing_answers())
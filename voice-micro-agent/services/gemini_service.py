@@ -1,5 +1,54 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from config.settings import settings
+from utils.admission import PRIORITY_NEW, AdmissionController, LoadShedError
+from utils.deadline import time_left
+from utils.resilience import ResilientCall, CircuitOpenError
+from utils.metering import TokenMeter, estimate_tokens, usage_from_response
+from utils.metrics import external_call
+from services.knowledge_service import knowledge_base
+
+FALLBACK_ANSWER = "मुझे इस सवाल का जवाब नहीं मिला। कृपया बाद में पुनः प्रयास करें।"
+DEGRADED_ANSWER = "माफ कीजिए, अभी हमारी सेवा में थोड़ी दिक्कत है। कृपया कुछ देर बाद फिर से पूछें।"
+
+# Bounded pool for SDK versions without an async client
+gemini_executor = ThreadPoolExecutor(
+    max_workers=settings.GEMINI_MAX_CONCURRENCY, thread_name_prefix="gemini"
+)
+
+# Deadline, hedging and circuit breaker shared by every Gemini call
+gemini_call = ResilientCall(
+    "gemini",
+    timeout=settings.GEMINI_TIMEOUT,
+    hedge=settings.GEMINI_HEDGE,
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+    executor=gemini_executor,
+)
+
+# Global concurrency and token-rate limit, so a busy campaign stays inside the Gemini quota
+gemini_admission = AdmissionController(
+    "gemini",
+    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+    max_queue=settings.GEMINI_QUEUE_SIZE,
+    queue_timeout=settings.GEMINI_QUEUE_TIMEOUT,
+)
+
+# Token and cost accounting for every Gemini call
+token_meter = TokenMeter(
+    settings.GEMINI_INPUT_PRICE_PER_MILLION, settings.GEMINI_OUTPUT_PRICE_PER_MILLION
+)
+
+# One long-lived model per process so its client connection stays open
+gemini_model = None
+model_lock = threading.Lock()
+last_used = 0.0
+warm_up_tasks = set()
+
 
 def setup_gemini():
     """Initialize Gemini AI"""
@@ -13,49 +62,148 @@ def setup_gemini():
         print(f"Error setting up Gemini: {e}")
         return False
 
-def load_knowledge_base():
-    """Load knowledge base data"""
-    try:
-        with open(settings.KNOWLEDGE_BASE_FILE, "r", encoding="utf-8") as file:
-            return file.read()
-    except Exception as e:
-        print(f"Error loading knowledge base: {e}")
-        return "Knowledge base not found."
+def get_model():
+    """Return the process-wide Gemini model, configuring the SDK on first use"""
+    global gemini_model
+    if gemini_model is None:
+        with model_lock:
+            if gemini_model is None:
+                setup_gemini()
+                gemini_model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    return gemini_model
+
+async def warm_up(force=False):
+    """Open the Gemini connection before the first question of a call needs it
 
-async def get_gemini_response(question):
-    """Get response from Gemini for general questions"""
+    Calls the model directly with its own short timeout: a slow warm-up must not
+    trip the circuit breaker, skew the hedging latency window, take an admission
+    slot from a caller's question or show up in token accounting.
+    """
+    global last_used
+    if not force and time.monotonic() - last_used < settings.GEMINI_WARMUP_INTERVAL:
+        return False
+    # Claim the slot up front so concurrent call starts send a single warm-up
+    last_used = time.monotonic()
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""
-        Answer the following question in Hindi language. Keep the answer concise (2-3 sentences maximum).
-        If you don't know the answer, just say you don't have that information in Hindi.
-        
-        Question: {question}"""
-        response = model.generate_content(prompt)
-        return response.text
+        model = get_model()
+        prompt, config = "Reply with OK.", {"max_output_tokens": 1}
+        if hasattr(model, "generate_content_async"):
+            request = model.generate_content_async(prompt, generation_config=config)
+        else:
+            request = asyncio.get_running_loop().run_in_executor(
+                gemini_executor, lambda: model.generate_content(prompt, generation_config=config)
+            )
+        await asyncio.wait_for(request, settings.GEMINI_WARMUP_TIMEOUT)
+        return True
+    except asyncio.TimeoutError:
+        print(f"Gemini warm-up timed out after {settings.GEMINI_WARMUP_TIMEOUT}s")
+        return False
     except Exception as e:
-        print(f"Error getting Gemini response: {e}")
-        return "मुझे इस सवाल का जवाब नहीं मिला। कृपया बाद में पुनः प्रयास करें।"
+        print(f"Gemini warm-up failed: {e}")
+        return False
 
-async def get_knowledge_base_response(question):
-    """Get Gemini response using knowledge base"""
-    try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        knowledge_base = load_knowledge_base()
-        prompt = f"""
+def schedule_warm_up():
+    """Warm up in the background without delaying the caller's TwiML"""
+    task = asyncio.ensure_future(warm_up())
+    warm_up_tasks.add(task)
+    task.add_done_callback(warm_up_tasks.discard)
+
+def expected_tokens(prompt):
+    """Tokens to reserve with admission control before the real count is known"""
+    return estimate_tokens(prompt) + settings.GEMINI_EXPECTED_OUTPUT_TOKENS
+
+async def generate(prompt, endpoint, priority=PRIORITY_NEW, **kwargs):
+    """Run a Gemini generation through admission control and the resilience layer, and meter its tokens"""
+    global last_used
+    model = get_model()
+    # Use the async client so a slow answer never blocks the event loop
+    generate_content = getattr(model, "generate_content_async", model.generate_content)
+    async with gemini_admission.admit(expected_tokens(prompt), priority) as ticket:
+        with external_call("gemini"):
+            response = await gemini_call.run(generate_content, prompt, **kwargs)
+        last_used = time.monotonic()
+        prompt_tokens, completion_tokens, estimated = usage_from_response(
+            response, prompt, response.text
+        )
+        ticket["tokens"] = prompt_tokens + completion_tokens
+    token_meter.record("voice-agent", endpoint, prompt_tokens, completion_tokens, estimated)
+    return response.text
+
+async def stream_generate(prompt, endpoint, priority=PRIORITY_NEW):
+    """Yield the answer text chunk by chunk as Gemini generates it"""
+    global last_used
+    model = get_model()
+    if not hasattr(model, "generate_content_async"):
+        yield await generate(prompt, endpoint, priority)
+        return
+
+    parts = []
+    response = None
+    async with gemini_admission.admit(expected_tokens(prompt), priority) as ticket:
+        try:
+            with external_call("gemini_stream"):
+                # The deadline covers the first response and then each gap between chunks
+                response = await gemini_call.run(model.generate_content_async, prompt, stream=True)
+                chunks = response.__aiter__()
+                while True:
+                    budget = time_left(settings.GEMINI_TIMEOUT)
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), budget)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        # As in ResilientCall.run, only a stall of the full timeout counts against Gemini
+                        if budget >= settings.GEMINI_TIMEOUT:
+                            gemini_call.breaker.record_failure()
+                        raise
+                    except Exception:
+                        # The breaker only saw the stream open; a failure mid-stream counts too
+                        gemini_call.breaker.record_failure()
+                        raise
+                    parts.append(chunk.text)
+                    yield chunk.text
+            last_used = time.monotonic()
+        finally:
+            # Metered even when the stream fails or a speculative answer is cancelled part way
+            if response is not None:
+                prompt_tokens, completion_tokens, estimated = usage_from_response(
+                    response, prompt, "".join(parts)
+                )
+                ticket["tokens"] = prompt_tokens + completion_tokens
+                token_meter.record("voice-agent", endpoint, prompt_tokens, completion_tokens, estimated)
+
+def knowledge_prompt(question):
+    """Prompt answering the question from the most relevant knowledge base passages"""
+    passages = knowledge_base.retrieve(
+        question, k=settings.KNOWLEDGE_TOP_K, max_chars=settings.KNOWLEDGE_MAX_CHARS
+    )
+    context = "\n\n".join(passages) or "Knowledge base not found."
+    return f"""
         You are a helpful AI assistant for Sankalpiq Foundation.
         Use ONLY the following information to answer the user's question.
         If the answer isn't found in the provided information, politely say you don't have that information.
         Always answer in Hindi language. Keep the answer concise (2-3 sentences maximum).
-        
+
         KNOWLEDGE BASE INFORMATION:
-        {knowledge_base}
+        {context}
         USER QUESTION: {question}"""
-        response = model.generate_content(prompt)
-        return response.text
+
+async def get_knowledge_base_response(question, prompt=None, priority=PRIORITY_NEW):
+    """Get Gemini response using knowledge base
+
+    Raises LoadShedError when admission control turns the request away, so the
+    caller can pick a precomputed answer.
+    """
+    try:
+        return await generate(prompt or knowledge_prompt(question), "knowledge_base", priority)
+    except LoadShedError:
+        raise
+    except CircuitOpenError:
+        print("Gemini circuit open, returning degraded answer")
+        return DEGRADED_ANSWER
+    except asyncio.TimeoutError:
+        print("Knowledge base response timed out")
+        return DEGRADED_ANSWER
     except Exception as e:
         print(f"Error getting knowledge base response: {e}")
-        return "मुझे इस सवाल का जवाब नहीं मिला। कृपया बाद में पुनः प्रयास करें।"
-
-# Initialize Gemini on import
-setup_gemini()
\ No newline at end of file
+        return FALLBACK_ANSWER
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import sqlite3
+import threading
+import time
+from fastapi import Request
+from fastapi.responses import Response
+from config.settings import settings
+
+
+class WebhookReplayCache:
+    """Responses to Twilio webhooks, replayed when Twilio delivers one again.
+
+    Twilio retries a webhook that timed out or failed to connect, with the
+    same parameters and I-Twilio-Idempotency-Token header. A delivery is keyed
+    by CallSid, path (which carries ?attempt=N) and that token. Requests
+    without the header run uncached: distinct requests can have identical
+    bodies, such as successive /faq-hold polls, so the body cannot tell a
+    retry apart. A duplicate that arrives while the first delivery is still
+    running waits for its response instead of running the handler again, so
+    translations, Gemini calls, saved rows and emails happen once. Finished
+    responses are kept for ttl_seconds, in memory or in SQLite when a database
+    path is given so several workers share them.
+    """
+
+    def __init__(self, ttl_seconds=300, db_path=None):
+        self.ttl_seconds = ttl_seconds
+        # key -> (future of (status, media_type, body), expires_at)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.last_purge = time.time()
+        self.stats = {"handled": 0, "replayed": 0, "joined": 0, "uncached": 0}
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS webhook_responses (key TEXT PRIMARY KEY, "
+                "status INTEGER NOT NULL, media_type TEXT, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    async def key(self, request):
+        """The delivery key, or None when the request carries no idempotency token"""
+        token = request.headers.get("I-Twilio-Idempotency-Token")
+        if not token:
+            return None
+        form_data = await request.form()
+        return f"{form_data.get('CallSid', '')}|{request.url.path}?{request.url.query}|{token}"
+
+    def _stored(self, key, now):
+        if self.db is None:
+            return None
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, media_type, body FROM webhook_responses WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        return (row[0], row[1], bytes(row[2])) if row else None
+
+    def _store(self, key, response, expires_at):
+        if self.db is None:
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO webhook_responses (key, status, media_type, body, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, *response, expires_at),
+            )
+            self.db.commit()
+
+    async def handle(self, request, handler):
+        """Run handler once per delivery key and replay its response for duplicates"""
+        key = await self.key(request)
+        if key is None:
+            self._count("uncached")
+            return await handler()
+        now = time.time()
+        with self.lock:
+            self._purge_expired(now)
+            entry = self.entries.get(key)
+            if entry is None:
+                future = asyncio.get_running_loop().create_future()
+                self.entries[key] = (future, now + self.ttl_seconds)
+        if entry is not None:
+            future = entry[0]
+            self._count("replayed" if future.done() else "joined")
+            print(f"Replaying response for duplicate webhook {key}")
+            try:
+                return Response(*self._unpack(await asyncio.shield(future)))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The first delivery failed without a response, so handle this one
+                return await handler()
+
+        stored = self._stored(key, now)
+        if stored is not None:
+            self._count("replayed")
+            future.set_result(stored)
+            print(f"Replaying response for duplicate webhook {key}")
+            return Response(*self._unpack(stored))
+
+        try:
+            response = await handler()
+        except BaseException:
+            # Nothing to replay; let a redelivery run the handler again
+            with self.lock:
+                self.entries.pop(key, None)
+            future.cancel()
+            raise
+        cached = (response.status_code, response.media_type, bytes(response.body))
+        self._count("handled")
+        future.set_result(cached)
+        self._store(key, cached, now + self.ttl_seconds)
+        return response
+
+    @staticmethod
+    def _unpack(cached):
+        status, media_type, body = cached
+        return body, status, None, media_type
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def report(self):
+        with self.lock:
+            return {**self.stats, "cached": len(self.entries)}
+
+    def _purge_expired(self, now):
+        if now - self.last_purge < 60:
+            return
+        self.last_purge = now
+        expired = [key for key, (_, expires_at) in self.entries.items() if expires_at < now]
+        for key in expired:
+            del self.entries[key]
+        if self.db is not None:
+            self.db.execute("DELETE FROM webhook_responses WHERE expires_at < ?", (now,))
+            self.db.commit()
+
+
+webhook_cache = WebhookReplayCache(
+    ttl_seconds=settings.WEBHOOK_REPLAY_TTL, db_path=settings.WEBHOOK_REPLAY_DB or None
+)
+
+
+def idempotent(endpoint):
+    """Replay the endpoint's TwiML for duplicate deliveries of the same webhook"""
+
+    @functools.wraps(endpoint)
+    async def wrapper(request: Request, *args, **kwargs):
+        return await webhook_cache.handle(request, lambda: endpoint(request, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,154 @@
+import math
+import os
+import re
+from collections import Counter
+from config.settings import settings
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "and", "or",
+    "in", "on", "for", "with", "at", "by", "from", "do", "does", "did", "what",
+    "how", "can", "i", "you", "your", "we", "our", "it", "this", "that", "me",
+    "my", "about", "tell", "please", "which", "who", "when", "where", "there",
+}
+
+
+# Stripped repeatedly, longest first, so "donate", "donation" and "donations" share a stem
+SUFFIXES = ("ings", "ing", "ions", "ion", "ments", "ment", "ers", "er", "ies", "es", "ed", "al", "ly", "s", "e")
+
+
+def stem(word):
+    """Light suffix stripping; only needs to map related forms to the same key"""
+    while True:
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[: -len(suffix)]
+                break
+        else:
+            return word
+
+
+def tokenize(text):
+    return [stem(word) for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS]
+
+
+def split_sections(text, max_chars):
+    """Split markdown into passages per heading, keeping the heading path for context"""
+    passages = []
+    headings = {}
+    lines = []
+
+    def flush():
+        body = "\n".join(line for line in lines if line.strip())
+        if body:
+            title = " > ".join(headings[level] for level in sorted(headings))
+            passages.extend(_split_long(f"{title}\n{body}" if title else body, max_chars))
+        lines.clear()
+
+    for line in text.splitlines():
+        match = re.match(r"^(#{1,6})\s+(.*)", line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            headings = {lvl: title for lvl, title in headings.items() if lvl < level}
+            headings[level] = match.group(2).strip()
+        else:
+            lines.append(line)
+    flush()
+    return passages
+
+
+def _split_long(passage, max_chars):
+    if len(passage) <= max_chars:
+        return [passage]
+    chunks, current = [], ""
+    for line in passage.splitlines():
+        if current and len(current) + len(line) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class KnowledgeBase:
+    """In-memory knowledge base with a BM25 index, reloaded only when the file changes"""
+
+    def __init__(self, path, passage_chars=600, k1=1.5, b=0.75):
+        self.path = path
+        self.passage_chars = passage_chars
+        self.k1 = k1
+        self.b = b
+        self.signature = None
+        self.text = ""
+        self.passages = []
+        self.term_freqs = []
+        self.doc_freqs = Counter()
+        self.avg_length = 0.0
+
+    def refresh(self):
+        """Reload and re-index the file if its mtime or size changed"""
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            if self.signature is None:
+                print(f"Error loading knowledge base: {e}")
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.text = file.read()
+        self.passages = split_sections(self.text, self.passage_chars)
+        self.term_freqs = [Counter(tokenize(passage)) for passage in self.passages]
+        self.doc_freqs = Counter(term for freqs in self.term_freqs for term in freqs)
+        lengths = [sum(freqs.values()) for freqs in self.term_freqs]
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        self.signature = signature
+        print(f"Knowledge base indexed: {len(self.passages)} passages")
+
+    def _score(self, query_terms, index):
+        freqs = self.term_freqs[index]
+        length = sum(freqs.values())
+        total = len(self.passages)
+        score = 0.0
+        for term in query_terms:
+            tf = freqs.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (total - self.doc_freqs[term] + 0.5) / (self.doc_freqs[term] + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            score += idf * tf * (self.k1 + 1) / norm
+        return score
+
+    def retrieve(self, question, k=4, max_chars=4000):
+        """Return the most relevant passages for a question within a character budget
+
+        A knowledge base that fits in the budget is returned whole; ranking only
+        decides what to leave out of a larger one.
+        """
+        self.refresh()
+        if not self.passages:
+            return []
+        if len(self.text) <= max_chars:
+            return [self.text.strip()]
+
+        query_terms = set(tokenize(question))
+        scored = [(self._score(query_terms, i), i) for i in range(len(self.passages))]
+        ranked = [i for score, i in sorted(scored, reverse=True) if score > 0][:k]
+        if not ranked:
+            # Nothing matched, fall back to the organization overview
+            ranked = [0]
+
+        selected, used = [], 0
+        for i in ranked:
+            passage = self.passages[i]
+            if selected and used + len(passage) > max_chars:
+                break
+            selected.append(passage)
+            used += len(passage)
+        return selected
+
+
+knowledge_base = KnowledgeBase(settings.KNOWLEDGE_BASE_FILE)
@@ -0,0 +1,93 @@
+from services.answer_service import pending_answers
+from services.email_service import email_outbox
+from services.faq_index import faq_index
+from services.gemini_service import gemini_admission, gemini_call
+from services.idempotency_service import webhook_cache
+from services.prefetch_service import speculative_prefetch
+from services.sheets_sink import sheets_sink
+from utils.admission import PRIORITY_IN_PROGRESS
+from utils.metrics import Counter, Gauge, registry
+
+
+def _priority_name(priority):
+    return "in_progress" if priority == PRIORITY_IN_PROGRESS else "new"
+
+
+def _llm_requests():
+    with gemini_admission.lock:
+        stats = {priority: dict(counts) for priority, counts in gemini_admission.stats.items()}
+    return {
+        (_priority_name(priority), result): count
+        for priority, counts in stats.items()
+        for result, count in counts.items()
+    }
+
+
+def _counts(stats, keys):
+    return {(key,): stats[key] for key in keys}
+
+
+# Read from the state each service already keeps, when /metrics is scraped
+Gauge(
+    "voice_agent_circuit_open",
+    "1 while the dependency's circuit breaker rejects calls",
+    ("dependency",),
+    collect=lambda: {("gemini",): int(gemini_call.breaker.state == "open")},
+)
+Gauge(
+    "voice_agent_llm_in_flight",
+    "Gemini requests running now",
+    collect=lambda: {(): gemini_admission.in_flight},
+)
+Gauge(
+    "voice_agent_llm_queued",
+    "Gemini requests waiting for admission",
+    collect=lambda: {(): len(gemini_admission.waiters)},
+)
+Counter(
+    "voice_agent_llm_requests_total",
+    "Gemini requests admitted or shed (shed_<reason>), by call priority",
+    ("priority", "result"),
+    collect=_llm_requests,
+)
+Counter(
+    "voice_agent_faq_answers_total",
+    "Questions answered from the FAQ index (hits) or not (misses)",
+    ("result",),
+    collect=lambda: _counts(faq_index.report(), ("hits", "misses")),
+)
+Counter(
+    "voice_agent_webhook_budget_total",
+    "How FAQ answers met the webhook budget: on time, held, or replaced",
+    ("outcome",),
+    collect=lambda: _counts(
+        pending_answers.report(), ("on_time", "held", "answered_after_hold", "cached", "canned")
+    ),
+)
+Counter(
+    "voice_agent_prefetch_total",
+    "Speculative prefetches reused, discarded, or missing when the final transcript arrived",
+    ("result",),
+    collect=lambda: _counts(speculative_prefetch.report(), ("hits", "misses", "none")),
+)
+Counter(
+    "voice_agent_webhook_deliveries_total",
+    "Webhook deliveries handled, duplicates replayed or joined, and requests without a token",
+    ("result",),
+    collect=lambda: _counts(webhook_cache.report(), ("handled", "replayed", "joined", "uncached")),
+)
+Gauge(
+    "voice_agent_sheets_pending_rows",
+    "Rows buffered for the next Google Sheets append",
+    collect=lambda: {(): sheets_sink.status()["pending"]},
+)
+Gauge(
+    "voice_agent_email_outbox",
+    "Thank-you emails waiting to be sent, or failed for good",
+    ("status",),
+    collect=lambda: _counts(email_outbox.status(), ("queued", "failed")),
+)
+
+
+def render_metrics():
+    return registry.render()
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from config.settings import settings
+from services.answer_service import prepare_question
+from services.faq_index import similarity
+
+
+def partial_text(stable, unstable):
+    """Best guess at the final transcript from a Gather partial result"""
+    stable, unstable = stable.strip(), unstable.strip()
+    if unstable.startswith(stable):
+        return unstable
+    return f"{stable} {unstable}".strip()
+
+
+class SpeculativePrefetch:
+    """FAQ lookup, translation and retrieval started from Gather partial results.
+
+    Twilio posts interim transcripts to the partialResultCallback while the
+    caller is still speaking. Each call keeps one speculation, restarted only
+    when the transcript drifts away from the text it was started for. When the
+    final SpeechResult reaches /handle-faq, the speculation is reused if the
+    two texts are similar enough; otherwise it is dropped and the question is
+    prepared from scratch. Speculations live in this process only, so with
+    several workers a final result that lands elsewhere simply misses.
+    """
+
+    def __init__(self, min_words=3, threshold=0.8, ttl=60.0):
+        self.min_words = min_words
+        self.threshold = threshold
+        self.ttl = ttl
+        # call_sid -> {"text", "task", "sequence", "started_at"}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = {"started": 0, "restarted": 0, "hits": 0, "misses": 0, "none": 0, "saved_seconds": 0.0}
+
+    def submit(self, call_sid, text, sequence=0):
+        """Start preparing text for the call unless the current speculation already covers it"""
+        if not call_sid or len(text.split()) < self.min_words:
+            return
+        now = time.monotonic()
+        with self.lock:
+            self._purge_expired(now)
+            current = self.pending.get(call_sid)
+            if current is not None:
+                # Partial results can arrive out of order
+                if sequence and sequence <= current["sequence"]:
+                    return
+                if similarity(text, current["text"]) >= self.threshold:
+                    current["sequence"] = sequence
+                    return
+                current["task"].cancel()
+                self.stats["restarted"] += 1
+            self.stats["started"] += 1
+            self.pending[call_sid] = {
+                "text": text,
+                "task": asyncio.ensure_future(prepare_question(text)),
+                "sequence": sequence,
+                "started_at": now,
+            }
+
+    async def take(self, call_sid, question):
+        """Return the prepared question if the speculation matches the final transcript, else None"""
+        with self.lock:
+            entry = self.pending.pop(call_sid, None) if call_sid else None
+            if entry is None:
+                self.stats["none"] += 1
+                return None
+            if similarity(question, entry["text"]) < self.threshold:
+                entry["task"].cancel()
+                self.stats["misses"] += 1
+                return None
+
+        waited = time.monotonic()
+        try:
+            prepared = await entry["task"]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Speculative prefetch failed: {e}")
+            return None
+        with self.lock:
+            self.stats["hits"] += 1
+            # Time the speculation had been running before the final result arrived
+            self.stats["saved_seconds"] += waited - entry["started_at"]
+        print(f"Reusing speculative prefetch for: {entry['text']}")
+        return {**prepared, "question": question}
+
+    def discard(self, call_sid):
+        with self.lock:
+            entry = self.pending.pop(call_sid, None)
+        if entry is not None:
+            entry["task"].cancel()
+
+    def report(self):
+        with self.lock:
+            stats = dict(self.stats)
+            pending = len(self.pending)
+        finals = stats["hits"] + stats["misses"] + stats["none"]
+        return {
+            **stats,
+            "saved_seconds": round(stats["saved_seconds"], 3),
+            "pending": pending,
+            "hit_rate": round(stats["hits"] / finals, 3) if finals else None,
+        }
+
+    def _purge_expired(self, now):
+        # Calls that hung up before a final result never call take()
+        expired = [sid for sid, entry in self.pending.items() if now - entry["started_at"] > self.ttl]
+        for sid in expired:
+            self.pending.pop(sid)["task"].cancel()
+
+
+speculative_prefetch = SpeculativePrefetch(
+    min_words=settings.PREFETCH_MIN_WORDS,
+    threshold=settings.PREFETCH_REUSE_THRESHOLD,
+    ttl=settings.PREFETCH_TTL,
+)
@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+from config.settings import settings
+
+
+class CallSessionStore:
+    """Per-call state keyed by Twilio's CallSid.
+
+    Each step of a call flow stores what it collected (raw speech, translated
+    and formatted values) so later steps can reuse it instead of redoing the
+    work. Sessions live in memory with a TTL; when a database path is given
+    they are kept in SQLite instead so several workers share them.
+    """
+
+    def __init__(self, ttl_seconds=3600, db_path=None):
+        self.ttl_seconds = ttl_seconds
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.last_purge = time.time()
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS call_sessions "
+                "(call_sid TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    def _expired(self, updated_at):
+        return time.time() - updated_at > self.ttl_seconds
+
+    def get(self, call_sid):
+        """Return a copy of the call's session, or an empty dict"""
+        if not call_sid:
+            return {}
+        with self.lock:
+            if self.db is not None:
+                # The database is authoritative since another worker may own earlier steps
+                row = self.db.execute(
+                    "SELECT data, updated_at FROM call_sessions WHERE call_sid = ?",
+                    (call_sid,),
+                ).fetchone()
+                entry = (json.loads(row[0]), row[1]) if row else None
+            else:
+                entry = self.sessions.get(call_sid)
+            if entry is None or self._expired(entry[1]):
+                return {}
+            return dict(entry[0])
+
+    def update(self, call_sid, **fields):
+        """Merge fields into the call's session and return the result"""
+        if not call_sid:
+            return dict(fields)
+        session = self.get(call_sid)
+        session.update(fields)
+        now = time.time()
+        with self.lock:
+            if self.db is None:
+                self.sessions[call_sid] = (session, now)
+            else:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO call_sessions (call_sid, data, updated_at) VALUES (?, ?, ?)",
+                    (call_sid, json.dumps(session, ensure_ascii=False), now),
+                )
+                self.db.commit()
+            self._purge_expired(now)
+        return dict(session)
+
+    def clear(self, call_sid):
+        with self.lock:
+            self.sessions.pop(call_sid, None)
+            if self.db is not None:
+                self.db.execute("DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,))
+                self.db.commit()
+
+    def _purge_expired(self, now):
+        if now - self.last_purge < 60:
+            return
+        self.last_purge = now
+        if self.db is not None:
+            self.db.execute(
+                "DELETE FROM call_sessions WHERE updated_at < ?", (now - self.ttl_seconds,)
+            )
+            self.db.commit()
+            return
+        expired = [sid for sid, (_, updated_at) in self.sessions.items() if now - updated_at > self.ttl_seconds]
+        for sid in expired:
+            del self.sessions[sid]
+
+
+call_sessions = CallSessionStore(
+    ttl_seconds=settings.CALL_SESSION_TTL, db_path=settings.CALL_SESSION_DB or None
+)
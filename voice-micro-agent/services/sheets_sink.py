@@ -0,0 +1,178 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from google.oauth2.service_account import Credentials
+import gspread
+from config.settings import settings
+from utils.metrics import external_call
+
+SCOPES = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+
+def retry_after(error):
+    """Seconds the Sheets API asked us to wait, or None when it is not a quota error"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status != 429 and not (status and status >= 500):
+        return None
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class SheetsSink:
+    """Write-behind buffer that appends caller rows to Google Sheets in batches"""
+
+    def __init__(self, sheet_name, batch_size=50, flush_interval=5.0, max_buffer=1000,
+                 spill_path="", max_backoff=64.0):
+        self.sheet_name = sheet_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.spill_path = spill_path
+        self.max_backoff = max_backoff
+        self.pending = deque()
+        self.spilled = 0
+        self.condition = threading.Condition()
+        self.worksheet = None
+        self.thread = None
+        self.running = False
+        self.backoff = 0.0
+        self.stats = {"api_calls": 0, "rows_written": 0, "failures": 0, "last_error": None}
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+            self._load_spill()
+        self.thread = threading.Thread(target=self._run, name="sheets-sink", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10.0):
+        """Flush what we can and keep the rest on disk for the next start"""
+        with self.condition:
+            if not self.running:
+                return
+            self.running = False
+            self.condition.notify()
+        self.thread.join(timeout)
+        with self.condition:
+            self._spill(list(self.pending))
+            self.pending.clear()
+
+    def enqueue(self, row):
+        """Queue a row without touching the network"""
+        if not self.running:
+            self.start()
+        with self.condition:
+            if len(self.pending) >= self.max_buffer:
+                self._spill([row])
+            else:
+                self.pending.append(row)
+            if len(self.pending) + self.spilled >= self.batch_size:
+                self.condition.notify()
+
+    def status(self):
+        with self.condition:
+            return {
+                "pending": len(self.pending),
+                "spilled": self.spilled,
+                "backoff_seconds": self.backoff,
+                **self.stats,
+            }
+
+    def _get_worksheet(self):
+        # One authorized client and worksheet handle for the life of the process
+        if self.worksheet is None:
+            credentials = Credentials.from_service_account_file(
+                settings.GOOGLE_CREDENTIALS_FILE, scopes=SCOPES
+            )
+            client = gspread.authorize(credentials)
+            self.worksheet = client.open(self.sheet_name).sheet1
+        return self.worksheet
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + max(self.flush_interval, self.backoff)
+                while self.running and (
+                    self.backoff or len(self.pending) + self.spilled < self.batch_size
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                running = self.running
+                if self.spilled and len(self.pending) < self.max_buffer:
+                    self._load_spill()
+                rows = list(self.pending)
+                self.pending.clear()
+            if rows:
+                self._flush(rows)
+            if not running:
+                return
+
+    def _flush(self, rows):
+        try:
+            with external_call("sheets"):
+                self._get_worksheet().append_rows(rows, value_input_option="USER_ENTERED")
+        except Exception as e:
+            wait = retry_after(e)
+            if wait is None:
+                # Anything other than quota or server errors may be a stale handle
+                self.worksheet = None
+            with self.condition:
+                self.stats["api_calls"] += 1
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                self.backoff = min(
+                    self.max_backoff, max(wait or 0.0, self.backoff * 2 or 1.0)
+                ) * random.uniform(1.0, 1.2)
+                # Put the batch back in front so rows keep their order
+                room = max(self.max_buffer - len(self.pending), 0)
+                self.pending.extendleft(reversed(rows[:room]))
+                self._spill(rows[room:])
+            print(f"Error appending {len(rows)} rows to Google Sheet, retrying in {self.backoff:.1f}s: {e}")
+            return
+        with self.condition:
+            self.stats["api_calls"] += 1
+            self.stats["rows_written"] += len(rows)
+            self.backoff = 0.0
+        print(f"User data saved to Google Sheet: {len(rows)} rows")
+
+    def _spill(self, rows):
+        if not rows:
+            return
+        if not self.spill_path:
+            print(f"Sheets buffer full, dropping {len(rows)} rows")
+            return
+        with open(self.spill_path, "a", encoding="utf-8") as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.spilled += len(rows)
+
+    def _load_spill(self):
+        """Move spilled rows back into memory, called with the lock held"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, "r", encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file if line.strip()]
+        os.remove(self.spill_path)
+        self.spilled = 0
+        room = max(self.max_buffer - len(self.pending), 0)
+        self.pending.extend(rows[:room])
+        self._spill(rows[room:])
+
+
+sheets_sink = SheetsSink(
+    settings.GOOGLE_SHEET_NAME,
+    batch_size=settings.SHEETS_BATCH_SIZE,
+    flush_interval=settings.SHEETS_FLUSH_INTERVAL,
+    max_buffer=settings.SHEETS_MAX_BUFFER,
+    spill_path=settings.SHEETS_SPILL_FILE,
+)
@@ -0,0 +1,272 @@
+"""Conversational FAQ mode over Twilio Media Streams.
+
+Twilio sends the call audio over a WebSocket as base64 mu-law frames. A
+speech recognizer plug-in turns frames into partial and final transcripts;
+transcripts can also arrive directly as ``{"event": "transcript"}`` messages
+from an external recognizer or from loadtest/stream_replay.py. Work starts
+on partial transcripts: once one is long enough and the caller pauses for
+STREAM_SPECULATION_DELAY seconds, the question is prepared and the answer
+generated speculatively, at most STREAM_MAX_SPECULATIONS times per question.
+The result is kept if the final transcript is close enough to it. Answers are sent back sentence by sentence,
+so the caller hears the first sentence while the rest is still generated.
+
+Plug-ins are configured as ``module:ClassName`` in STREAM_STT and STREAM_TTS:
+
+- a recognizer has ``async accept_audio(payload: bytes)`` returning a list of
+  ``(text, is_final)`` tuples, and ``async close()``;
+- a synthesizer has ``async synthesize(text)`` returning 8 kHz mu-law audio.
+
+Without a synthesizer, sentences are sent as ``{"event": "answer"}`` text
+messages, which test clients and TTS relays understand but Twilio does not.
+"""
+import asyncio
+import base64
+import importlib
+import json
+import re
+import threading
+import time
+from config.settings import settings
+from services.answer_service import prepare_question, shed_answer
+from services.faq_index import similarity
+from services.gemini_service import DEGRADED_ANSWER, FALLBACK_ANSWER, stream_generate
+from utils.admission import LoadShedError
+from utils.resilience import CircuitOpenError, LatencyWindow
+
+SENTENCE_END = re.compile(r"(.+?[।.!?])(?:\s+|$)", re.S)
+AUDIO_CHUNK_BYTES = 8000
+
+stream_stats = {
+    "turns": 0, "speculations": 0, "speculation_hits": 0, "speculation_misses": 0, "barge_ins": 0,
+    "synthesis_errors": 0,
+}
+first_sentence_latency = LatencyWindow()
+stats_lock = threading.Lock()
+
+
+def split_sentences(text):
+    """Return the complete sentences in text and the unfinished remainder"""
+    sentences, end = [], 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append(match.group(1).strip())
+        end = match.end()
+    return sentences, text[end:]
+
+
+def load_plugin(path):
+    """Instantiate a plug-in given as module:ClassName, or return None"""
+    if not path:
+        return None
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def stream_report():
+    with stats_lock:
+        report = dict(stream_stats)
+    p50, p95 = first_sentence_latency.percentile(50), first_sentence_latency.percentile(95)
+    report["first_sentence_p50_ms"] = round(p50 * 1000, 1) if p50 is not None else None
+    report["first_sentence_p95_ms"] = round(p95 * 1000, 1) if p95 is not None else None
+    return report
+
+
+def count(stat):
+    with stats_lock:
+        stream_stats[stat] += 1
+
+
+class SpeculativeAnswer:
+    """Prepares and generates the answer for one transcript in the background.
+
+    Sentences are buffered until the answer is committed (the final transcript
+    matched) and then consumed by the speaker.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.sentences = asyncio.Queue()
+        self.task = asyncio.ensure_future(self._produce())
+
+    def cancel(self):
+        self.task.cancel()
+
+    async def _produce(self):
+        prepared = None
+        try:
+            prepared = await prepare_question(self.text)
+            if prepared["faq"] is not None:
+                sentences, rest = split_sentences(prepared["faq"]["answer"])
+                for sentence in sentences + ([rest] if rest.strip() else []):
+                    self.sentences.put_nowait(sentence)
+                return
+
+            buffer = ""
+            async for chunk in stream_generate(prepared["prompt"], "knowledge_base_stream"):
+                sentences, buffer = split_sentences(buffer + chunk)
+                for sentence in sentences:
+                    self.sentences.put_nowait(sentence)
+            if buffer.strip():
+                self.sentences.put_nowait(buffer.strip())
+        except asyncio.CancelledError:
+            raise
+        except LoadShedError:
+            self.sentences.put_nowait(shed_answer(prepared))
+        except CircuitOpenError:
+            print("Gemini circuit open, sending degraded streamed answer")
+            self.sentences.put_nowait(DEGRADED_ANSWER)
+        except asyncio.TimeoutError:
+            print(f"Streamed answer timed out, sending degraded answer for: {self.text}")
+            self.sentences.put_nowait(DEGRADED_ANSWER)
+        except Exception as e:
+            print(f"Error generating streamed answer: {e}")
+            self.sentences.put_nowait(FALLBACK_ANSWER)
+        finally:
+            self.sentences.put_nowait(None)
+
+    async def __aiter__(self):
+        while True:
+            sentence = await self.sentences.get()
+            if sentence is None:
+                return
+            yield sentence
+
+
+class MediaStreamSession:
+    """One Twilio Media Streams connection and its question-answer turns"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.stream_sid = None
+        self.call_sid = None
+        self.recognizer = load_plugin(settings.STREAM_STT)
+        self.synthesizer = load_plugin(settings.STREAM_TTS)
+        self.speculation = None
+        self.speaking = None
+        # A pending speculation start, pushed back by every new partial transcript
+        self.debounce = None
+        self.speculations = 0
+
+    async def run(self):
+        try:
+            while True:
+                message = json.loads(await self.websocket.receive_text())
+                event = message.get("event")
+                if event == "start":
+                    self.stream_sid = message["start"].get("streamSid")
+                    self.call_sid = message["start"].get("callSid")
+                    print(f"Media stream started for call {self.call_sid}")
+                elif event == "media" and self.recognizer is not None:
+                    payload = base64.b64decode(message["media"]["payload"])
+                    for text, final in await self.recognizer.accept_audio(payload):
+                        await self.on_transcript(text, final)
+                elif event == "transcript":
+                    transcript = message.get("transcript", {})
+                    await self.on_transcript(transcript.get("text", ""), transcript.get("final", False))
+                elif event == "stop":
+                    break
+        finally:
+            await self.close()
+
+    async def close(self):
+        for task in (self.debounce, self.speculation, self.speaking):
+            if task is not None:
+                task.cancel()
+        if self.recognizer is not None:
+            await self.recognizer.close()
+
+    async def on_transcript(self, text, final):
+        text = text.strip()
+        if not text:
+            return
+        if self.speaking is not None and not self.speaking.done():
+            # The caller talked over the answer: stop playback and listen
+            self.speaking.cancel()
+            await self.send({"event": "clear", "streamSid": self.stream_sid})
+            count("barge_ins")
+
+        if not final:
+            if len(text.split()) >= settings.STREAM_MIN_PARTIAL_WORDS and not self._matches(text):
+                self._schedule_speculation(text)
+            return
+
+        count("turns")
+        if self.debounce is not None:
+            self.debounce.cancel()
+            self.debounce = None
+        self.speculations = 0
+        if self._matches(text):
+            count("speculation_hits")
+            answer = self.speculation
+        else:
+            count("speculation_misses")
+            if self.speculation is not None:
+                self.speculation.cancel()
+            answer = SpeculativeAnswer(text)
+        self.speculation = None
+        self.speaking = asyncio.ensure_future(self.speak(answer, time.monotonic()))
+
+    def _schedule_speculation(self, text):
+        """Speculate on text once partials pause, within the per-question limit"""
+        if self.debounce is not None:
+            self.debounce.cancel()
+            self.debounce = None
+        if self.speculations >= settings.STREAM_MAX_SPECULATIONS:
+            return
+        self.debounce = asyncio.get_running_loop().call_later(
+            settings.STREAM_SPECULATION_DELAY, self._speculate, text
+        )
+
+    def _speculate(self, text):
+        self.debounce = None
+        if self.speculation is not None:
+            self.speculation.cancel()
+        self.speculation = SpeculativeAnswer(text)
+        self.speculations += 1
+        count("speculations")
+
+    def _matches(self, text):
+        if self.speculation is None:
+            return False
+        return similarity(text, self.speculation.text) >= settings.STREAM_REUSE_THRESHOLD
+
+    async def speak(self, answer, final_at):
+        index = 0
+        try:
+            async for sentence in answer:
+                if index == 0:
+                    first_sentence_latency.record(time.monotonic() - final_at)
+                await self.send_sentence(sentence, index)
+                index += 1
+        except asyncio.CancelledError:
+            # Interrupted, so the rest of the answer is no longer needed
+            answer.cancel()
+            raise
+        except Exception as e:
+            # Nothing awaits this task, so log rather than lose the error
+            print(f"Error speaking answer for call {self.call_sid}: {e}")
+            answer.cancel()
+
+    async def send_sentence(self, sentence, index):
+        if self.synthesizer is None:
+            await self.send({
+                "event": "answer",
+                "streamSid": self.stream_sid,
+                "answer": {"text": sentence, "index": index},
+            })
+            return
+        try:
+            audio = await self.synthesizer.synthesize(sentence)
+        except Exception as e:
+            count("synthesis_errors")
+            print(f"Speech synthesis failed for call {self.call_sid}, skipping sentence {index}: {e}")
+            return
+        for start in range(0, len(audio), AUDIO_CHUNK_BYTES):
+            await self.send({
+                "event": "media",
+                "streamSid": self.stream_sid,
+                "media": {"payload": base64.b64encode(audio[start:start + AUDIO_CHUNK_BYTES]).decode()},
+            })
+        await self.send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": f"sentence-{index}"}})
+
+    async def send(self, message):
+        await self.websocket.send_text(json.dumps(message, ensure_ascii=False))
@@ -0,0 +1,267 @@
+import contextvars
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from fastapi import Request
+from config.settings import settings
+from utils.resilience import LatencyWindow
+
+# The turn being handled; tasks started by the handler share it unless they run_traced
+current_turn = contextvars.ContextVar("current_turn", default=None)
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to the current turn's timings"""
+    turn = current_turn.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if turn is not None:
+            timings = turn["timings_ms"]
+            timings[name] = round(timings.get(name, 0.0) + (time.perf_counter() - start) * 1000, 1)
+
+
+def annotate(**fields):
+    """Attach values such as translated speech or formatted fields to the current turn"""
+    turn = current_turn.get()
+    if turn is not None:
+        turn["fields"].update(fields)
+
+
+def new_record():
+    """Fields and timings of work that can outlive the turn that started it"""
+    return {"fields": {}, "timings_ms": {}, "started": time.perf_counter()}
+
+
+async def run_traced(record, work):
+    """Run work() with stages and annotations going to record instead of the caller's turn"""
+    # Tasks run in a copy of the context, so this does not touch the webhook's turn
+    current_turn.set(record)
+    return await work()
+
+
+def merge(record, name):
+    """Add a background record to the current turn: its fields, stage timings and age as name"""
+    turn = current_turn.get()
+    if turn is None or record is None:
+        return
+    turn["fields"].update(record["fields"])
+    timings = turn["timings_ms"]
+    for stage_name, ms in record["timings_ms"].items():
+        timings[stage_name] = round(timings.get(stage_name, 0.0) + ms, 1)
+    timings[name] = round((time.perf_counter() - record["started"]) * 1000, 1)
+
+
+def turn_latency(turn):
+    """How long the caller waited on this turn; an answer collected after a hold counts from the question"""
+    timings = turn["timings_ms"]
+    return max(timings.get("total", 0.0), timings.get("answer_task", 0.0))
+
+
+class TraceLog:
+    """Per-turn call traces appended to a JSON Lines file by a background thread.
+
+    Handlers only put a finished turn on a queue; serializing and writing happen
+    on the writer thread, and turns are dropped rather than blocking a webhook
+    when the queue is full. The file is rotated at max_bytes, keeping backups
+    older files (path.1 is the newest), and queries read them oldest first.
+    """
+
+    def __init__(self, path, max_bytes=10_000_000, backups=5, max_queue=10000, flush_interval=1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(max_queue)
+        # Held while writing or rotating, so queries never read a file mid-rotation
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.stats = {"written": 0, "dropped": 0, "rotations": 0, "last_error": None}
+
+    def start(self):
+        with self.lock:
+            if self.running or not self.path:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="trace-log", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10.0):
+        """Write what is queued and stop the writer"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def record(self, turn):
+        """Queue a finished turn without touching the disk"""
+        if not self.path:
+            return
+        if not self.running:
+            self.start()
+        try:
+            self.queue.put_nowait(turn)
+        except queue.Full:
+            with self.lock:
+                self.stats["dropped"] += 1
+
+    def status(self):
+        with self.lock:
+            return {"queued": self.queue.qsize(), **self.stats}
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < 500:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            self._write([turn for turn in batch if turn is not None])
+            if stopping:
+                return
+
+    def _write(self, turns):
+        if not turns:
+            return
+        lines = "".join(json.dumps(turn, ensure_ascii=False) + "\n" for turn in turns)
+        with self.lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(lines)
+                self.stats["written"] += len(turns)
+            except OSError as e:
+                self.stats["dropped"] += len(turns)
+                self.stats["last_error"] = str(e)
+                print(f"Error writing {len(turns)} call traces: {e}")
+
+    def _rotate(self):
+        """Shift path.N-1 to path.N and so on, dropping the oldest; called with the lock held"""
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.stats["rotations"] += 1
+
+    def _turns(self):
+        """Every stored turn, oldest first"""
+        paths = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)] + [self.path]
+        with self.lock:
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                with open(path, "r", encoding="utf-8") as file:
+                    for line in file:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            # A partial line left by a crash mid-write
+                            continue
+
+    def timeline(self, call_sid):
+        """The call's turns in the order they were handled"""
+        turns = [turn for turn in self._turns() if turn.get("call_sid") == call_sid]
+        return {
+            "call_sid": call_sid,
+            "turns": turns,
+            "agent_ms": round(sum(turn["timings_ms"].get("total", 0.0) for turn in turns), 1),
+        }
+
+    def slow_turns(self, threshold, limit=20):
+        """Turns slower than threshold seconds, grouped by endpoint with the stages they spent time in"""
+        threshold_ms = threshold * 1000
+        endpoints = defaultdict(
+            lambda: {"turns": 0, "slow": 0, "window": LatencyWindow(size=None), "stages": defaultdict(float)}
+        )
+        slowest = []
+        for turn in self._turns():
+            total = turn_latency(turn)
+            group = endpoints[turn["endpoint"]]
+            group["turns"] += 1
+            if total < threshold_ms:
+                continue
+            group["slow"] += 1
+            group["window"].record(total)
+            for name, ms in turn["timings_ms"].items():
+                if name not in ("total", "answer_task"):
+                    group["stages"][name] += ms
+            slowest.append(turn)
+            if len(slowest) > limit * 2:
+                slowest = sorted(slowest, key=turn_latency, reverse=True)[:limit]
+
+        report = {}
+        for endpoint, group in sorted(endpoints.items()):
+            if not group["slow"]:
+                continue
+            report[endpoint] = {
+                "turns": group["turns"],
+                "slow": group["slow"],
+                "slow_p50_ms": group["window"].percentile(50),
+                "slow_p95_ms": group["window"].percentile(95),
+                "slow_max_ms": max(group["window"].samples),
+                # Where the slow turns spent their time, on average
+                "mean_stage_ms": {
+                    name: round(ms / group["slow"], 1) for name, ms in sorted(group["stages"].items())
+                },
+            }
+        return {
+            "threshold_ms": threshold_ms,
+            "endpoints": report,
+            "slowest": sorted(slowest, key=turn_latency, reverse=True)[:limit],
+        }
+
+
+trace_log = TraceLog(
+    settings.TRACE_LOG_FILE,
+    max_bytes=settings.TRACE_LOG_MAX_BYTES,
+    backups=settings.TRACE_LOG_BACKUPS,
+)
+
+
+def traced(endpoint):
+    """Record each turn the webhook handles: caller speech, collected fields and stage timings"""
+
+    @functools.wraps(endpoint)
+    async def wrapper(request: Request, *args, **kwargs):
+        form_data = await request.form()
+        turn = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "call_sid": form_data.get("CallSid", ""),
+            "endpoint": request.url.path,
+            "query": request.url.query,
+            "speech": form_data.get("SpeechResult", ""),
+            "confidence": form_data.get("Confidence", ""),
+            "fields": {},
+            "timings_ms": {},
+        }
+        token = current_turn.set(turn)
+        start = time.perf_counter()
+        try:
+            return await endpoint(request, *args, **kwargs)
+        finally:
+            current_turn.reset(token)
+            turn["timings_ms"]["total"] = round((time.perf_counter() - start) * 1000, 1)
+            # A snapshot, since tasks sharing the turn may still add to it
+            trace_log.record({**turn, "fields": dict(turn["fields"]), "timings_ms": dict(turn["timings_ms"])})
+
+    return wrapper
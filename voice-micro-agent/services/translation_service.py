@@ -1,12 +1,188 @@
-from googletrans import Translator
-
-translator = Translator()
-
-def translate_to_english(text):
-    """Translate text to English"""
-    try:
-        translation = translator.translate(text, dest='en')
-        return translation.text
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return f"{text} (translation failed)"
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from deep_translator import GoogleTranslator
+from config.settings import settings
+from services.trace_service import stage
+from utils.deadline import time_left
+from utils.metrics import external_call
+
+# deep-translator keeps each request's parameters on the translator, so every
+# thread gets its own instance
+local = threading.local()
+
+# deep-translator is blocking, so calls run on a small pool off the event loop
+executor = ThreadPoolExecutor(
+    max_workers=settings.TRANSLATION_WORKERS, thread_name_prefix="translate"
+)
+
+BATCH_SEPARATOR = "\n"
+
+
+def normalize(text):
+    return " ".join(text.split()).casefold()
+
+
+class TranslationCache:
+    """Bounded LRU of translations, optionally persisted to SQLite"""
+
+    def __init__(self, max_entries=2048, db_path=None):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS translations (source TEXT PRIMARY KEY, translated TEXT NOT NULL)"
+            )
+            self.db.commit()
+
+    def get(self, text):
+        key = normalize(text)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            if self.db is None:
+                return None
+            row = self.db.execute(
+                "SELECT translated FROM translations WHERE source = ?", (key,)
+            ).fetchone()
+        if row:
+            self._remember(key, row[0])
+            return row[0]
+        return None
+
+    def set(self, text, translated):
+        key = normalize(text)
+        self._remember(key, translated)
+        if self.db is not None:
+            with self.lock:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO translations (source, translated) VALUES (?, ?)",
+                    (key, translated),
+                )
+                self.db.commit()
+
+    def _remember(self, key, translated):
+        with self.lock:
+            self.entries[key] = translated
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+cache = TranslationCache(
+    max_entries=settings.TRANSLATION_CACHE_SIZE,
+    db_path=settings.TRANSLATION_CACHE_DB or None,
+)
+
+
+def needs_translation(text):
+    """Latin-only text such as 'gmail' or spelled-out emails is already English"""
+    return not text.isascii()
+
+
+def translate_text(text):
+    """One Google Translate request, to English from the detected language"""
+    translator = getattr(local, "translator", None)
+    if translator is None:
+        translator = local.translator = GoogleTranslator(source="auto", target="en")
+    return translator.translate(text)
+
+
+def translate_batch(texts):
+    """Translate several strings with a single Google Translate request"""
+    with external_call("translate"):
+        return _translate_batch(texts)
+
+
+def _translate_batch(texts):
+    if len(texts) == 1:
+        return [translate_text(texts[0])]
+
+    joined = translate_text(BATCH_SEPARATOR.join(texts))
+    parts = joined.split(BATCH_SEPARATOR)
+    if len(parts) == len(texts):
+        return [part.strip() for part in parts]
+
+    # The separator did not survive translation, fall back to one request per string
+    return [translate_text(text) for text in texts]
+
+
+class TranslationBatcher:
+    """Joins translations requested by concurrent calls into batched requests
+
+    A text missing from the cache waits up to window seconds for others to
+    join it, then they go out as one Google Translate request of at most
+    max_batch strings. A text already waiting or being translated shares
+    that request's result.
+    """
+
+    def __init__(self, window=0.01, max_batch=16):
+        self.window = window
+        self.max_batch = max_batch
+        self.futures = {}
+        self.pending = {}
+        self.timer = None
+        self.tasks = set()
+
+    def submit(self, text):
+        """Future for the text's translation, or None if the request failed"""
+        key = normalize(text)
+        future = self.futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.futures[key] = loop.create_future()
+            self.pending[key] = text
+            if len(self.pending) >= self.max_batch:
+                self._send()
+            elif self.timer is None:
+                self.timer = loop.call_later(self.window, self._send)
+        return future
+
+    def _send(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, {}
+        task = asyncio.ensure_future(self._translate(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _translate(self, batch):
+        texts = list(batch.values())
+        try:
+            translations = await asyncio.get_running_loop().run_in_executor(executor, translate_batch, texts)
+            for text, translated in zip(texts, translations):
+                cache.set(text, translated)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            translations = [None] * len(texts)
+        for key, translated in zip(batch, translations):
+            future = self.futures.pop(key)
+            if not future.done():
+                future.set_result(translated)
+
+
+batcher = TranslationBatcher(
+    window=settings.TRANSLATION_BATCH_WINDOW, max_batch=settings.TRANSLATION_BATCH_SIZE
+)
+
+
+async def translate_to_english_async(text):
+    """Translate text to English off the event loop, through the cache and the batcher"""
+    with stage("translation"):
+        if not text.strip() or not needs_translation(text):
+            return text
+        translated = cache.get(text)
+        if translated is None:
+            try:
+                # Shielded so a caller out of time does not cancel a request others share
+                translated = await asyncio.wait_for(asyncio.shield(batcher.submit(text)), time_left())
+            except asyncio.TimeoutError:
+                print("Translation timed out")
+        return translated if translated is not None else f"{text} (translation failed)"
@@ -1,31 +1,91 @@
-from twilio.rest import Client
+import asyncio
+import httpx
 from config.settings import settings
+from utils.metrics import external_call
 
-# Initialize Twilio client
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 
-def make_faq_outbound_call():
-    """Make an outbound call using Twilio"""
+class TwilioRestClient:
+    """Async Twilio REST client on one pooled keep-alive connection set.
+
+    Calls are created with a plain form POST to the Calls resource, so no
+    request blocks a threadpool worker, and a semaphore bounds how many
+    requests are in flight at once.
+    """
+
+    def __init__(self, account_sid, auth_token, base_url, timeout=10.0, max_concurrency=10):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.client = None
+        self.slots = None
+
+    def _client(self):
+        # Created on first use so the pool binds to the running event loop
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.account_sid or "", self.auth_token or ""),
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+        return self.client
+
+    async def create_call(self, to, from_, url, status_callback=None):
+        """POST to the Calls resource and return Twilio's JSON for the new call"""
+        data = {"To": to, "From": from_, "Url": url}
+        if status_callback:
+            data["StatusCallback"] = status_callback
+        client = self._client()
+        async with self.slots:
+            with external_call("twilio"):
+                response = await client.post(f"/2010-04-01/Accounts/{self.account_sid}/Calls.json", data=data)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise RuntimeError(f"Twilio returned {response.status_code}: {message}")
+        return response.json()
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+twilio_client = TwilioRestClient(
+    settings.TWILIO_ACCOUNT_SID,
+    settings.TWILIO_AUTH_TOKEN,
+    settings.TWILIO_API_BASE,
+    timeout=settings.TWILIO_TIMEOUT,
+    max_concurrency=settings.TWILIO_MAX_CONCURRENCY,
+)
+
+async def place_call(to, path, status_callback=None):
+    """Call a number and run the flow served at path on our webhook"""
     try:
-        call = client.calls.create(
-            to=settings.TO_NUMBER,
+        call = await twilio_client.create_call(
+            to=to,
             from_=settings.TWILIO_PHONE_NUMBER,
-            url=f"{settings.WEBHOOK_URL}/voice-faq"
+            url=f"{settings.WEBHOOK_URL}{path}",
+            status_callback=status_callback,
         )
-        return {"success": True, "sid": call.sid}
+        return {"success": True, "sid": call["sid"]}
     except Exception as e:
-        print(f"Error making call: {e}")
+        print(f"Error making call to {to}: {e}")
         return {"success": False, "error": str(e)}
-    
-def make_info_outbound_call():
+
+async def make_faq_outbound_call():
     """Make an outbound call using Twilio"""
-    try:
-        call = client.calls.create(
-            to=settings.TO_NUMBER,
-            from_=settings.TWILIO_PHONE_NUMBER,
-            url=f"{settings.WEBHOOK_URL}/voice-info"
-        )
-        return {"success": True, "sid": call.sid}
-    except Exception as e:
-        print(f"Error making call: {e}")
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+    return await place_call(settings.TO_NUMBER, "/voice-faq")
+
+async def make_info_outbound_call():
+    """Make an outbound call using Twilio"""
+    return await place_call(settings.TO_NUMBER, "/voice-info")
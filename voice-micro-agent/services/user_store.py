@@ -0,0 +1,194 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from config.settings import settings
+
+CSV_HEADER = ["Name", "Email", "Blood Group", "Registration Date"]
+
+
+def normalize_email(email):
+    """Stored and looked-up form of an address, so lookups agree before and after a commit"""
+    return email.strip().lower()
+
+
+class UserStore:
+    """Registered callers in SQLite (WAL), written in batched transactions.
+
+    Rows are buffered briefly and committed together, so a burst of calls
+    costs one fsync instead of one per caller. WAL mode and a busy timeout
+    let several workers write to the same file; readers never block writers.
+    Emails are stored lower-cased. Writes happen outside the buffer lock, so a
+    commit waiting on another worker never holds up add().
+    """
+
+    def __init__(self, db_path, batch_size=20, commit_interval=1.0):
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.pending = []
+        self.condition = threading.Condition()
+        # Serializes commits; add() and is_registered() only need the condition
+        self.write_lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.db = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+            "email TEXT NOT NULL COLLATE NOCASE, blood_group TEXT NOT NULL, "
+            "registered_at TEXT NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS users_email ON users (email)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS users_registered_at ON users (registered_at)")
+        self.db.commit()
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="user-store", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            if not self.running:
+                return
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+    def add(self, name, email, blood_group, registered_at):
+        """Buffer a registration; it is committed with the next batch"""
+        if not self.running:
+            self.start()
+        with self.condition:
+            self.pending.append((name, normalize_email(email), blood_group, registered_at))
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify()
+
+    def flush(self):
+        with self.write_lock:
+            with self.condition:
+                rows, self.pending = self.pending, []
+            if not rows:
+                return 0
+            try:
+                # May wait up to the busy timeout for another worker, without blocking add()
+                with self.db:
+                    self.db.executemany(
+                        "INSERT INTO users (name, email, blood_group, registered_at) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+            except sqlite3.Error:
+                # Keep the batch for the next attempt, e.g. while another worker holds the lock
+                with self.condition:
+                    self.pending[:0] = rows
+                raise
+        return len(rows)
+
+    def is_registered(self, email):
+        """Indexed lookup, including registrations not yet committed
+
+        Can wait on the database, so async code should call it with asyncio.to_thread.
+        """
+        if not email:
+            return False
+        email = normalize_email(email)
+        with self.condition:
+            if any(row[1] == email for row in self.pending):
+                return True
+        row = self.db.execute(
+            "SELECT 1 FROM users WHERE email = ? COLLATE NOCASE LIMIT 1", (email,)
+        ).fetchone()
+        return row is not None
+
+    def count(self):
+        with self.condition:
+            pending = len(self.pending)
+        return self.db.execute("SELECT COUNT(*) FROM users").fetchone()[0] + pending
+
+    def export_csv(self, file):
+        """Write all registrations, oldest first, in the original CSV layout"""
+        self.flush()
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        rows = self.db.execute(
+            "SELECT name, email, blood_group, registered_at FROM users ORDER BY registered_at, id"
+        ).fetchall()
+        writer.writerows(rows)
+        return len(rows)
+
+    def import_csv(self, path):
+        """One-time migration of the legacy user_data.csv into an empty store"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            rows = [
+                (name, normalize_email(email), blood_group, registered_at)
+                for name, email, blood_group, registered_at in (
+                    row[:4] for row in csv.reader(file) if len(row) >= 4 and row != CSV_HEADER
+                )
+            ]
+        with self.write_lock:
+            # Take the write lock first so only one worker performs the migration
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                if self.db.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+                    self.db.rollback()
+                    return 0
+                self.db.executemany(
+                    "INSERT INTO users (name, email, blood_group, registered_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self.db.commit()
+            except sqlite3.Error:
+                self.db.rollback()
+                raise
+        print(f"Imported {len(rows)} users from {path}")
+        return len(rows)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.commit_interval
+                while self.running and len(self.pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                running = self.running
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error committing user data: {e}")
+            if not running:
+                return
+
+
+user_store = UserStore(
+    settings.USER_DATA_DB,
+    batch_size=settings.USER_DATA_BATCH_SIZE,
+    commit_interval=settings.USER_DATA_COMMIT_INTERVAL,
+)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Export registered users as CSV")
+    parser.add_argument("--output", help="CSV file to write, stdout by default")
+    args = parser.parse_args()
+
+    user_store.import_csv(settings.USER_DATA_CSV)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as file:
+            count = user_store.export_csv(file)
+        print(f"Exported {count} users to {args.output}")
+    else:
+        user_store.export_csv(sys.stdout)
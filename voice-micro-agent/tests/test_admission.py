@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from utils.admission import PRIORITY_IN_PROGRESS, PRIORITY_NEW, AdmissionController, LoadShedError
+from utils.deadline import deadline_scope
+
+
+async def hold(controller, release, order, label, priority=PRIORITY_NEW, tokens=1):
+    async with controller.admit(tokens, priority):
+        order.append(label)
+        await release.wait()
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1)
+        release, order = asyncio.Event(), []
+        first = asyncio.ensure_future(hold(controller, release, order, "first"))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(hold(controller, release, order, "new-1")),
+            asyncio.ensure_future(hold(controller, release, order, "new-2")),
+            asyncio.ensure_future(hold(controller, release, order, "call", PRIORITY_IN_PROGRESS)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *waiters)
+        return controller, order
+
+    controller, order = asyncio.run(scenario())
+    assert order == ["first", "call", "new-1", "new-2"]
+    assert controller.report()["in_flight"] == 0 and controller.report()["admitted"] == 4
+
+
+def test_full_queue_displaces_lower_priority_or_sheds():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=1)
+        release, order = asyncio.Event(), []
+        first = asyncio.ensure_future(hold(controller, release, order, "first"))
+        await asyncio.sleep(0)
+        displaced = asyncio.ensure_future(hold(controller, release, order, "new"))
+        await asyncio.sleep(0)
+        call = asyncio.ensure_future(hold(controller, release, order, "call", PRIORITY_IN_PROGRESS))
+        await asyncio.sleep(0)
+        with pytest.raises(LoadShedError) as rejected:
+            await hold(controller, release, order, "late")
+        release.set()
+        results = await asyncio.gather(first, displaced, call, return_exceptions=True)
+        return controller, order, results, rejected.value
+
+    controller, order, results, rejected = asyncio.run(scenario())
+    assert order == ["first", "call"]
+    assert isinstance(results[1], LoadShedError) and results[1].reason == "displaced"
+    assert rejected.reason == "queue_full"
+    assert controller.report()["by_priority"]["new"]["shed_displaced"] == 1
+
+
+def test_waiters_are_shed_at_the_queue_timeout_or_deadline():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1, queue_timeout=0.05)
+        release, order = asyncio.Event(), []
+        first = asyncio.ensure_future(hold(controller, release, order, "first"))
+        await asyncio.sleep(0)
+        with pytest.raises(LoadShedError) as timed_out:
+            await hold(controller, release, order, "slow")
+        with deadline_scope(0), pytest.raises(LoadShedError) as no_time:
+            await hold(controller, release, order, "late")
+        release.set()
+        await first
+        return controller, timed_out.value, no_time.value
+
+    controller, timed_out, no_time = asyncio.run(scenario())
+    assert timed_out.reason == "timeout" and no_time.reason == "deadline"
+    assert controller.report()["queued"] == 0
+
+
+def test_token_bucket_delays_until_refilled_and_settles_actual_usage():
+    async def scenario():
+        # 6000 tokens a minute refill 100 a second
+        controller = AdmissionController("test", max_concurrency=5, tokens_per_minute=6000)
+        async with controller.admit(6000) as ticket:
+            ticket["tokens"] = 5990
+        assert round(controller.tokens) == 10
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with controller.admit(15):
+            waited = loop.time() - start
+        return waited
+
+    waited = asyncio.run(scenario())
+    assert 0.03 <= waited < 0.5
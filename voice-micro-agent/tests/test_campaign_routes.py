@@ -0,0 +1,23 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes.campaign_routes import campaign_router
+from services.campaign_service import campaign_scheduler
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(campaign_router)
+    return TestClient(app)
+
+
+def test_campaign_without_valid_numbers_is_rejected_and_not_registered():
+    before = set(campaign_scheduler.campaigns)
+    response = make_client().post("/campaigns", json={"numbers": ["12", "not a number"]})
+    assert response.status_code == 400
+    assert set(campaign_scheduler.campaigns) == before
+
+
+def test_unknown_flow_is_rejected():
+    response = make_client().post("/campaigns", json={"numbers": ["9876543210"], "flow": "survey"})
+    assert response.status_code == 400
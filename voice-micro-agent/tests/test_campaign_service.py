@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import time
+
+from services import campaign_service
+from services.campaign_service import Campaign, CampaignScheduler, normalize_number, parse_numbers
+
+
+def test_numbers_are_normalized_to_e164():
+    assert normalize_number("98765 43210") == "+919876543210"
+    assert normalize_number("09876-543210") == "+919876543210"
+    assert normalize_number("0044 20 7946 0958") == "+442079460958"
+    assert normalize_number("+1 (415) 555-0100") == "+14155550100"
+    assert normalize_number("12345") is None
+
+
+def test_parse_numbers_skips_header_and_blank_lines():
+    text = 'phone,name\n"9876543210",Asha\n\n+14155550100\n'
+    assert parse_numbers(text) == ["9876543210", "+14155550100"]
+
+
+def test_campaign_dedupes_and_records_invalid_numbers():
+    campaign = Campaign("faq", ["9876543210", "09876543210", "abc"])
+    assert list(campaign.entries) == ["+919876543210"]
+    assert campaign.invalid == ["abc"]
+    assert campaign.progress()["numbers"] == 1
+
+
+def run_scheduler(monkeypatch, numbers, outcomes, **kwargs):
+    """Dial numbers, answering each placed call with the next final status"""
+    sids = (f"CA{n}" for n in itertools.count())
+    placed = []
+
+    async def place_call(number, flow_path, status_callback):
+        placed.append(number)
+        return {"success": True, "sid": next(sids)}
+
+    monkeypatch.setattr(campaign_service, "place_call", place_call)
+
+    async def scenario():
+        scheduler = CampaignScheduler(cps=1000, retry_delay=0, **kwargs)
+        campaign = scheduler.create("faq", numbers)
+        pending = list(outcomes)
+        for _ in range(200):
+            await asyncio.sleep(0.001)
+            live = [sid for sid in scheduler.live if sid.startswith("CA")]
+            assert len(scheduler.live) <= scheduler.max_live_calls
+            for sid in live:
+                scheduler.handle_status(sid, pending.pop(0) if pending else "completed")
+            if campaign.progress()["done"] == len(campaign.entries):
+                break
+        await scheduler.stop()
+        return scheduler, campaign
+
+    scheduler, campaign = asyncio.run(scenario())
+    return scheduler, campaign, placed
+
+
+def test_busy_numbers_are_retried_up_to_max_attempts(monkeypatch):
+    scheduler, campaign, placed = run_scheduler(
+        monkeypatch, ["9876543210"], ["busy", "busy", "busy"], max_attempts=3
+    )
+    entry = campaign.entries["+919876543210"]
+    assert placed == ["+919876543210"] * 3
+    assert entry["state"] == "busy" and entry["attempts"] == 3
+
+
+def test_live_calls_stay_under_the_cap(monkeypatch):
+    numbers = [f"98765432{n:02d}" for n in range(6)]
+    scheduler, campaign, placed = run_scheduler(monkeypatch, numbers, [], max_live_calls=2)
+    assert sorted(placed) == sorted(campaign.entries)
+    assert campaign.progress()["states"] == {"completed": 6}
+    assert scheduler.status()["placed"] == 6
+
+
+def test_status_arriving_before_the_call_sid_is_applied():
+    scheduler = CampaignScheduler()
+    assert scheduler.handle_status("CA1", "completed") is False
+    assert scheduler.early_statuses == {"CA1": "completed"}
+
+
+def test_stop_is_not_lost_when_a_wakeup_lands_at_the_same_time():
+    async def scenario():
+        scheduler = CampaignScheduler()
+        scheduler.start()
+        await asyncio.sleep(0.01)
+        scheduler.wakeup.set()
+        started = time.monotonic()
+        await scheduler.stop()
+        return scheduler, time.monotonic() - started
+
+    scheduler, elapsed = asyncio.run(scenario())
+    assert scheduler.task is None and elapsed < 0.5
@@ -0,0 +1,108 @@
+import smtplib
+
+from services import email_service
+from services.email_service import EmailOutbox, SmtpConnection, render_thank_you_email
+
+
+class FakeSmtp:
+    def __init__(self, errors=()):
+        self.sent = []
+        self.errors = list(errors)
+        self.closed = 0
+
+    def send(self, msg):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(msg["To"])
+
+    def close(self):
+        self.closed += 1
+
+    def close_if_idle(self):
+        pass
+
+
+def make_outbox(tmp_path, smtp, **kwargs):
+    outbox = EmailOutbox(str(tmp_path / "outbox.db"), **kwargs)
+    outbox.smtp = smtp
+    # Keep enqueue from starting the worker thread, so tests drive delivery
+    outbox.running = True
+    return outbox
+
+
+def deliver_due(outbox):
+    for row in outbox._claim():
+        outbox._deliver(*row)
+
+
+def test_queued_email_is_sent_once_and_removed(tmp_path):
+    smtp = FakeSmtp()
+    outbox = make_outbox(tmp_path, smtp)
+    outbox.enqueue("Priya", "priya@example.com", "O+")
+    deliver_due(outbox)
+    deliver_due(outbox)
+    assert smtp.sent == ["priya@example.com"]
+    assert outbox.status()["queued"] == 0 and outbox.status()["sent"] == 1
+
+
+def test_failures_back_off_then_give_up(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(email_service.time, "time", lambda: now[0])
+    smtp = FakeSmtp(errors=[smtplib.SMTPServerDisconnected("gone")] * 2)
+    outbox = make_outbox(tmp_path, smtp, max_attempts=2, base_delay=30)
+    outbox.enqueue("Priya", "priya@example.com", "O+")
+
+    deliver_due(outbox)
+    assert smtp.closed == 1
+    now[0] += 29
+    assert outbox._claim() == []
+    now[0] += 1
+    deliver_due(outbox)
+    assert outbox.status()["failed"] == 1
+    assert smtp.sent == []
+
+
+def test_claimed_emails_are_leased_to_one_worker(tmp_path):
+    outbox = make_outbox(tmp_path, FakeSmtp())
+    other = make_outbox(tmp_path, FakeSmtp())
+    outbox.enqueue("Priya", "priya@example.com", "O+")
+    assert len(outbox._claim()) == 1
+    assert other._claim() == []
+
+
+def test_smtp_session_is_reused_and_reconnected(monkeypatch):
+    sessions = []
+
+    class Server:
+        def __init__(self, host, port, timeout):
+            self.messages = []
+            self.drop_next = False
+            sessions.append(self)
+
+        def starttls(self):
+            pass
+
+        def login(self, user, password):
+            pass
+
+        def send_message(self, msg):
+            if self.drop_next:
+                raise smtplib.SMTPServerDisconnected("idle")
+            self.messages.append(msg)
+
+        def quit(self):
+            pass
+
+    monkeypatch.setattr(email_service.smtplib, "SMTP", Server)
+    connection = SmtpConnection("smtp.example.com", 587)
+    connection.send("one")
+    connection.send("two")
+    assert len(sessions) == 1 and sessions[0].messages == ["one", "two"]
+    sessions[0].drop_next = True
+    connection.send("three")
+    assert len(sessions) == 2 and sessions[1].messages == ["three"]
+
+
+def test_template_escapes_caller_values():
+    body = render_thank_you_email("<b>Priya</b>", "priya@example.com", "O+")
+    assert "&lt;b&gt;Priya&lt;/b&gt;" in body and "<b>Priya" not in body
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from config.settings import settings
+from services.faq_index import FaqIndex, content_words
+
+index = FaqIndex(settings.FAQ_ANSWERS_FILE, threshold=settings.FAQ_MATCH_THRESHOLD)
+
+
+def test_topic_questions_match_their_answer():
+    assert index.match("क्या आप छात्रवृत्ति देते हो")[0]["id"] == "education"
+    assert index.match("मैं दान कैसे कर सकता हूं")[0]["id"] == "donate"
+    assert index.match("how can i volunteer")[0]["id"] == "volunteer"
+
+
+def test_shared_phrasing_alone_does_not_match():
+    for question in ("क्या आप नौकरी देते हैं", "आपके कौन कौन से डॉक्टर हैं", "how can i get a job"):
+        assert index.match(question) == (None, 0.0)
+
+
+def test_content_words_drop_question_phrasing():
+    assert content_words("क्या आप नौकरी देते हैं") == {"नौकरी"}
+
+
+def test_generated_answers_skip_errors_and_survive_load_shedding(tmp_path, monkeypatch):
+    gemini_service = pytest.importorskip("services.gemini_service")
+    from utils.admission import LoadShedError
+
+    path = tmp_path / "faq_answers.json"
+    entries = [
+        {"id": "good", "questions": ["What programs do you run?"], "answer": ""},
+        {"id": "failed", "questions": ["How can I volunteer?"], "answer": ""},
+        {"id": "shed", "questions": ["How can I donate?"], "answer": ""},
+    ]
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    answers = {
+        "What programs do you run?": "शिक्षा और स्वास्थ्य",
+        "How can I volunteer?": gemini_service.FALLBACK_ANSWER,
+    }
+
+    async def respond(question):
+        if question not in answers:
+            raise LoadShedError("gemini", "queue_full")
+        return answers[question]
+
+    monkeypatch.setattr(gemini_service, "get_knowledge_base_response", respond)
+    faq = FaqIndex(str(path))
+    asyncio.run(faq.generate_missing_answers())
+    saved = {entry["id"]: entry["answer"] for entry in json.loads(path.read_text(encoding="utf-8"))}
+    assert saved == {"good": "शिक्षा और स्वास्थ्य", "failed": "", "shed": ""}
@@ -0,0 +1,36 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from services.idempotency_service import idempotent
+
+
+def make_app():
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/faq-hold")
+    @idempotent
+    async def faq_hold(request: Request):
+        app.state.calls += 1
+        return Response(f"<Response>{app.state.calls}</Response>", media_type="application/xml")
+
+    return app
+
+
+def test_redelivery_with_the_same_token_is_replayed():
+    app = make_app()
+    client = TestClient(app)
+    form = {"CallSid": "CAreplay"}
+    first = client.post("/faq-hold", data=form, headers={"I-Twilio-Idempotency-Token": "t1"})
+    again = client.post("/faq-hold", data=form, headers={"I-Twilio-Idempotency-Token": "t1"})
+    assert first.text == again.text
+    assert app.state.calls == 1
+
+
+def test_identical_requests_without_a_token_each_run():
+    app = make_app()
+    client = TestClient(app)
+    form = {"CallSid": "CAnotoken"}
+    responses = [client.post("/faq-hold", data=form).text for _ in range(2)]
+    assert responses == ["<Response>1</Response>", "<Response>2</Response>"]
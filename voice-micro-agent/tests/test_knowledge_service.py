@@ -0,0 +1,33 @@
+from services.knowledge_service import KnowledgeBase, stem
+
+KNOWLEDGE = """# NGO
+
+## Organization Information
+We run education, healthcare and livelihood programs in rural districts.
+
+## Donation Information
+Donations can be made by bank transfer or UPI. All donations are tax exempt under 80G.
+
+## Contact Information
+Call our office between 10am and 6pm.
+"""
+
+
+def make_kb(tmp_path):
+    path = tmp_path / "knowledge.txt"
+    path.write_text(KNOWLEDGE, encoding="utf-8")
+    return KnowledgeBase(str(path))
+
+
+def test_related_forms_share_a_stem():
+    assert stem("donate") == stem("donation") == stem("donations")
+    assert stem("volunteer") == stem("volunteering")
+
+
+def test_small_knowledge_base_is_sent_whole(tmp_path):
+    assert make_kb(tmp_path).retrieve("How can I donate?", max_chars=4000) == [KNOWLEDGE.strip()]
+
+
+def test_retrieval_matches_word_forms(tmp_path):
+    passages = make_kb(tmp_path).retrieve("How can I donate?", k=1, max_chars=100)
+    assert passages[0].startswith("NGO > Donation Information")
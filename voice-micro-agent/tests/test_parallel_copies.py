@@ -0,0 +1,69 @@
+"""The CLI assistant keeps parallel copies of some utils; their shared behaviour must not drift"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from utils import metering, resilience
+
+CLI_UTILS = Path(__file__).resolve().parents[2] / "cli-assistant" / "ngo-assisstant" / "utils"
+
+
+def load_cli(name):
+    path = CLI_UTILS / f"{name}.py"
+    if not path.exists():
+        pytest.skip("cli-assistant is not checked out next to the voice agent")
+    spec = importlib.util.spec_from_file_location(f"cli_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def breaker_states(module, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    breaker = module.CircuitBreaker("dep", failure_threshold=2, reset_timeout=10)
+    states = []
+    for step in ("fail", "fail", "allow", "wait", "allow", "allow", "fail", "wait", "allow", "ok"):
+        if step == "fail":
+            breaker.record_failure()
+        elif step == "ok":
+            breaker.record_success()
+        elif step == "wait":
+            clock[0] += 10
+        else:
+            states.append(breaker.allow_request())
+        states.append(breaker.state)
+    return states
+
+
+def test_circuit_breakers_behave_the_same(monkeypatch):
+    cli = load_cli("resilience")
+    assert breaker_states(cli, monkeypatch) == breaker_states(resilience, monkeypatch)
+
+
+def test_latency_windows_and_hedge_delays_agree():
+    cli = load_cli("resilience")
+    calls = [
+        cli.ResilientCall("dep", timeout=5, hedge=True),
+        resilience.ResilientCall("dep", timeout=5, hedge=True),
+    ]
+    delays = []
+    for call in calls:
+        for ms in range(10, 260, 10):
+            call.latency.record(ms / 1000)
+        delays.append((call.hedge_delay(), call.latency.percentile(50), call.status()))
+    assert delays[0] == delays[1]
+
+
+def test_token_meters_summarize_the_same():
+    cli = load_cli("metering")
+    summaries = []
+    for module in (cli, metering):
+        meter = module.TokenMeter(0.075, 0.30)
+        meter.record("agent", "chat", 1200, 150)
+        meter.record("agent", "chat", 800, 50, estimated=True)
+        meter.record("agent", "intent", 40, 2)
+        summaries.append(meter.summary())
+        assert module.estimate_tokens("") == 0
+    assert summaries[0] == summaries[1]
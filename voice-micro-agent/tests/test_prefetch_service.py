@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+from services import prefetch_service  # noqa: E402
+from services.prefetch_service import SpeculativePrefetch, partial_text  # noqa: E402
+
+
+@pytest.fixture
+def prepared(monkeypatch):
+    started = []
+
+    async def prepare_question(text):
+        started.append(text)
+        await asyncio.sleep(0)
+        return {"question": text, "translated": text.upper()}
+
+    monkeypatch.setattr(prefetch_service, "prepare_question", prepare_question)
+    return started
+
+
+def test_partial_text_joins_stable_and_unstable_parts():
+    assert partial_text("blood donation", "blood donation camp kab") == "blood donation camp kab"
+    assert partial_text("blood donation", " camp kab ") == "blood donation camp kab"
+
+
+def test_matching_final_transcript_reuses_speculation(prepared):
+    async def scenario():
+        prefetch = SpeculativePrefetch(threshold=0.6)
+        prefetch.submit("CA1", "blood donation camp kab", sequence=1)
+        prefetch.submit("CA1", "blood donation camp kab hai", sequence=2)
+        result = await prefetch.take("CA1", "blood donation camp kab hai")
+        return prefetch, result
+
+    prefetch, result = asyncio.run(scenario())
+    assert prepared == ["blood donation camp kab"]
+    assert result == {"question": "blood donation camp kab hai", "translated": "BLOOD DONATION CAMP KAB"}
+    assert prefetch.report()["hits"] == 1 and prefetch.report()["pending"] == 0
+
+
+def test_drifting_transcript_restarts_and_late_partials_are_ignored(prepared):
+    async def scenario():
+        prefetch = SpeculativePrefetch(threshold=0.8)
+        prefetch.submit("CA1", "blood donation camp kab", sequence=2)
+        prefetch.submit("CA1", "volunteer kaise bane hum", sequence=1)
+        prefetch.submit("CA1", "volunteer kaise bane hum", sequence=3)
+        missed = await prefetch.take("CA1", "donate karne ke liye kya chahiye")
+        return prefetch, missed
+
+    prefetch, missed = asyncio.run(scenario())
+    assert missed is None
+    report = prefetch.report()
+    assert report["started"] == 2 and report["restarted"] == 1 and report["misses"] == 1
+
+
+def test_short_partials_and_expired_speculations_are_dropped(prepared, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prefetch_service.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        prefetch = SpeculativePrefetch(ttl=60)
+        prefetch.submit("CA1", "camp kab")
+        assert prefetch.report()["pending"] == 0
+        prefetch.submit("CA1", "blood donation camp kab")
+        now[0] += 61
+        prefetch.submit("CA2", "volunteer kaise bane hum")
+        return prefetch, await prefetch.take("CA1", "blood donation camp kab")
+
+    prefetch, result = asyncio.run(scenario())
+    assert result is None
+    assert prefetch.report()["none"] == 1 and prefetch.report()["pending"] == 1
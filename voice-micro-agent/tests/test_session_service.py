@@ -0,0 +1,44 @@
+import pytest
+
+from services import session_service
+from services.session_service import CallSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    db_path = str(tmp_path / "sessions.db") if request.param == "sqlite" else None
+    return CallSessionStore(ttl_seconds=60, db_path=db_path)
+
+
+def test_steps_merge_into_one_session(store):
+    store.update("CA1", name="राहुल", translated_name="Rahul")
+    store.update("CA1", formatted_email="rahul@gmail.com")
+    assert store.get("CA1") == {
+        "name": "राहुल",
+        "translated_name": "Rahul",
+        "formatted_email": "rahul@gmail.com",
+    }
+    assert store.get("CA2") == {}
+
+
+def test_returned_sessions_are_copies(store):
+    store.update("CA1", name="Rahul")
+    store.get("CA1")["name"] = "changed"
+    assert store.get("CA1") == {"name": "Rahul"}
+
+
+def test_sessions_expire_and_clear(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_service.time, "time", lambda: now[0])
+    store.update("CA1", name="Rahul")
+    store.update("CA2", name="Priya")
+    store.clear("CA2")
+    assert store.get("CA2") == {}
+    now[0] += 61
+    assert store.get("CA1") == {}
+
+
+def test_workers_share_sessions_through_sqlite(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    CallSessionStore(db_path=db_path).update("CA1", name="Rahul")
+    assert CallSessionStore(db_path=db_path).get("CA1") == {"name": "Rahul"}
@@ -0,0 +1,72 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("gspread")
+from services.sheets_sink import SheetsSink, retry_after  # noqa: E402
+
+
+class QuotaError(Exception):
+    def __init__(self, retry_after):
+        super().__init__("429 quota exceeded")
+        self.response = SimpleNamespace(status_code=429, headers={"Retry-After": str(retry_after)})
+
+
+class Worksheet:
+    def __init__(self, errors=()):
+        self.calls = []
+        self.errors = list(errors)
+
+    def append_rows(self, rows, value_input_option=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.calls.append(list(rows))
+
+
+def make_sink(tmp_path, worksheet, **kwargs):
+    sink = SheetsSink("sheet", spill_path=str(tmp_path / "spill.jsonl"), **kwargs)
+    sink.worksheet = worksheet
+    return sink
+
+
+def test_rows_are_appended_in_one_batch(tmp_path):
+    worksheet = Worksheet()
+    sink = make_sink(tmp_path, worksheet, batch_size=3, flush_interval=60)
+    for index in range(3):
+        sink.enqueue([f"name{index}", "a@b.c", "O+", "2024-01-01"])
+    sink.stop()
+    assert worksheet.calls == [[[f"name{index}", "a@b.c", "O+", "2024-01-01"] for index in range(3)]]
+    assert sink.status()["api_calls"] == 1
+
+
+def test_quota_errors_back_off_and_keep_row_order(tmp_path):
+    worksheet = Worksheet(errors=[QuotaError(retry_after=2)])
+    sink = make_sink(tmp_path, worksheet)
+    sink.pending.append(["later"])
+    sink._flush([["first"], ["second"]])
+    assert list(sink.pending) == [["first"], ["second"], ["later"]]
+    assert 2.0 <= sink.backoff <= 2.4
+    assert sink.worksheet is worksheet
+
+    sink._flush(list(sink.pending))
+    assert worksheet.calls == [[["first"], ["second"], ["later"]]]
+    assert sink.backoff == 0.0
+
+
+def test_overflow_spills_to_disk_and_returns_on_start(tmp_path):
+    sink = make_sink(tmp_path, Worksheet(), max_buffer=2)
+    sink.running = True
+    for index in range(3):
+        sink.enqueue([f"row{index}"])
+    spilled = (tmp_path / "spill.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in spilled] == [["row2"]]
+
+    restarted = make_sink(tmp_path, Worksheet())
+    restarted._load_spill()
+    assert list(restarted.pending) == [["row2"]]
+
+
+def test_only_quota_and_server_errors_are_retried_after():
+    assert retry_after(QuotaError(retry_after=5)) == 5.0
+    assert retry_after(ValueError("bad row")) is None
@@ -0,0 +1,18 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.settings import settings
+
+pytest.importorskip("google.generativeai")
+from routes import stream_routes  # noqa: E402
+
+
+def test_voice_stream_falls_back_to_gather_flow_without_plugins(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_STT", "")
+    monkeypatch.setattr(stream_routes, "schedule_warm_up", lambda: None)
+    app = FastAPI()
+    app.include_router(stream_routes.stream_router)
+    response = TestClient(app).post("/voice-stream")
+    assert "<Redirect>/voice-faq</Redirect>" in response.text
+    assert "<Connect>" not in response.text
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+from config.settings import settings  # noqa: E402
+from services import gemini_service, stream_service  # noqa: E402
+from services.stream_service import MediaStreamSession, SpeculativeAnswer  # noqa: E402
+
+
+class FailingStream:
+    usage_metadata = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise ConnectionError("stream reset")
+
+
+class StreamingModel:
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        return FailingStream()
+
+
+class Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+def test_failure_mid_stream_counts_against_the_breaker(monkeypatch):
+    monkeypatch.setattr(gemini_service, "gemini_model", StreamingModel())
+    breaker = gemini_service.gemini_call.breaker
+    failures = breaker.failures
+
+    async def consume():
+        async for _ in gemini_service.stream_generate("question", "test_stream"):
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(consume())
+    assert breaker.failures == failures + 1
+    breaker.record_success()
+
+
+def test_partials_start_a_bounded_number_of_speculations(monkeypatch):
+    started = []
+    monkeypatch.setattr(settings, "STREAM_SPECULATION_DELAY", 0.01)
+    monkeypatch.setattr(settings, "STREAM_MAX_SPECULATIONS", 2)
+    monkeypatch.setattr(settings, "STREAM_REUSE_THRESHOLD", 1.1)
+
+    class Speculation:
+        def __init__(self, text):
+            self.text = text
+            started.append(text)
+
+        def cancel(self):
+            pass
+
+    monkeypatch.setattr(stream_service, "SpeculativeAnswer", Speculation)
+
+    async def run():
+        session = MediaStreamSession(Socket())
+        words = "आपकी संस्था क्या काम करती है और कहाँ".split()
+        # A burst of partials faster than the delay starts nothing until they pause
+        for length in range(3, 6):
+            await session.on_transcript(" ".join(words[:length]), False)
+        await asyncio.sleep(0.05)
+        for length in range(6, len(words) + 1):
+            await session.on_transcript(" ".join(words[:length]), False)
+            await asyncio.sleep(0.05)
+        return session
+
+    asyncio.run(run())
+    assert started == ["आपकी संस्था क्या काम करती", "आपकी संस्था क्या काम करती है"]
+
+
+def test_synthesis_errors_are_logged_and_skipped(monkeypatch, capsys):
+    class BrokenSynthesizer:
+        async def synthesize(self, text):
+            raise RuntimeError("voice unavailable")
+
+    async def run():
+        session = MediaStreamSession(Socket())
+        session.synthesizer = BrokenSynthesizer()
+        await session.send_sentence("नमस्ते।", 0)
+        return session
+
+    session = asyncio.run(run())
+    assert session.websocket.sent == []
+    assert "Speech synthesis failed" in capsys.readouterr().out
@@ -0,0 +1,30 @@
+import asyncio
+
+from services.trace_service import annotate, current_turn, merge, new_record, run_traced, stage, turn_latency
+
+
+def test_task_record_is_merged_into_the_collecting_turn():
+    async def answer():
+        annotate(source="llm")
+        with stage("llm"):
+            await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        asking = {"fields": {}, "timings_ms": {}}
+        current_turn.set(asking)
+        record = new_record()
+        task = asyncio.ensure_future(run_traced(record, answer))
+        await task
+        # The turn that started the task gets nothing from it
+        assert asking == {"fields": {}, "timings_ms": {}}
+
+        collecting = {"fields": {}, "timings_ms": {"total": 1.0}}
+        current_turn.set(collecting)
+        merge(record, "answer_task")
+        return collecting
+
+    turn = asyncio.run(scenario())
+    assert turn["fields"] == {"source": "llm"}
+    assert turn["timings_ms"]["llm"] >= 10
+    assert turn_latency(turn) == turn["timings_ms"]["answer_task"] >= turn["timings_ms"]["llm"]
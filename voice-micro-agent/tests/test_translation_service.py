@@ -0,0 +1,41 @@
+import asyncio
+
+from services import translation_service
+from services.translation_service import TranslationBatcher, TranslationCache, translate_to_english_async
+
+
+def test_concurrent_translations_share_one_request(monkeypatch):
+    requests = []
+
+    def translate_text(text):
+        requests.append(text)
+        return "\n".join(f"[en] {line}" for line in text.split("\n"))
+
+    monkeypatch.setattr(translation_service, "translate_text", translate_text)
+    monkeypatch.setattr(translation_service, "cache", TranslationCache())
+    monkeypatch.setattr(translation_service, "batcher", TranslationBatcher(window=0.05))
+
+    async def run():
+        return await asyncio.gather(
+            translate_to_english_async("राहुल"),
+            translate_to_english_async("ओ पॉजिटिव"),
+            translate_to_english_async("राहुल"),
+            translate_to_english_async("gmail"),
+        )
+
+    assert asyncio.run(run()) == ["[en] राहुल", "[en] ओ पॉजिटिव", "[en] राहुल", "gmail"]
+    assert requests == ["राहुल\nओ पॉजिटिव"]
+
+    # Cached now, so asking again sends nothing
+    assert asyncio.run(translate_to_english_async("राहुल")) == "[en] राहुल"
+    assert len(requests) == 1
+
+
+def test_failed_translation_is_marked(monkeypatch):
+    def translate_text(text):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(translation_service, "translate_text", translate_text)
+    monkeypatch.setattr(translation_service, "cache", TranslationCache())
+    monkeypatch.setattr(translation_service, "batcher", TranslationBatcher(window=0))
+    assert asyncio.run(translate_to_english_async("नमस्ते")) == "नमस्ते (translation failed)"
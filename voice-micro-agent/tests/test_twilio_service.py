@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from services.twilio_service import TwilioRestClient
+
+
+def make_client():
+    return TwilioRestClient("ACtest", "token", "https://api.twilio.test/", timeout=7.0, max_concurrency=3)
+
+
+def test_client_builds_with_installed_httpx():
+    async def build():
+        twilio = make_client()
+        client = twilio._client()
+        try:
+            assert client.timeout.connect == 5.0
+            assert client.timeout.read == 7.0
+            assert twilio._client() is client
+        finally:
+            await twilio.close()
+
+    asyncio.run(build())
+
+
+def test_create_call_posts_to_calls_resource():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json={"sid": "CA123"})
+
+    async def call():
+        twilio = make_client()
+        client = twilio._client()
+        # Keep the pooled client's settings, answer requests locally
+        client._transport = httpx.MockTransport(handler)
+        try:
+            return await twilio.create_call("+911111111111", "+912222222222", "https://agent.test/voice-faq")
+        finally:
+            await twilio.close()
+
+    assert asyncio.run(call()) == {"sid": "CA123"}
+    assert requests[0].url.path == "/2010-04-01/Accounts/ACtest/Calls.json"
+    assert b"To=%2B911111111111" in requests[0].content
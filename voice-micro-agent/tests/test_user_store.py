@@ -0,0 +1,51 @@
+import csv
+import io
+import threading
+
+from services.user_store import CSV_HEADER, UserStore
+
+
+def make_store(tmp_path):
+    return UserStore(str(tmp_path / "users.db"), batch_size=100, commit_interval=60)
+
+
+def test_lookup_ignores_case_before_and_after_commit(tmp_path):
+    store = make_store(tmp_path)
+    store.add("Priya", "Priya@Example.com", "O+", "2024-01-01 10:00:00")
+    assert store.is_registered("priya@example.com")
+    store.flush()
+    assert store.is_registered("PRIYA@example.com")
+    assert not store.is_registered("amit@example.com")
+
+
+def test_add_does_not_wait_for_a_slow_commit(tmp_path):
+    store = make_store(tmp_path)
+    store.add("Priya", "priya@example.com", "O+", "2024-01-01 10:00:00")
+    # Another worker holds the database write lock while this one commits
+    blocker = UserStore(str(tmp_path / "users.db"))
+    blocker.db.execute("BEGIN IMMEDIATE")
+    flushing = threading.Thread(target=store.flush)
+    flushing.start()
+    added = threading.Event()
+    threading.Thread(
+        target=lambda: (store.add("Amit", "amit@example.com", "B+", "2024-01-01 10:01:00"), added.set())
+    ).start()
+    assert added.wait(1.0)
+    blocker.db.rollback()
+    flushing.join()
+    store.flush()
+    assert store.count() == 2
+
+
+def test_import_and_export_csv(tmp_path):
+    legacy = tmp_path / "user_data.csv"
+    with open(legacy, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        writer.writerow(["Priya", "Priya@Example.com", "O+", "2024-01-01 10:00:00"])
+    store = make_store(tmp_path)
+    assert store.import_csv(str(legacy)) == 1
+    assert store.import_csv(str(legacy)) == 0
+    buffer = io.StringIO()
+    store.export_csv(buffer)
+    assert buffer.getvalue().splitlines()[1] == "Priya,priya@example.com,O+,2024-01-01 10:00:00"
@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from utils.deadline import time_left
+from utils.resilience import LatencyWindow
+
+# Lower numbers are admitted first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+
+
+class LoadShedError(Exception):
+    """Raised when admission control turns a request away"""
+
+    def __init__(self, name, reason):
+        super().__init__(f"{name} request shed: {reason}")
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency and token-rate limits in front of one external dependency.
+
+    A request runs at once when a slot is free and the token bucket holds its
+    estimated tokens. Otherwise it waits in a queue ordered by priority, then
+    arrival. The queue is bounded: a request arriving at a full queue displaces
+    the newest waiter of a lower priority, or is shed itself. Waiters are shed
+    after queue_timeout seconds, or sooner if the caller's deadline is nearer.
+    All methods run on the event loop; only the stats are read from other threads.
+    """
+
+    def __init__(self, name, max_concurrency, tokens_per_minute=0, max_queue=50, queue_timeout=3.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tokens = float(tokens_per_minute)
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        # Heap of [priority, sequence, tokens, future]
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.timer = None
+        self.wait_latency = LatencyWindow()
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.tokens_per_minute > 0:
+            self.tokens = min(
+                self.tokens_per_minute,
+                self.tokens + (now - self.refilled_at) * self.tokens_per_minute / 60,
+            )
+        self.refilled_at = now
+
+    def _has_tokens(self, tokens):
+        # A request bigger than the whole bucket runs once the bucket is full
+        return self.tokens_per_minute <= 0 or self.tokens >= min(tokens, self.tokens_per_minute)
+
+    def _take(self, tokens):
+        self.in_flight += 1
+        if self.tokens_per_minute > 0:
+            self.tokens -= tokens
+
+    def _wake(self):
+        """Admit waiters in priority order while slots and tokens allow"""
+        self._refill()
+        while self.waiters and self.in_flight < self.max_concurrency:
+            _, _, tokens, future = self.waiters[0]
+            if not self._has_tokens(tokens):
+                # Out of tokens, not slots: check again once enough have refilled
+                if self.timer is None:
+                    deficit = min(tokens, self.tokens_per_minute) - self.tokens
+                    self.timer = asyncio.get_running_loop().call_later(
+                        deficit * 60 / self.tokens_per_minute, self._on_timer
+                    )
+                return
+            heapq.heappop(self.waiters)
+            self._take(tokens)
+            future.set_result(True)
+
+    def _remove(self, entry):
+        self.waiters.remove(entry)
+        heapq.heapify(self.waiters)
+
+    def _on_timer(self):
+        self.timer = None
+        self._wake()
+
+    def _shed(self, priority, reason):
+        self.count(priority, f"shed_{reason}")
+        return LoadShedError(self.name, reason)
+
+    @asynccontextmanager
+    async def admit(self, tokens, priority=PRIORITY_NEW):
+        """Hold a slot and tokens for the block; yields a ticket for the actual token count"""
+        await self._acquire(tokens, priority)
+        ticket = {"tokens": tokens}
+        try:
+            yield ticket
+        finally:
+            self.in_flight -= 1
+            if self.tokens_per_minute > 0:
+                # Give back what the estimate over-reserved, or charge what it missed
+                self.tokens = min(self.tokens_per_minute, self.tokens + tokens - ticket["tokens"])
+            self._wake()
+
+    async def _acquire(self, tokens, priority):
+        self._refill()
+        if not self.waiters and self.in_flight < self.max_concurrency and self._has_tokens(tokens):
+            self._take(tokens)
+            self.count(priority, "admitted")
+            self.wait_latency.record(0.0)
+            return
+
+        budget = time_left(self.queue_timeout)
+        if budget <= 0:
+            raise self._shed(priority, "deadline")
+        if len(self.waiters) >= self.max_queue:
+            worst = max(self.waiters)
+            if worst[0] <= priority:
+                raise self._shed(priority, "queue_full")
+            self._remove(worst)
+            worst[3].set_exception(self._shed(worst[0], "displaced"))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self.sequence), tokens, future]
+        heapq.heappush(self.waiters, entry)
+        # Starts the refill timer when tokens, not slots, are what is missing
+        self._wake()
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), budget)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._remove(entry)
+                raise self._shed(priority, "timeout")
+            # Admitted right at the deadline, or displaced (which raises here)
+            future.result()
+        except asyncio.CancelledError:
+            if future.done() and future.exception() is None:
+                # Admitted just as the caller gave up: hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            elif not future.done():
+                self._remove(entry)
+            raise
+        self.count(priority, "admitted")
+        self.wait_latency.record(time.monotonic() - start)
+
+    def count(self, priority, stat):
+        with self.lock:
+            counts = self.stats.setdefault(priority, {})
+            counts[stat] = counts.get(stat, 0) + 1
+
+    def report(self):
+        with self.lock:
+            by_priority = {priority: dict(counts) for priority, counts in self.stats.items()}
+        admitted = sum(counts.get("admitted", 0) for counts in by_priority.values())
+        shed = sum(
+            count for counts in by_priority.values()
+            for stat, count in counts.items() if stat.startswith("shed_")
+        )
+        p95 = self.wait_latency.percentile(95)
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "tokens_available": round(self.tokens) if self.tokens_per_minute > 0 else None,
+            "admitted": admitted,
+            "shed": shed,
+            "shed_rate": round(shed / (admitted + shed), 3) if admitted + shed else None,
+            "wait_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "by_priority": {
+                "in_progress" if priority == PRIORITY_IN_PROGRESS else "new": counts
+                for priority, counts in by_priority.items()
+            },
+        }
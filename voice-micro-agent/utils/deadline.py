@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Monotonic time by which the current request's work must be done
+current_deadline = ContextVar("current_deadline", default=None)
+
+
+def time_left(default=None):
+    """Seconds until the current deadline, capped at default; default without a deadline"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    left = max(0.0, deadline - time.monotonic())
+    return left if default is None else min(default, left)
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Give the block a deadline seconds from now, never later than an enclosing one.
+
+    Tasks created inside the block copy the context and inherit the deadline.
+    """
+    deadline = time.monotonic() + seconds
+    outer = current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
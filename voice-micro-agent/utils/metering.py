@@ -0,0 +1,84 @@
+"""LLM token counts and estimated cost for the voice agent.
+
+cli-assistant/ngo-assisstant/utils/metering.py is a deliberate parallel copy:
+the two apps are deployed separately and share no package. estimate_tokens
+and TokenMeter must behave the same in both, with identical summary() rows,
+so change them together. Only reading usage differs: this copy reads Gemini
+SDK responses (usage_from_response), the CLI copy reads LangChain messages.
+"""
+import threading
+from collections import defaultdict
+from datetime import date
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text):
+    """Estimate token count with tiktoken, or ~4 characters per token without it"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def usage_from_response(response, prompt, completion):
+    """Prefer the provider's usage metadata and fall back to estimation"""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    completion_tokens = getattr(usage, "candidates_token_count", None)
+    if prompt_tokens is not None and completion_tokens is not None:
+        return prompt_tokens, completion_tokens, False
+    return estimate_tokens(prompt), estimate_tokens(completion), True
+
+
+class TokenMeter:
+    """Per agent, endpoint and day totals of LLM tokens and estimated cost"""
+
+    def __init__(self, input_price_per_million, output_price_per_million):
+        self.input_price = input_price_per_million
+        self.output_price = output_price_per_million
+        self.lock = threading.Lock()
+        self.totals = defaultdict(
+            lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0}
+        )
+
+    def record(self, agent, endpoint, prompt_tokens, completion_tokens, estimated=False):
+        key = (agent, endpoint, date.today().isoformat())
+        with self.lock:
+            entry = self.totals[key]
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            if estimated:
+                entry["estimated_calls"] += 1
+
+    def cost(self, prompt_tokens, completion_tokens):
+        return (
+            prompt_tokens * self.input_price + completion_tokens * self.output_price
+        ) / 1_000_000
+
+    def summary(self):
+        """Totals as rows sorted by day, agent and endpoint"""
+        with self.lock:
+            items = sorted(self.totals.items(), key=lambda item: (item[0][2], item[0][0], item[0][1]))
+            rows = []
+            for (agent, endpoint, day), entry in items:
+                rows.append(
+                    {
+                        "day": day,
+                        "agent": agent,
+                        "endpoint": endpoint,
+                        **entry,
+                        "avg_prompt_tokens": round(entry["prompt_tokens"] / entry["calls"]),
+                        "cost_usd": round(
+                            self.cost(entry["prompt_tokens"], entry["completion_tokens"]), 6
+                        ),
+                    }
+                )
+        return rows
@@ -0,0 +1,191 @@
+"""In-process counters and histograms rendered in the Prometheus text format.
+
+Recording takes a lock, one dict lookup and a few additions, which is cheap
+enough for every request and external call. Metrics belong to the process;
+with several workers each one serves its own /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class Counter:
+    """Monotonic count per label set; collect() can supply the values instead"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=(), collect=None):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self.lock:
+                values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    """Current value per label set, usually read from a service by collect()"""
+
+    kind = "gauge"
+
+
+class Histogram:
+    """Bucketed durations per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, seconds, *labels):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += seconds
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self.lock:
+            values = {labels: list(entry) for labels, entry in self.values.items()}
+        for labels, entry in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), entry[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labels, labels, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {entry[-1]:.6f}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+
+http_request_seconds = Histogram(
+    "voice_agent_http_request_duration_seconds",
+    "Time to serve a request, by route template, method and status",
+    ("route", "method", "status"),
+)
+external_call_seconds = Histogram(
+    "voice_agent_external_call_duration_seconds",
+    "Time spent in calls to external services, by dependency and outcome",
+    ("dependency", "outcome"),
+)
+call_flow_steps = Counter(
+    "voice_agent_call_flow_steps_total",
+    "Calls that reached each step of a call flow",
+    ("flow", "step"),
+)
+
+
+@contextmanager
+def external_call(dependency):
+    """Time a call to an external service; works in threads and coroutines alike"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        external_call_seconds.observe(time.perf_counter() - start, dependency, outcome)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so it adds no task or stream
+    wrapping per request and leaves WebSocket connections alone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                str(status),
+            )
@@ -0,0 +1,180 @@
+"""Deadlines, hedging and circuit breaking for the voice agent's external calls.
+
+cli-assistant/ngo-assisstant/utils/resilience.py is a deliberate parallel
+copy: the two apps are deployed separately and share no package.
+CircuitBreaker, LatencyWindow and the hedging rule in ResilientCall must
+behave the same in both, so change them together. The differences are
+intentional. This copy runs on one event loop, cuts timeouts to the caller's
+deadline and logs when a circuit opens. The CLI copy runs blocking calls on
+a thread pool and locks its breaker.
+"""
+import asyncio
+import functools
+import time
+from collections import deque
+from utils.deadline import time_left
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open"""
+
+
+class CircuitBreaker:
+    """Fail fast while an external dependency keeps failing"""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self):
+        """Allow calls while closed and a single probe call while half-open"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                print(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Rolling window of recent call latencies in seconds"""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, pct):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilientCall:
+    """Deadline, optional hedging and circuit breaking around one external dependency"""
+
+    def __init__(
+        self,
+        name,
+        timeout,
+        hedge=False,
+        hedge_min_delay=0.5,
+        min_samples=20,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        executor=None,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.min_samples = min_samples
+        self.executor = executor
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency = LatencyWindow()
+
+    def hedge_delay(self):
+        """Delay before sending a hedged request, based on the observed p95"""
+        if not self.hedge or len(self.latency.samples) < self.min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(95))
+
+    def status(self):
+        p95 = self.latency.percentile(95)
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """Run a call with a deadline; blocking functions run on the executor
+
+        The timeout is cut short to whatever is left of the caller's deadline.
+        """
+        limit = timeout or self.timeout
+        budget = time_left(limit)
+        if budget <= 0:
+            raise asyncio.TimeoutError(f"No time left for {self.name}")
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._attempt(func, args, kwargs), timeout=budget)
+        except asyncio.CancelledError:
+            self.breaker.probe_in_flight = False
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.probe_in_flight = False
+            # Running out of the caller's budget says nothing about the dependency's health
+            if budget >= limit:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.latency.record(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    def _start(self, func, args, kwargs):
+        if asyncio.iscoroutinefunction(func):
+            return asyncio.ensure_future(func(*args, **kwargs))
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def _attempt(self, func, args, kwargs):
+        tasks = {self._start(func, args, kwargs)}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    tasks.add(self._start(func, args, kwargs))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()